@@ -0,0 +1,373 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+import httpx
+
+from .fake_youtube import FakeConfig, FakeYouTube
+from .synth import Shape, make_user_db
+
+# ===============================
+# Settings
+# ===============================
+ROUTE_WEIGHTS = {          # one "click" of a simulated user
+    "dashboard": 0.35,     # /dashboard/{u}                  → Notification
+    "sidebar": 0.20,       # /dashboard/{u}/sidebar
+    "feed": 0.35,          # /dashboard/{u}/{domain}/{sub}   → Feed
+    "setting": 0.10,       # /setting/{u}
+}
+THINK_MIN_SEC = 0.2
+READY_TIMEOUT_SEC = 60.0
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# ===============================
+# Recording
+# ===============================
+@dataclass
+class RouteStats:
+    latencies: List[float] = field(default_factory=list)   # seconds, successful and failed alike
+    statuses: Dict[str, int] = field(default_factory=dict)
+    errors: int = 0
+
+    def add(self, elapsed: float, status: str, ok: bool) -> None:
+        self.latencies.append(elapsed)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+
+    def summary(self, wall_sec: float) -> Dict[str, Any]:
+        values = sorted(self.latencies)
+        pick = lambda q: values[min(len(values) - 1, int(len(values) * q))] * 1000 if values else None
+        count = len(values)
+        return {
+            "count": count,
+            "rps": round(count / wall_sec, 2) if wall_sec else None,
+            "error_rate": round(self.errors / count, 4) if count else None,
+            "p50_ms": pick(0.50),
+            "p95_ms": pick(0.95),
+            "p99_ms": pick(0.99),
+            "max_ms": values[-1] * 1000 if values else None,
+            "statuses": self.statuses,
+        }
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.routes: Dict[str, RouteStats] = {}
+
+    async def get(self, client: httpx.AsyncClient, route: str, url: str) -> Optional[httpx.Response]:
+        return await self.call(client, route, "GET", url)
+
+    async def call(self, client: httpx.AsyncClient, route: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        stats = self.routes.setdefault(route, RouteStats())
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as err:
+            stats.add(time.perf_counter() - started, type(err).__name__, ok=False)
+            return None
+        stats.add(time.perf_counter() - started, str(response.status_code), ok=response.status_code < 400)
+        return response
+
+# ===============================
+# Simulated household users
+# ===============================
+def _feed_targets(sidebar: Any) -> List[str]:
+    """Every domain / domain+subdomain the sidebar offers, as URL suffixes."""
+    targets = []
+    for domain in (sidebar or {}).get("domains", []):
+        key = quote(domain["key"], safe="")
+        targets.append(key)
+        targets.extend(f"{key}/{quote(sub['key'], safe='')}" for sub in domain["subdomains"])
+    return targets or ["all"]
+
+
+async def simulated_user(
+    client: httpx.AsyncClient,
+    rec: Recorder,
+    username: str,
+    deadline: float,
+    think_sec: float,
+    rng: random.Random,
+) -> None:
+    """Page load (notification + sidebar), then clicks with exponential think times until the deadline."""
+    u = quote(username, safe="")
+    await asyncio.sleep(rng.uniform(0, think_sec))   # users don't all arrive in the same second
+    _, sidebar = await asyncio.gather(
+        rec.get(client, "dashboard", f"/dashboard/{u}"),
+        rec.get(client, "sidebar", f"/dashboard/{u}/sidebar"),
+    )
+    targets = _feed_targets(sidebar.json() if sidebar is not None and sidebar.status_code == 200 else None)
+    routes, weights = zip(*ROUTE_WEIGHTS.items())
+
+    while time.monotonic() < deadline:
+        await asyncio.sleep(max(THINK_MIN_SEC, rng.expovariate(1 / think_sec)))
+        if time.monotonic() >= deadline:
+            break
+        route = rng.choices(routes, weights)[0]
+        if route == "dashboard":
+            await rec.get(client, route, f"/dashboard/{u}")
+        elif route == "sidebar":
+            response = await rec.get(client, route, f"/dashboard/{u}/sidebar")
+            if response is not None and response.status_code == 200:
+                targets = _feed_targets(response.json())
+        elif route == "feed":
+            await rec.get(client, route, f"/dashboard/{u}/{rng.choice(targets)}")
+        else:
+            await rec.get(client, route, f"/setting/{u}")
+
+
+async def background_imports(
+    client: httpx.AsyncClient,
+    rec: Recorder,
+    csv_path: Path,
+    every_sec: float,
+    deadline: float,
+) -> None:
+    """A new household member signing up and uploading a subscription CSV: import + the full bulk poll."""
+    n = 0
+    while time.monotonic() + every_sec < deadline:
+        await asyncio.sleep(every_sec)
+        n += 1
+        username = f"load-import-{n}"
+        await rec.get(client, "auth_create", f"/auth/create/{username}")
+        files = {"file": (csv_path.name, csv_path.read_bytes(), "text/csv")}
+        await rec.call(client, "csv_import", "POST", f"/csv/import/{username}", files=files)
+
+
+async def run_load(
+    base_url: str,
+    usernames: List[str],
+    users: int,
+    duration: float,
+    think_sec: float,
+    import_csv: Optional[Path],
+    import_every: float,
+    seed: int,
+) -> Dict[str, Any]:
+    rec = Recorder()
+    rng = random.Random(seed)
+    limits = httpx.Limits(max_connections=users + 8, max_keepalive_connections=users + 8)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+        started = time.monotonic()
+        deadline = started + duration
+        tasks = [
+            simulated_user(client, rec, usernames[i % len(usernames)], deadline, think_sec, random.Random(rng.random()))
+            for i in range(users)
+        ]
+        if import_csv:
+            tasks.append(background_imports(client, rec, import_csv, import_every, deadline))
+        await asyncio.gather(*tasks)
+        wall = time.monotonic() - started
+        status = {}
+        for name in ("ingest", "throttle"):
+            with contextlib.suppress(httpx.HTTPError, ValueError):
+                status[name] = (await client.get(f"/status/{name}")).json()
+
+    routes = {route: stats.summary(wall) for route, stats in sorted(rec.routes.items())}
+    interactive = RouteStats()
+    for route, stats in rec.routes.items():
+        if route in ROUTE_WEIGHTS:
+            interactive.latencies += stats.latencies
+            interactive.errors += stats.errors
+    return {
+        "users": users,
+        "duration_sec": round(wall, 2),
+        "think_sec": think_sec,
+        "routes": routes,
+        "interactive": interactive.summary(wall),
+        "server_status": status,
+    }
+
+# ===============================
+# Local target: uvicorn + fake YouTube over synthetic user DBs
+# ===============================
+def prepare_content(
+    content_dir: Path,
+    fake: FakeYouTube,
+    dbs: int,
+    results: int,
+    duration: float,
+    due_fraction: float,
+    seed: int,
+) -> List[str]:
+    """
+    load-user-{i}.db per household user, channels taken from the fake server.
+    `due_fraction` of the channels come due during the run → the timmer
+    schedulers poll (and write) while the dashboards are being read.
+    """
+    rng = random.Random(seed)
+    rss_ids = fake.rss_ids
+    per_db = max(1, len(rss_ids) // dbs)
+    usernames = []
+    for i in range(dbs):
+        username = f"load-user-{i}"
+        ids = rss_ids[i * per_db:(i + 1) * per_db] or rss_ids[:per_db]
+        shape = Shape.for_results(results)._replace(channels=len(ids))
+        with contextlib.redirect_stdout(io.StringIO()):
+            path = make_user_db(content_dir / f"{username}.db", shape, seed=seed + i, rss_ids=ids)
+        conn = sqlite3.connect(path)
+        with conn:
+            now = time.time()
+            for (rss_id,) in conn.execute("SELECT rss_id FROM Channels").fetchall():
+                if rng.random() < due_fraction:
+                    conn.execute("UPDATE Channels SET ts = ? WHERE rss_id = ?",
+                                 (int(now + rng.uniform(0, duration)), rss_id))
+        conn.close()
+        usernames.append(username)
+    return usernames
+
+
+def start_server(content_dir: Path, feed_url: str, port: int, args: argparse.Namespace) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "HYDRA_CONTENT_DIR": str(content_dir),
+        "HYDRA_FEED_BASE_URL": feed_url,
+        "HYDRA_THROTTLE_RATE": str(args.start_rate),
+        "HYDRA_THROTTLE_MAX_RATE": str(args.max_rate),
+        "HYDRA_THROTTLE_MAX_CONCURRENCY": str(args.concurrency),
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(PROJECT_ROOT), os.environ.get("PYTHONPATH")])),
+    }
+    log_file = (content_dir / "server.log").open("wb")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "content_server.main:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=PROJECT_ROOT, env=env, stdout=log_file, stderr=subprocess.STDOUT,
+    )
+
+
+def wait_ready(base_url: str, proc: subprocess.Popen, log_path: Path) -> None:
+    deadline = time.monotonic() + READY_TIMEOUT_SEC
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Server exited with {proc.returncode}:\n{log_path.read_text(errors='replace')[-2000:]}")
+        with contextlib.suppress(httpx.HTTPError):
+            if httpx.get(f"{base_url}/status/throttle", timeout=2.0).status_code == 200:
+                return
+        time.sleep(0.5)
+    raise RuntimeError(f"Server not ready after {READY_TIMEOUT_SEC:.0f}s, see {log_path}")
+
+
+def _free_port() -> int:
+    import socket
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"\n{report['users']} users, {report['duration_sec']}s, think {report['think_sec']}s")
+    print(f"{'route':<14} {'count':>7} {'rps':>8} {'err%':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    rows = list(report["routes"].items()) + [("interactive", report["interactive"])]
+    for route, s in rows:
+        if not s["count"]:
+            continue
+        print(f"{route:<14} {s['count']:>7} {s['rps']:>8.2f} {s['error_rate'] * 100:>6.2f}% "
+              f"{s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f} {s['max_ms']:>9.1f}")
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Concurrent simulated users against the dashboard / setting API.")
+    parser.add_argument("--users", type=int, default=50, help="concurrent simulated users (browser sessions)")
+    parser.add_argument("--duration", type=float, default=120.0)
+    parser.add_argument("--think", type=float, default=5.0, help="mean think time between clicks, seconds")
+    parser.add_argument("--seed", type=int, default=46)
+    parser.add_argument("--out", type=Path, help="write the report as JSON")
+    # Existing server
+    parser.add_argument("--base-url", help="target a running content_server (e.g. the container) instead of a local one")
+    parser.add_argument("--usernames", help="comma separated users that exist on --base-url")
+    # Local server
+    parser.add_argument("--dbs", type=int, default=5, help="household user DBs (simulated users are spread over them)")
+    parser.add_argument("--results", type=int, default=5000, help="Result rows per user DB")
+    parser.add_argument("--channels", type=int, default=500, help="fake YouTube channels, split over the DBs")
+    parser.add_argument("--due-fraction", type=float, default=0.5, help="channels whose scheduled poll falls inside the run")
+    parser.add_argument("--import-every", type=float, default=30.0, help="seconds between background CSV imports (0 = none)")
+    parser.add_argument("--import-channels", type=int, default=50, help="channels per background import")
+    parser.add_argument("--feed-latency-ms", type=float, default=40.0)
+    parser.add_argument("--start-rate", type=float, default=20.0, help="server throttle starting req/s")
+    parser.add_argument("--max-rate", type=float, default=200.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--keep", type=Path, help="use this directory for the content dir and keep it")
+    args = parser.parse_args(argv)
+
+    if args.base_url:
+        if not args.usernames:
+            parser.error("--base-url needs --usernames")
+        report = asyncio.run(run_load(
+            args.base_url, [u.strip() for u in args.usernames.split(",") if u.strip()],
+            args.users, args.duration, args.think, None, 0, args.seed,
+        ))
+    else:
+        fake = FakeYouTube(FakeConfig(channels=args.channels, seed=args.seed, latency_ms=args.feed_latency_ms)).start()
+        with tempfile.TemporaryDirectory(prefix="hydra-load-") as tmp:
+            content_dir = args.keep or Path(tmp)
+            content_dir.mkdir(parents=True, exist_ok=True)
+            print(f"Preparing {args.dbs} user DBs in {content_dir} …")
+            usernames = prepare_content(content_dir, fake, args.dbs, args.results, args.duration, args.due_fraction, args.seed)
+            import_csv = None
+            if args.import_every > 0:
+                import_csv = fake.write_channels_csv(content_dir / "load-import.csv", limit=args.import_channels)
+            port = _free_port()
+            base_url = f"http://127.0.0.1:{port}"
+            proc = start_server(content_dir, fake.url, port, args)
+            try:
+                wait_ready(base_url, proc, content_dir / "server.log")
+                print(f"Server up at {base_url}, {args.users} users for {args.duration:.0f}s …")
+                report = asyncio.run(run_load(
+                    base_url, usernames, args.users, args.duration, args.think,
+                    import_csv, args.import_every, args.seed,
+                ))
+            finally:
+                proc.terminate()
+                with contextlib.suppress(subprocess.TimeoutExpired):
+                    proc.wait(timeout=10)
+                if proc.poll() is None:
+                    proc.kill()
+                fake.stop()
+            report["feed_server"] = fake.stats
+
+    print_report(report)
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nReport → {args.out}")
+    return 1 if report["interactive"]["count"] == 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# ===============================
+# Module Summary
+# ===============================
+"""
+Capacity test: N browser sessions reading the dashboard while the server polls and imports.
+
+    python -m content_server.bench.api_load --users 100 --duration 300 --dbs 10 --results 20000
+    python -m content_server.bench.api_load --base-url http://nas:8000 --usernames alice,bob --users 20
+
+Local mode (default):
+  - synthetic user DBs (bench/synth.py) in a temp HYDRA_CONTENT_DIR
+  - uvicorn content_server.main:app in a subprocess, feeds from bench/fake_youtube.py
+  - --due-fraction of the channels come due during the run → timmer polls write concurrently
+  - every --import-every seconds a signup (/auth/create) + CSV upload (/csv/import) → import + bulk poll
+Each user: page load (notification + sidebar), then ROUTE_WEIGHTS clicks with exponential think time.
+
+Reports per route and for all interactive routes together: count, rps, error rate,
+p50 / p95 / p99 / max latency (client side, includes queueing), final /status/ingest + /status/throttle.
+Exit 1 when no interactive request completed.
+"""
@@ -0,0 +1,199 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from ..sql_lite.service.writer import writer_stats
+from ..youtube.bulk import run_batch
+from ..youtube.feed import fetcher
+from ..youtube.feed.resilience import breaker
+from ..youtube.feed.throttle import throttle
+from ..youtube.timmer import run_loop
+from .fake_youtube import FakeConfig, FakeYouTube
+from .synth import Shape, make_user_db
+
+log = logging.getLogger(__name__)
+
+# ===============================
+# Contention counter: what the DB layer logs when writers / readers collide
+# ===============================
+class _ContentionLog(logging.Handler):
+    MARKERS = ("database is locked", "Group commit failed", "DB locked")
+
+    def __init__(self) -> None:
+        super().__init__(level=logging.WARNING)
+        self.count = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        message = record.getMessage()
+        if any(marker in message for marker in self.MARKERS):
+            self.count += 1
+
+
+def _percentiles(values: List[float]) -> Dict[str, float] | None:
+    if not values:
+        return None
+    values = sorted(values)
+    pick = lambda q: values[min(len(values) - 1, int(len(values) * q))]
+    return {
+        "count": len(values),
+        "p50": round(statistics.median(values), 3),
+        "p95": round(pick(0.95), 3),
+        "max": round(values[-1], 3),
+    }
+
+# ===============================
+# Setup
+# ===============================
+def make_user_dbs(work_dir: Path, rss_ids: List[str], users: int, due_now: bool) -> List[Path]:
+    """Channels dealt round-robin over `users` DBs, nothing polled yet (last_video_id NULL)."""
+    paths = []
+    for u in range(users):
+        ids = rss_ids[u::users]
+        with contextlib.redirect_stdout(io.StringIO()):
+            path = make_user_db(work_dir / f"crawl_{u}.db", Shape(len(ids), 4, 8, 0), seed=u, rss_ids=ids)
+        if due_now:
+            conn = sqlite3.connect(path)
+            with conn:
+                conn.execute("UPDATE Channels SET ts = ?", (int(time.time()) - 60,))
+            conn.close()
+        paths.append(path)
+    return paths
+
+
+def _poll_log(paths: List[Path]) -> Dict[str, Any]:
+    fetch_ms, db_ms, outcomes = [], [], {}
+    for path in paths:
+        conn = sqlite3.connect(path)
+        try:
+            for f_ms, d_ms, outcome in conn.execute("SELECT fetch_ms, db_ms, outcome FROM PollLog"):
+                if f_ms is not None:
+                    fetch_ms.append(f_ms)
+                db_ms.append(d_ms)
+                outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        finally:
+            conn.close()
+    return {"polls": sum(outcomes.values()), "outcomes": outcomes,
+            "fetch_ms": _percentiles(fetch_ms), "db_ms": _percentiles(db_ms)}
+
+# ===============================
+# Runs
+# ===============================
+async def _run_bulk(paths: List[Path]) -> None:
+    await asyncio.gather(*(run_batch(str(p)) for p in paths))
+
+
+async def _run_timmer(paths: List[Path], duration: float) -> None:
+    tasks = [asyncio.create_task(run_loop(str(p))) for p in paths]
+    await asyncio.sleep(duration)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def crawl(args: argparse.Namespace) -> Dict[str, Any]:
+    server = FakeYouTube(FakeConfig(
+        channels=args.channels, seed=args.seed, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, not_found_rate=args.not_found_rate,
+        etag=not args.no_etag, upload_every_sec=args.upload_every,
+    )).start()
+    # Live module globals → every fetch from here on goes to the fake server
+    fetcher.FEED_BASE_URL = server.url
+    fetcher.CONDITIONAL_GET = args.conditional_get
+    throttle.configure(rate=args.start_rate, max_rate=args.max_rate, max_concurrency=args.concurrency)
+
+    contention = _ContentionLog()
+    logging.getLogger().addHandler(contention)
+    try:
+        with tempfile.TemporaryDirectory(prefix="hydra-crawl-") as tmp:
+            paths = make_user_dbs(Path(tmp), server.rss_ids, args.users, due_now=args.mode == "timmer")
+            started = time.perf_counter()
+            if args.mode == "bulk":
+                asyncio.run(_run_bulk(paths))
+            else:
+                asyncio.run(_run_timmer(paths, args.duration))
+            elapsed = time.perf_counter() - started
+            polls = _poll_log(paths)
+    finally:
+        logging.getLogger().removeHandler(contention)
+        server.stop()
+
+    latencies = server.detection_latencies()
+    return {
+        "mode": args.mode,
+        "channels": args.channels,
+        "users": args.users,
+        "elapsed_sec": round(elapsed, 2),
+        "channels_per_sec": round(polls["polls"] / elapsed, 2) if elapsed else None,
+        "polls": polls,
+        "server": server.stats,
+        "detection_latency_sec": _percentiles(list(latencies.values())),
+        "live_uploads": {"published": len(server.published), "served": len(latencies)},
+        "db_contention": {"lock_warnings": contention.count, "writers": writer_stats()},
+        "throttle": throttle.snapshot(),
+        "breaker": breaker.snapshot(),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="End-to-end crawl load test against a local fake YouTube.")
+    parser.add_argument("--mode", choices=["bulk", "timmer"], default="bulk",
+                        help="bulk: run_batch once per DB; timmer: the per-DB schedulers for --duration seconds")
+    parser.add_argument("--channels", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=4, help="user DBs the channels are spread over")
+    parser.add_argument("--duration", type=float, default=60.0, help="timmer mode only")
+    parser.add_argument("--seed", type=int, default=45)
+    # Fake server
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--not-found-rate", type=float, default=0.0)
+    parser.add_argument("--upload-every", type=float, default=600.0, help="mean seconds between live uploads per channel")
+    parser.add_argument("--no-etag", action="store_true", help="server sends no ETag / Last-Modified")
+    # Client
+    parser.add_argument("--conditional-get", action="store_true", help="fetcher sends If-None-Match (HYDRA_FEED_CONDITIONAL_GET)")
+    parser.add_argument("--start-rate", type=float, default=20.0, help="throttle starting req/s")
+    parser.add_argument("--max-rate", type=float, default=200.0, help="throttle ceiling req/s")
+    parser.add_argument("--concurrency", type=int, default=32, help="throttle in-flight ceiling")
+    parser.add_argument("--json", type=Path, help="write the report here")
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.WARNING)  # per-poll INFO lines would dominate the run
+    report = crawl(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.json:
+        args.json.write_text(text, encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# ===============================
+# Module Summary
+# ===============================
+"""
+    python -m content_server.bench.crawl --mode bulk --channels 2000 --users 8
+    python -m content_server.bench.crawl --mode timmer --channels 2000 --duration 120 --upload-every 30
+    python -m content_server.bench.crawl --error-rate 0.02 --rate-limit-rate 0.01 --conditional-get
+
+Reports:
+  - channels_per_sec: PollLog rows / wall time
+  - detection_latency_sec: live upload → first served in a feed (fake server side)
+  - db_contention: "database is locked" / failed group commits + per-DB writer stats
+  - throttle / breaker end state, server status counts and bytes
+The real bulk.run_batch / timmer.run_loop, fetcher, processor and writer run unchanged;
+only the feed base URL and the throttle limits are pointed at the local server.
+"""
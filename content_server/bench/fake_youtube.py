@@ -0,0 +1,230 @@
+from __future__ import annotations
+import argparse
+import csv
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from .feeds import FEED_SIZE, channel_id, render_feed, video_id
+
+# ===============================
+# Behaviour knobs
+# ===============================
+@dataclass
+class FakeConfig:
+    channels: int = 1000
+    seed: int = 45
+    latency_ms: float = 40.0          # mean response delay
+    jitter_ms: float = 20.0           # ± uniform around the mean
+    error_rate: float = 0.0           # fraction of requests answered 503
+    rate_limit_rate: float = 0.0      # fraction answered 429 + Retry-After
+    retry_after_sec: int = 5
+    not_found_rate: float = 0.0       # fraction of channels that are gone (404, always)
+    etag: bool = True                 # ETag / Last-Modified + 304 on a matching conditional GET
+    upload_every_sec: float = 600.0   # mean gap between live uploads per channel (Poisson)
+
+
+@dataclass
+class _Channel:
+    rss_id: str
+    name: str
+    rng: random.Random
+    uploads: List[Tuple[str, str, float]] = field(default_factory=list)   # oldest first
+    gone: bool = False
+    next_upload: float = 0.0
+
+# ===============================
+# Server
+# ===============================
+class FakeYouTube:
+    """
+    Serves /feeds/videos.xml?channel_id=UC… like youtube.com for a fixed set of
+    generated channels. Each channel has 15 past uploads and keeps uploading
+    while the server runs; the first time a video appears in a served feed is
+    recorded, so a crawl can be scored on detection latency.
+    """
+
+    def __init__(self, config: FakeConfig) -> None:
+        self.config = config
+        rng = random.Random(config.seed)
+        self.started = time.time()
+        self._channels: Dict[str, _Channel] = {}
+        for i in range(config.channels):
+            rss_id = channel_id(rng)
+            ch = _Channel(rss_id, f"Fake Channel {i}", random.Random(rng.random()),
+                          gone=rng.random() < config.not_found_rate)
+            t = self.started - ch.rng.uniform(3600, 3 * 86400)
+            for _ in range(FEED_SIZE):
+                ch.uploads.append((video_id(ch.rng), f"Upload of {ch.name}", t))
+                t -= ch.rng.uniform(1, 10) * 86400
+            ch.uploads.reverse()
+            ch.next_upload = self.started + ch.rng.expovariate(1 / config.upload_every_sec)
+            self._channels[rss_id] = ch
+        self._lock = threading.Lock()
+        self._rng = random.Random(config.seed + 1)
+        self.first_served: Dict[str, float] = {}    # video id → first time it was in a 200 response
+        self.published: Dict[str, float] = {}       # video id → upload time, live uploads only
+        self.stats: Dict[str, int] = {"requests": 0, "bytes": 0}
+        self._httpd: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def rss_ids(self) -> List[str]:
+        return list(self._channels)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/feeds/videos.xml"
+
+    # ---------- Uploads
+    def _visible(self, ch: _Channel, now: float) -> List[Tuple[str, str, float]]:
+        """Extend the channel's Poisson upload stream up to `now`, newest FEED_SIZE first."""
+        with self._lock:
+            while ch.next_upload <= now:
+                vid = video_id(ch.rng)
+                ch.uploads.append((vid, f"Live upload of {ch.name}", ch.next_upload))
+                self.published[vid] = ch.next_upload
+                ch.next_upload += ch.rng.expovariate(1 / self.config.upload_every_sec)
+            return list(reversed(ch.uploads[-FEED_SIZE:]))
+
+    # ---------- Responses
+    def respond(self, rss_id: Optional[str], headers) -> Tuple[int, Dict[str, str], bytes]:
+        cfg = self.config
+        with self._lock:
+            self.stats["requests"] += 1
+            roll = self._rng.random()
+        ch = self._channels.get(rss_id or "")
+        if roll < cfg.error_rate:
+            return self._count(503, {}, b"Service Unavailable")
+        if roll < cfg.error_rate + cfg.rate_limit_rate:
+            return self._count(429, {"Retry-After": str(cfg.retry_after_sec)}, b"Too Many Requests")
+        if ch is None or ch.gone:
+            return self._count(404, {}, b"Not Found")
+
+        now = time.time()
+        videos = self._visible(ch, now)
+        latest_vid, _, latest_ts = videos[0]
+        extra: Dict[str, str] = {}
+        if cfg.etag:
+            extra = {"ETag": f'"{latest_vid}"', "Last-Modified": formatdate(latest_ts, usegmt=True)}
+            if headers.get("If-None-Match") == extra["ETag"]:
+                return self._count(304, extra, b"")
+        body = render_feed(ch.rss_id, ch.name, videos).encode("utf-8")
+        with self._lock:
+            for vid, _, _ in videos:
+                self.first_served.setdefault(vid, now)
+        extra["Content-Type"] = "text/xml; charset=UTF-8"
+        return self._count(200, extra, body)
+
+    def _count(self, status: int, headers: Dict[str, str], body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        with self._lock:
+            self.stats[str(status)] = self.stats.get(str(status), 0) + 1
+            self.stats["bytes"] += len(body)
+        return status, headers, body
+
+    # ---------- Lifecycle
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> "FakeYouTube":
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                cfg = server.config
+                delay = max(0.0, cfg.latency_ms + random.uniform(-cfg.jitter_ms, cfg.jitter_ms)) / 1000
+                time.sleep(delay)
+                query = parse_qs(urlparse(self.path).query)
+                status, headers, body = server.respond(query.get("channel_id", [None])[0], self.headers)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:  # thousands of requests → keep stderr quiet
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, name="fake-youtube", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+
+    # ---------- Scoring
+    def detection_latencies(self) -> Dict[str, float]:
+        """Live upload → first served, seconds (what a crawl could have seen)."""
+        now = time.time()
+        for ch in self._channels.values():   # materialize uploads of channels nobody asked for lately
+            self._visible(ch, now)
+        with self._lock:
+            return {vid: self.first_served[vid] - ts for vid, ts in self.published.items() if vid in self.first_served}
+
+    def write_channels_csv(self, path: Path, limit: Optional[int] = None) -> Path:
+        """CSV in the import format (csv_import.py) → load the fake channels into a user DB."""
+        with Path(path).open("w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Channel ID", "Channel URL", "Channel title"])
+            for ch in list(self._channels.values())[:limit]:
+                writer.writerow([ch.rss_id, f"https://www.youtube.com/channel/{ch.rss_id}", ch.name])
+        return Path(path)
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for youtube.com/feeds/videos.xml")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--channels", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=45)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--not-found-rate", type=float, default=0.0)
+    parser.add_argument("--no-etag", action="store_true")
+    parser.add_argument("--upload-every", type=float, default=600.0, help="mean seconds between live uploads per channel")
+    parser.add_argument("--csv", type=Path, help="write the channel list as an importable CSV")
+    args = parser.parse_args(argv)
+
+    server = FakeYouTube(FakeConfig(
+        channels=args.channels, seed=args.seed, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, not_found_rate=args.not_found_rate,
+        etag=not args.no_etag, upload_every_sec=args.upload_every,
+    )).start(args.host, args.port)
+    if args.csv:
+        print(f"Channels → {server.write_channels_csv(args.csv)}")
+    print(f"Serving {args.channels} fake channels at {server.url}")
+    print(f"    HYDRA_FEED_BASE_URL={server.url}")
+    try:
+        while True:
+            time.sleep(60)
+            print(server.stats)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
+
+# ===============================
+# Module Summary
+# ===============================
+"""
+Offline youtube.com for crawler work: latency, 503 / 429 (+ Retry-After) rates,
+gone channels (404), ETag / 304 and a Poisson upload cadence per channel.
+
+Standalone:
+    python -m content_server.bench.fake_youtube --channels 5000 --csv fake.csv
+    HYDRA_FEED_BASE_URL=http://127.0.0.1:8765/feeds/videos.xml uvicorn ...
+In process: bench/crawl.py (load-test driver).
+"""
@@ -0,0 +1,137 @@
+from __future__ import annotations
+import random
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+FEED_SIZE = 15  # YouTube RSS only exposes the latest 15 uploads
+
+_ID_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+
+# ===============================
+# Ids shaped like YouTube's (UC + 22 chars, 11-char video ids)
+# ===============================
+def channel_id(rng: random.Random) -> str:
+    return "UC" + "".join(rng.choices(_ID_ALPHABET, k=22))
+
+
+def video_id(rng: random.Random) -> str:
+    return "".join(rng.choices(_ID_ALPHABET, k=11))
+
+# ===============================
+# Atom feed in the exact shape of https://www.youtube.com/feeds/videos.xml?channel_id=
+# ===============================
+def _iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+
+
+def _entry(rss_id: str, channel_name: str, vid: str, title: str, published: float) -> str:
+    title = escape(title)
+    name = escape(channel_name)
+    return f"""
+ <entry>
+  <id>yt:video:{vid}</id>
+  <yt:videoId>{vid}</yt:videoId>
+  <yt:channelId>{rss_id}</yt:channelId>
+  <title>{title}</title>
+  <link rel="alternate" href="https://www.youtube.com/watch?v={vid}"/>
+  <author>
+   <name>{name}</name>
+   <uri>https://www.youtube.com/channel/{rss_id}</uri>
+  </author>
+  <published>{_iso(published)}</published>
+  <updated>{_iso(published + 3600)}</updated>
+  <media:group>
+   <media:title>{title}</media:title>
+   <media:content url="https://www.youtube.com/v/{vid}?version=3" type="application/x-shockwave-flash" width="640" height="390"/>
+   <media:thumbnail url="https://i2.ytimg.com/vi/{vid}/hqdefault.jpg" width="480" height="360"/>
+   <media:description>{title} — synthetic description text for parser benchmarks.</media:description>
+   <media:community>
+    <media:starRating count="1204" average="5.00" min="1" max="5"/>
+    <media:statistics views="48213"/>
+   </media:community>
+  </media:group>
+ </entry>"""
+
+
+def render_feed(rss_id: str, channel_name: str, videos: Sequence[Tuple[str, str, float]]) -> str:
+    """videos: (video_id, title, published epoch), newest first; at most FEED_SIZE are kept."""
+    name = escape(channel_name)
+    published = videos[-1][2] if videos else 0
+    entries = "".join(_entry(rss_id, channel_name, vid, title, ts) for vid, title, ts in videos[:FEED_SIZE])
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" xmlns:media="http://search.yahoo.com/mrss/" xmlns="http://www.w3.org/2005/Atom">
+ <link rel="self" href="http://www.youtube.com/feeds/videos.xml?channel_id={rss_id}"/>
+ <id>yt:channel:{rss_id[2:]}</id>
+ <yt:channelId>{rss_id[2:]}</yt:channelId>
+ <title>{name}</title>
+ <link rel="alternate" href="https://www.youtube.com/channel/{rss_id}"/>
+ <author>
+  <name>{name}</name>
+  <uri>https://www.youtube.com/channel/{rss_id}</uri>
+ </author>
+ <published>{_iso(published)}</published>{entries}
+</feed>
+"""
+
+
+def synthetic_feed(
+    rng: random.Random,
+    *,
+    rss_id: Optional[str] = None,
+    entries: int = FEED_SIZE,
+    now: float = 1_760_000_000,
+    mean_gap_days: float = 3.0,
+) -> Tuple[str, List[Tuple[str, str, float]]]:
+    """A channel with `entries` uploads spaced ~mean_gap_days apart → (rss_id, videos newest first)."""
+    rss_id = rss_id or channel_id(rng)
+    videos = []
+    t = now - rng.uniform(0, 86400)
+    for i in range(entries):
+        videos.append((video_id(rng), f"Synthetic upload #{entries - i} of {rss_id[-6:]}", t))
+        t -= rng.expovariate(1 / mean_gap_days) * 86400 + 600
+    return rss_id, videos
+
+# ===============================
+# Saved fixtures
+# ===============================
+FIXTURES = {
+    # name → (entries, mean gap in days)
+    "feed_full.xml": (FEED_SIZE, 2.0),
+    "feed_weekly.xml": (FEED_SIZE, 7.0),
+    "feed_single.xml": (1, 7.0),
+    "feed_empty.xml": (0, 7.0),
+}
+
+
+def write_fixtures(out_dir: Path = FIXTURES_DIR, seed: int = 44) -> List[Path]:
+    """Regenerate the committed fixtures (deterministic for a given seed)."""
+    rng = random.Random(seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for name, (entries, gap) in FIXTURES.items():
+        rss_id, videos = synthetic_feed(rng, entries=entries, mean_gap_days=gap)
+        path = out_dir / name
+        path.write_text(render_feed(rss_id, f"Bench Channel {name[5:-4]}", videos), encoding="utf-8")
+        written.append(path)
+    return written
+
+
+def load_fixtures(fixtures_dir: Path = FIXTURES_DIR) -> dict[str, str]:
+    return {p.name: p.read_text(encoding="utf-8") for p in sorted(fixtures_dir.glob("*.xml"))}
+
+
+if __name__ == "__main__":
+    for path in write_fixtures():
+        print(path)
+
+# ===============================
+# Module Summary
+# ===============================
+"""
+YouTube-shaped RSS (Atom + yt: + media: namespaces) for parser benchmarks
+and offline crawls. fixtures/*.xml are committed; regenerate with
+    python -m content_server.bench.feeds
+"""
@@ -0,0 +1,293 @@
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import json
+import logging
+import re
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, Iterator, List, Tuple
+
+from ..sql_lite.operation import counters, delete, feed_items, poll_log, read, write
+from ..sql_lite.service import archive, csv_export, csv_import, retention
+from ..youtube import budget, bulk, catchup, timmer
+from ..youtube.feed import leveller, processor
+from .synth import Shape, make_user_db
+
+# ===============================
+# What gets audited
+# ===============================
+# Every QUERIES dict and QUERY_* constant of these modules
+SOURCES: Dict[str, ModuleType] = {
+    "read": read,
+    "write": write,
+    "delete": delete,
+    "counters": counters,
+    "feed_items": feed_items,
+    "poll_log": poll_log,
+    "csv_import": csv_import,
+    "csv_export": csv_export,
+    "retention": retention,
+    "archive": archive,
+    "processor": processor,
+    "timmer": timmer,
+    "bulk": bulk,
+    "budget": budget,
+    "catchup": catchup,
+    "leveller": leveller,
+}
+
+# Base queries the code completes at runtime → audited in the shapes it builds instead
+FRAGMENTS = {"read.feed_items", "poll_log.select", "archive.select_partition"}
+COMPOSED: Dict[str, str] = {
+    "read.feed_items[all]": f"{read.QUERIES['feed_items']} ORDER BY published DESC",
+    "read.feed_items[domain]": f"{read.QUERIES['feed_items']} WHERE domain_id IN (?) ORDER BY published DESC",
+    "read.feed_items[subdomain]": f"{read.QUERIES['feed_items']} WHERE subdomain_id IN (?) ORDER BY published DESC",
+    "read.feed_items[domain+subdomain]": (
+        f"{read.QUERIES['feed_items']} WHERE domain_id IN (?) AND subdomain_id IN (?) ORDER BY published DESC"
+    ),
+    "poll_log.select[all]": f"{poll_log.QUERIES['select']} ORDER BY seq DESC LIMIT ?",
+    "poll_log.select[rss_id]": f"{poll_log.QUERIES['select']} WHERE rss_id = ? ORDER BY seq DESC LIMIT ?",
+    "poll_log.select[since]": f"{poll_log.QUERIES['select']} WHERE started_at >= ? ORDER BY seq DESC LIMIT ?",
+    "write.assign": "UPDATE Channel SET id_domain = ?, id_subdomain = ? WHERE id_channel = ?",
+    **{
+        f"archive.select_partition[{name}]": f"{archive.QUERIES['select_partition']} {where} ORDER BY published DESC LIMIT ?"
+        for name, where in archive.FILTERS.items()
+    },
+}
+
+SAMPLE_MONTH = "202601"   # archive.* partition queries are templated on {month}
+
+# Full scans / temp sorts a query may do, with the reason. Key → {plan detail prefix: why}
+_CATEGORIES = "Domains / SubDomains hold a user's categories: tens of rows"
+_CLEANUP = "orphan sweep over the category table, the NOT IN side is index-only"
+ALLOWED: Dict[str, Dict[str, str]] = {
+    # ---- Dashboard reads: O(categories) or O(channels), never O(results)
+    "read.notification_domains": {
+        "SCAN dc": "DomainCounts is one row per domain (trigger-maintained read model)",
+        "USE TEMP B-TREE FOR ORDER BY": "sorts the per-domain rows by name",
+    },
+    "read.feed_items[all]": {
+        "SCAN FeedItem USING INDEX idx_feeditem_published": "the All feed is every item, newest first: index order, no sort",
+    },
+    "read.feed_items[subdomain]": {
+        "SCAN FeedItem USING INDEX idx_feeditem_published": "All + subdomain is not offered by the sidebar (All has no subdomains)",
+    },
+    "read.feed_domain_ids": {"SCAN Domains": f"case-insensitive name match; {_CATEGORIES}"},
+    "read.feed_subdomain_ids": {"SCAN SubDomains": f"case-insensitive name match; {_CATEGORIES}"},
+    "read.domain_names": {"SCAN Domains": f"id → name map; {_CATEGORIES}"},
+    "read.subdomain_names": {"SCAN SubDomains": f"id → name map; {_CATEGORIES}"},
+    "read.sidebar_structure": {
+        "SCAN c": "distinct (domain, subdomain) pairs over Channel: O(channels)",
+        "USE TEMP B-TREE FOR GROUP BY": "grouping on joined names, at most channels rows",
+        "USE TEMP B-TREE FOR ORDER BY": "at most categories² rows",
+    },
+    "read.setting_channels": {"SCAN c": "the settings page lists every channel, in primary key order"},
+    "csv_export.get_tracked_channels": {
+        "SCAN c": "export writes every tracked channel",
+        "USE TEMP B-TREE FOR ORDER BY": "export sorted by category names, O(channels) once per export",
+    },
+    # ---- Settings writes
+    "write.cleanup_domains": {"SCAN Domains": _CLEANUP},
+    "write.cleanup_subdomains": {"SCAN SubDomains": _CLEANUP},
+    "delete.cleanup_domains": {"SCAN Domains": _CLEANUP},
+    "delete.cleanup_subdomains": {"SCAN SubDomains": _CLEANUP},
+    "delete.delete_abandoned": {"SCAN t": "rank is not indexed; explicit user action over O(channels)"},
+    "delete.mark_all_seen": {
+        "SCAN Result": "login marks every unseen row; seen rows are purged by retention, so the scan ≈ the rows updated",
+    },
+    # ---- Pollers and schedulers
+    "bulk.QUERY_ALL_CHANNELS": {
+        "SCAN Channels": "bulk run polls every channel",
+        "USE TEMP B-TREE FOR ORDER BY": "once per import, O(channels)",
+    },
+    "budget.QUERY_CHANNEL_STATS": {"SCAN c": "per-channel demand for the daily budget, every BUDGET_REFRESH_SEC"},
+    "catchup.QUERY_OVERDUE": {"SCAN c": "startup only; after downtime most channels are overdue anyway"},
+    "leveller.QUERY_USER_HISTOGRAM": {"USE TEMP B-TREE FOR GROUP BY": "hour buckets over an idx_tracking_ts range"},
+    "leveller.QUERY_PROJECTED": {"USE TEMP B-TREE FOR GROUP BY": "hour buckets over an idx_tracking_ts range"},
+    "poll_log.select[all]": {
+        "SCAN PollLog USING INDEX idx_polllog_seq": "newest first in index order, stops at LIMIT (≤ POLL_LOG_MAX_LIMIT)",
+    },
+    "poll_log.select[since]": {
+        "SCAN PollLog USING INDEX idx_polllog_seq": "bounded by the ring size (HYDRA_POLL_LOG_CAPACITY), stops at LIMIT",
+    },
+    # ---- Maintenance: rebuilds and consistency checks, full by definition
+    "counters.recount": {
+        "SCAN r USING COVERING INDEX idx_result_channel": "ground-truth recount (check / rebuild)",
+        "USE TEMP B-TREE FOR GROUP BY": "ground-truth recount (check / rebuild)",
+    },
+    "counters.stored": {"SCAN DomainCounts": "one row per domain"},
+    "feed_items.backfill": {"SCAN r USING INDEX idx_result_channel": "read-model rebuild (migration)"},
+    "archive.list_partitions": {"SCAN Partitions": "one row per archived month"},
+    "archive.list_attached_partitions": {"SCAN archive.Partitions": "one row per archived month, once per retention pass"},
+    "archive.select_partition[all]": {
+        "SCAN Archive_": "unfiltered archive browse reads one month partition, off the hot DB",
+        "USE TEMP B-TREE FOR ORDER BY": "newest first within that month",
+    },
+}
+
+# ===============================
+# Plans
+# ===============================
+def collect() -> Dict[str, str]:
+    queries: Dict[str, str] = {}
+    for name, module in SOURCES.items():
+        for key, sql in getattr(module, "QUERIES", {}).items():
+            queries[f"{name}.{key}"] = sql
+        for attr in dir(module):
+            if attr.startswith("QUERY_") and isinstance(getattr(module, attr), str):
+                queries[f"{name}.{attr}"] = getattr(module, attr)
+    for key in FRAGMENTS:
+        queries.pop(key, None)
+    queries.update(COMPOSED)
+    return {key: sql.format(month=SAMPLE_MONTH) if "{month}" in sql else sql for key, sql in sorted(queries.items())}
+
+
+def _placeholders(sql: str) -> int:
+    """Positional ? outside string literals (no query here uses named parameters)."""
+    return re.sub(r"'(?:[^']|'')*'", "", sql).count("?")
+
+
+def explain(conn: sqlite3.Connection, sql: str) -> List[str]:
+    """EXPLAIN QUERY PLAN details, indented by depth like the sqlite3 shell."""
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", [None] * _placeholders(sql)).fetchall()
+    depth: Dict[int, int] = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+
+def _flagged(detail: str) -> bool:
+    detail = detail.strip()
+    return (detail.startswith("SCAN ") and detail != "SCAN CONSTANT ROW") or detail.startswith("USE TEMP B-TREE")
+
+
+def audit(conn: sqlite3.Connection, queries: Dict[str, str], check_allowlist: bool = True) -> List[Dict[str, Any]]:
+    report = []
+    for key, sql in queries.items():
+        entry: Dict[str, Any] = {"query": key, "plan": [], "violations": [], "allowed": {}, "stale_allowances": []}
+        if sql.lstrip().upper().startswith("CREATE"):
+            entry["status"] = "ddl"
+            report.append(entry)
+            continue
+        try:
+            entry["plan"] = explain(conn, sql)
+        except sqlite3.Error as err:
+            entry["status"] = "error"
+            entry["violations"].append(f"does not prepare: {err}")
+            report.append(entry)
+            continue
+        allowances = ALLOWED.get(key, {})
+        used = set()
+        for line in entry["plan"]:
+            detail = line.strip()
+            if not _flagged(detail):
+                continue
+            match = next((prefix for prefix in allowances if detail.startswith(prefix)), None)
+            if match is None:
+                entry["violations"].append(detail)
+            else:
+                entry["allowed"][detail] = allowances[match]
+                used.add(match)
+        entry["stale_allowances"] = sorted(set(allowances) - used)
+        entry["status"] = "violation" if entry["violations"] else ("allowed" if entry["allowed"] else "ok")
+        report.append(entry)
+    for key in sorted(set(ALLOWED) - set(queries)) if check_allowlist else []:
+        report.append({"query": key, "status": "unknown", "plan": [], "violations": [],
+                       "allowed": {}, "stale_allowances": sorted(ALLOWED[key])})
+    return report
+
+# ===============================
+# Fixture
+# ===============================
+@contextlib.contextmanager
+def fixture_db(results: int, path: Path | None = None) -> Iterator[sqlite3.Connection]:
+    """Populated user DB (bench/synth.py) with its archive attached, as the writer sees it."""
+    with tempfile.TemporaryDirectory(prefix="hydra-plans-") as tmp:
+        db_path = path or Path(tmp) / "plans.db"
+        with contextlib.redirect_stdout(io.StringIO()):
+            make_user_db(db_path, Shape.for_results(results))
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        try:
+            archive.attach(conn, db_path)
+            archive._create_partition(conn, SAMPLE_MONTH)
+            yield conn
+        finally:
+            conn.close()
+
+
+def print_report(report: List[Dict[str, Any]], verbose: bool) -> Tuple[int, int]:
+    failures = stale = 0
+    for entry in report:
+        status = entry["status"]
+        failures += status in ("violation", "error")
+        stale += bool(entry["stale_allowances"])
+        if not verbose and status in ("ok", "ddl", "allowed") and not entry["stale_allowances"]:
+            continue
+        print(f"[{status.upper():>9}] {entry['query']}")
+        for line in entry["plan"]:
+            print(f"              {line}")
+        for detail in entry["violations"]:
+            print(f"    NOT ALLOWED  {detail}")
+        if verbose:
+            for detail, why in entry["allowed"].items():
+                print(f"    allowed      {detail}  ← {why}")
+        for prefix in entry["stale_allowances"]:
+            print(f"    stale        ALLOWED[{entry['query']!r}][{prefix!r}] no longer matches the plan")
+    counts: Dict[str, int] = {}
+    for entry in report:
+        counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+    print(f"\n{len(report)} queries: " + ", ".join(f"{n} {s}" for s, n in sorted(counts.items())))
+    return failures, stale
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="EXPLAIN QUERY PLAN audit of every centralized SQL query.")
+    parser.add_argument("--results", type=int, default=10000, help="Result rows in the fixture DB")
+    parser.add_argument("--only", help="comma separated query key prefixes, e.g. read.,timmer.")
+    parser.add_argument("--verbose", "-v", action="store_true", help="print every plan, not just the failures")
+    parser.add_argument("--strict", action="store_true", help="stale allowlist entries fail too")
+    parser.add_argument("--json", type=Path, help="write the full report here")
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.WARNING)  # migrations log every step of the fixture build
+    queries = collect()
+    if args.only:
+        prefixes = [o.strip() for o in args.only.split(",") if o.strip()]
+        queries = {k: v for k, v in queries.items() if any(k.startswith(p) for p in prefixes)}
+    with fixture_db(args.results) as conn:
+        report = audit(conn, queries, check_allowlist=not args.only)
+    failures, stale = print_report(report, args.verbose)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 1 if failures or (args.strict and stale) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# ===============================
+# Module Summary
+# ===============================
+"""
+Index regression check: every SQL statement the app runs against a user DB,
+planned on a populated fixture (bench/synth.py, production schema from create.py).
+
+    python -m content_server.bench.query_plans            # exit 1 on a violation (CI)
+    python -m content_server.bench.query_plans -v         # every plan, with allowlist reasons
+    python -m pytest -q content_server/tests/test_query_plans.py   # same audit + no full scan of hot tables
+
+A plan line "SCAN …" (full table or full index walk) or "USE TEMP B-TREE …"
+(sort without an index) fails unless ALLOWED lists it for that query with a reason.
+ALLOWED entries that no longer match are reported as stale (--strict fails on them).
+
+New SQL: put it in the module's QUERIES dict (or a QUERY_* constant) and, if
+the module is new, add it to SOURCES. SQL assembled at runtime is covered by
+its base query in FRAGMENTS plus the shapes listed in COMPOSED.
+"""
@@ -0,0 +1,244 @@
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import json
+import logging
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from ..sql_lite.operation.create import sql_creation
+from ..sql_lite.operation.delete import _delete_op
+from ..sql_lite.operation.read import Feed, Notification, Setting, Sidebar
+from ..sql_lite.operation.write import _write_op
+from ..sql_lite.service.csv_export import export_csv
+from ..sql_lite.service.csv_import import CSVParser, _import_op
+from ..youtube.feed.fetcher import parse_feed
+from ..youtube.feed.ts_proc import predict_ts
+from .feeds import load_fixtures
+from .synth import Shape, domain_name, make_user_db, subdomain_name
+
+log = logging.getLogger(__name__)
+
+# ===============================
+# Settings
+# ===============================
+DEFAULT_SIZES = "100,1000,10000"
+MIN_RUNS = 5
+MIN_TIME_SEC = 0.3      # keep repeating a case until this much time was spent on it
+MAX_RUNS = 2000
+DEFAULT_THRESHOLD = 0.25  # median slower by more than this fraction → regression
+
+Case = Tuple[str, Callable[[], Any]]
+
+# ===============================
+# Timing
+# ===============================
+def measure(fn: Callable[[], Any]) -> Dict[str, float]:
+    fn()  # warm-up: page cache, statement cache, imports
+    runs: List[float] = []
+    spent = 0.0
+    while len(runs) < MIN_RUNS or (spent < MIN_TIME_SEC and len(runs) < MAX_RUNS):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        runs.append(elapsed)
+        spent += elapsed
+    runs.sort()
+    return {
+        "min_ms": round(runs[0] * 1000, 4),
+        "median_ms": round(statistics.median(runs) * 1000, 4),
+        "p95_ms": round(runs[min(len(runs) - 1, int(len(runs) * 0.95))] * 1000, 4),
+        "runs": len(runs),
+    }
+
+
+@contextlib.contextmanager
+def _rollback_conn(db_path: Path) -> Iterator[sqlite3.Connection]:
+    """Same settings as the DB writer (service/writer.py)."""
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA busy_timeout = 5000")
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def _rolled_back(conn: sqlite3.Connection, op: Callable, *args: Any) -> Callable[[], Any]:
+    """
+    A writer op run in BEGIN … ROLLBACK: every repeat sees the same data.
+    The writer's queue hand-off and COMMIT are not part of the timing.
+    """
+    def run() -> Any:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            return op(conn, *args)
+        finally:
+            conn.execute("ROLLBACK")
+    return run
+
+# ===============================
+# Cases
+# ===============================
+def db_cases(db_path: Path, conn: sqlite3.Connection, work_dir: Path, empty_db: Path, empty_conn: sqlite3.Connection) -> List[Case]:
+    csv_path = work_dir / f"{db_path.stem}.csv"
+    export_csv(csv_path, db_path)
+    channels = CSVParser.parse(csv_path)
+    first_channel = conn.execute("SELECT MIN(id_channel) FROM Channel").fetchone()[0]
+
+    def import_csv_rolled_back() -> None:
+        # import_csv() = CSVParser.parse + _import_op on the writer
+        rows = CSVParser.parse(csv_path)
+        _rolled_back(empty_conn, _import_op, rows)()
+
+    return [
+        ("notification", lambda: Notification(db_path)),
+        ("feed_all", lambda: Feed(db_path, "all")),
+        ("feed_domain", lambda: Feed(db_path, domain_name(1))),
+        ("feed_subdomain", lambda: Feed(db_path, domain_name(1), subdomain_name(1))),
+        ("sidebar", lambda: Sidebar(db_path)),
+        ("setting", lambda: Setting(db_path)),
+        ("write_assign", _rolled_back(conn, _write_op, "assign", domain_name(2), subdomain_name(2), str(first_channel))),
+        ("write_replace_rename", _rolled_back(conn, _write_op, "replace", "domain", domain_name(1), "renamed")),
+        ("write_replace_merge", _rolled_back(conn, _write_op, "replace", "domain", domain_name(1), domain_name(2))),
+        ("delete_batch", _rolled_back(conn, _delete_op, "batch", domain_name(1), None)),
+        ("export_csv", lambda: export_csv(work_dir / "export.csv", db_path)),
+        ("import_csv", import_csv_rolled_back),
+        ("import_csv_parse", lambda: CSVParser.parse(csv_path)),
+        ("import_csv_db", _rolled_back(empty_conn, _import_op, channels)),
+    ]
+
+
+def parse_cases() -> List[Case]:
+    cases: List[Case] = []
+    fixtures = load_fixtures()
+    for name, xml in fixtures.items():
+        cases.append((f"parse_feed:{name}", lambda xml=xml: parse_feed(xml, "bench")))
+    full = parse_feed(fixtures["feed_full.xml"], "bench")
+    timestamps = [v.published for v in full[0]] if full else []
+    cases.append(("predict_ts", lambda: predict_ts(timestamps)))
+    return cases
+
+
+def run(sizes: List[int], only: List[str] | None = None, keep_dir: Path | None = None) -> Dict[str, Any]:
+    results: Dict[str, Dict[str, float]] = {}
+
+    def record(key: str, fn: Callable[[], Any]) -> None:
+        if only and not any(key.startswith(o) for o in only):
+            return
+        with contextlib.redirect_stdout(io.StringIO()):  # importer / exporter print progress
+            results[key] = measure(fn)
+        print(f"  {key:<40} median {results[key]['median_ms']:>10.3f} ms  ({results[key]['runs']} runs)")
+
+    print("fixtures")
+    for name, fn in parse_cases():
+        record(name, fn)
+
+    with tempfile.TemporaryDirectory(prefix="hydra-bench-") as tmp:
+        work_dir = keep_dir or Path(tmp)
+        work_dir.mkdir(parents=True, exist_ok=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            empty_db = work_dir / "empty.db"
+            empty_db.unlink(missing_ok=True)
+            sql_creation(empty_db)
+        for size in sizes:
+            shape = Shape.for_results(size)
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                db_path = make_user_db(work_dir / f"bench_{shape.label}.db", shape)
+            print(f"{shape.label}: {shape.channels} channels, {shape.domains} domains, "
+                  f"{shape.subdomains} subdomains (generated in {time.perf_counter() - started:.1f}s)")
+            with _rollback_conn(db_path) as conn, _rollback_conn(empty_db) as empty_conn:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    cases = db_cases(db_path, conn, work_dir, empty_db, empty_conn)
+                for name, fn in cases:
+                    record(f"{name}@{shape.label}", fn)
+
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "sizes": sizes,
+        },
+        "results": results,
+    }
+
+# ===============================
+# Baseline comparison
+# ===============================
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Tuple[str, float, float, float]]:
+    """Cases whose median got slower than baseline * (1 + threshold): (key, base_ms, now_ms, ratio)."""
+    regressions = []
+    base = baseline.get("results", {})
+    print(f"\n{'case':<40} {'baseline':>12} {'current':>12} {'ratio':>8}")
+    for key, now in current["results"].items():
+        if key not in base:
+            print(f"{key:<40} {'-':>12} {now['median_ms']:>12.3f} {'new':>8}")
+            continue
+        base_ms, now_ms = base[key]["median_ms"], now["median_ms"]
+        ratio = now_ms / base_ms if base_ms else float("inf")
+        flag = "  REGRESSION" if ratio > 1 + threshold else ""
+        print(f"{key:<40} {base_ms:>12.3f} {now_ms:>12.3f} {ratio:>8.2f}{flag}")
+        if flag:
+            regressions.append((key, base_ms, now_ms, ratio))
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the read / write / import / parse hot paths.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Result rows per synthetic DB, e.g. 100,1000,10000,100000")
+    parser.add_argument("--only", help="comma separated case prefixes, e.g. feed,notification,parse_feed")
+    parser.add_argument("--out", type=Path, help="write timings as JSON (e.g. the next baseline)")
+    parser.add_argument("--baseline", type=Path, help="compare against a previous --out file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed median slowdown before a case counts as a regression (0.25 = +25%%)")
+    parser.add_argument("--keep-dbs", type=Path, help="generate the synthetic DBs here and keep them")
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.WARNING)  # fetcher.py configures INFO on import
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    only = [o.strip() for o in args.only.split(",")] if args.only else None
+    report = run(sizes, only, args.keep_dbs)
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nTimings → {args.out}")
+    if args.baseline:
+        regressions = compare(report, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over +{args.threshold:.0%}")
+            return 1
+        print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# ===============================
+# Module Summary
+# ===============================
+"""
+    python -m content_server.bench.run --sizes 100,1000,10000,100000 --out bench/base.json
+    python -m content_server.bench.run --baseline bench/base.json      # exit 1 on regression
+
+Cases (per synthetic DB size, bench/synth.py):
+  - read.Notification, Feed (all / domain / subdomain), Sidebar, Setting
+  - Write assign / replace (rename, merge), Delete batch → writer ops in BEGIN … ROLLBACK
+  - export_csv, import_csv (= CSV parse + import op, also timed separately)
+Size independent:
+  - parse_feed on fixtures/*.xml (feed_fetcher minus the HTTP request), predict_ts
+
+Compare runs from the same machine: the medians are absolute wall times.
+"""
@@ -0,0 +1,141 @@
+from __future__ import annotations
+import random
+import sqlite3
+import time
+from pathlib import Path
+from typing import NamedTuple, Sequence
+
+from ..sql_lite.operation.create import sql_creation
+from .feeds import channel_id, video_id
+
+# ===============================
+# Shape of a synthetic user DB
+# ===============================
+class Shape(NamedTuple):
+    channels: int
+    domains: int
+    subdomains: int
+    results: int
+
+    @classmethod
+    def for_results(cls, results: int, domains: int = 8, subdomains: int = 24) -> "Shape":
+        """~50 results per channel, like a feed kept for a couple of weeks."""
+        return cls(max(5, min(5000, results // 50)), domains, subdomains, results)
+
+    @property
+    def label(self) -> str:
+        return f"{self.results}r"
+
+
+def domain_name(i: int) -> str:
+    return f"domain-{i}"
+
+
+def subdomain_name(i: int) -> str:
+    return f"sub-{i}"
+
+# ===============================
+# Generator
+# ===============================
+QUERIES = {
+    "insert_domain": "INSERT INTO Domains (id_domain, domain_name) VALUES (?, ?)",
+    "insert_subdomain": "INSERT INTO SubDomains (id_subdomain, subdomain_name) VALUES (?, ?)",
+    "insert_channel": """
+        INSERT INTO Channel (id_channel, channel_name, channel_url, id_domain, id_subdomain)
+        VALUES (?, ?, ?, ?, ?)
+    """,
+    "insert_tracking": """
+        INSERT INTO Channels (rss_id, last_video_id, ts, ts_read, rank, counter, id_channel)
+        VALUES (?, ?, ?, ?, ?, 0, ?)
+    """,
+    "insert_result": """
+        INSERT OR IGNORE INTO Result (video_id, title, channel_id, published, seen, seen_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """,
+}
+
+
+def make_user_db(
+    path: Path,
+    shape: Shape,
+    seed: int = 1,
+    now: float | None = None,
+    rss_ids: Sequence[str] | None = None,
+) -> Path:
+    """
+    Fresh DB with the production schema (create.py → triggers, read models
+    included), filled through the same tables the app writes.
+    ~1 in 10 channels is uncategorized, ~1 in 5 results is already seen.
+    rss_ids pins the channels (e.g. the ones a fake feed server knows), else random.
+    """
+    path = Path(path)
+    path.unlink(missing_ok=True)
+    sql_creation(path)
+    rng = random.Random(seed)
+    now = now or time.time()
+    if rss_ids is not None:
+        shape = shape._replace(channels=len(rss_ids))
+
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA foreign_keys = ON")
+        with conn:
+            conn.executemany(QUERIES["insert_domain"],
+                             [(i, domain_name(i)) for i in range(1, shape.domains + 1)])
+            conn.executemany(QUERIES["insert_subdomain"],
+                             [(i, subdomain_name(i)) for i in range(1, shape.subdomains + 1)])
+
+            channels, tracking = [], []
+            for i in range(1, shape.channels + 1):
+                rss_id = rss_ids[i - 1] if rss_ids is not None else channel_id(rng)
+                categorized = rng.random() >= 0.1
+                channels.append((
+                    i, f"Channel {i}", f"https://www.youtube.com/channel/{rss_id}",
+                    rng.randint(1, shape.domains) if categorized and shape.domains else None,
+                    rng.randint(1, shape.subdomains) if categorized and shape.subdomains else None,
+                ))
+                ts = int(now + rng.uniform(-3600, 7 * 86400))
+                tracking.append((rss_id, None, ts, time.strftime("%Y-%m-%d %H:%M", time.localtime(ts)),
+                                 rng.choice(["day", "dual", "week", "month"]), i))
+            conn.executemany(QUERIES["insert_channel"], channels)
+            conn.executemany(QUERIES["insert_tracking"], tracking)
+
+            results = []
+            for _ in range(shape.results):
+                published = int(now - rng.uniform(0, 30 * 86400))
+                seen = rng.random() < 0.2
+                results.append((
+                    video_id(rng), f"Synthetic video {rng.getrandbits(32):08x}",
+                    rng.randint(1, max(1, shape.channels)), published,
+                    int(seen), int(now - rng.uniform(0, 86400)) if seen else None,
+                ))
+            conn.executemany(QUERIES["insert_result"], results)
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+    return path
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Generate a synthetic user DB.")
+    parser.add_argument("out", type=Path)
+    parser.add_argument("--results", type=int, default=10000)
+    parser.add_argument("--channels", type=int)
+    parser.add_argument("--domains", type=int, default=8)
+    parser.add_argument("--subdomains", type=int, default=24)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    shape = Shape.for_results(args.results, args.domains, args.subdomains)
+    if args.channels:
+        shape = shape._replace(channels=args.channels)
+    print(make_user_db(args.out, shape, args.seed), shape)
+
+# ===============================
+# Module Summary
+# ===============================
+"""
+Synthetic content/{username}.db files for the benchmarks (100 → 100k Result rows).
+    python -m content_server.bench.synth /tmp/u.db --results 100000
+Deterministic for a given seed, so runs compare against a stored baseline.
+"""
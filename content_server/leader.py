@@ -0,0 +1,157 @@
+from __future__ import annotations
+import asyncio
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+try:  # Unix only; without it there is one process and it always leads
+    import fcntl
+except ImportError:  # pragma: no cover - Windows dev boxes
+    fcntl = None
+
+from .saved import path as content_dir
+
+log = logging.getLogger(__name__)
+
+# ===============================
+# Settings
+# ===============================
+LEADER_LOCK_FILE = Path(os.environ.get("HYDRA_LEADER_LOCK", content_dir / ".scheduler.lock"))
+MIGRATE_LOCK_FILE = Path(os.environ.get("HYDRA_MIGRATE_LOCK", content_dir / ".migrate.lock"))
+LEADER_RETRY_SEC = float(os.environ.get("HYDRA_LEADER_RETRY_SEC", 5))   # failover delay upper bound
+API_WORKERS = int(os.environ.get("HYDRA_WORKERS", 1))                   # as passed to fastapi run --workers
+
+# ===============================
+# OS file lock
+# ===============================
+class FileLock:
+    """
+    flock() on a file in content/. The kernel drops it when the holding
+    process exits, however it exits → no stale locks after a crash / OOM kill.
+    The holder's pid is written into the file for /status/leader.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self, blocking: bool = False) -> bool:
+        if self._fd is not None:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                os.close(fd)
+                return False
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+
+    def holder(self) -> Optional[int]:
+        try:
+            return int(self.path.read_text().strip() or 0) or None
+        except (OSError, ValueError):
+            return None
+
+
+def run_exclusive(lock_path: Path | str, fn: Callable[..., Any], *args: Any) -> Any:
+    """fn(*args) while holding the lock, waiting for it if another worker has it (blocking: run in a thread)."""
+    lock = FileLock(lock_path)
+    lock.acquire(blocking=True)
+    try:
+        return fn(*args)
+    finally:
+        lock.release()
+
+# ===============================
+# Scheduler leadership
+# ===============================
+Job = Callable[[], Awaitable[Any]]
+
+
+class SchedulerLeader:
+    """
+    Exactly one worker process runs the background jobs (feed schedulers,
+    retention). Every worker calls run(); the one that gets the lock runs the
+    jobs, the others retry every LEADER_RETRY_SEC and take over if it dies.
+    """
+
+    def __init__(self, lock_path: Path | str = LEADER_LOCK_FILE, retry_sec: float = LEADER_RETRY_SEC) -> None:
+        self.lock = FileLock(lock_path)
+        self.retry_sec = retry_sec
+        self.since: Optional[float] = None
+
+    async def run(self, *jobs: Job) -> None:
+        while not self.lock.acquire():
+            await asyncio.sleep(self.retry_sec)
+        self.since = time.time()
+        log.info("Worker %d is the scheduler leader (%s), starting %d job(s)",
+                 os.getpid(), self.lock.path, len(jobs))
+        try:
+            results = await asyncio.gather(*(job() for job in jobs), return_exceptions=True)
+            for job, result in zip(jobs, results):
+                if isinstance(result, BaseException):
+                    log.error("Leader job %r died: %r", job, result)
+            await asyncio.Event().wait()   # jobs that return still keep the lock: no second leader
+        finally:
+            self.lock.release()
+            self.since = None
+            log.info("Worker %d released scheduler leadership", os.getpid())
+
+    def worker(self) -> dict:
+        """Tag for per-process state (throttle, budget, writers…): which worker answered."""
+        return {"pid": os.getpid(), "leader": self.lock.held, "workers": API_WORKERS}
+
+    def status(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "leader": self.lock.held,
+            "leader_since": self.since,
+            "leader_pid": os.getpid() if self.lock.held else self.lock.holder(),
+            "lock_file": str(self.lock.path),
+        }
+
+
+scheduler_leader = SchedulerLeader()
+
+# ===============================
+# Module Summary
+# ===============================
+"""
+Multi-worker serving (fastapi run --workers N): every worker answers the API,
+only the lock holder polls YouTube and runs retention.
+
+  - content/.migrate.lock   → blocking: workers migrate one after the other,
+                              the first does the work, the rest find the DBs current
+  - content/.scheduler.lock → non-blocking: leader = whoever holds it;
+                              followers retry every HYDRA_LEADER_RETRY_SEC
+  - Leader dies → kernel releases the flock → a follower takes over within retry_sec
+
+Wired in main.py's lifespan. GET /status/leader shows the answering worker's view.
+
+Per process, not shared (every status response carries scheduler_leader.worker()):
+  - throttle / breaker / budget allocation: the leader's are the scheduler's; a
+    follower's only pace the CSV bulk polls it answers → with HYDRA_WORKERS > 1 set
+    HYDRA_FETCH_QUEUE so those go through the fetch workers' throttle instead
+  - per-DB writer: one per worker, SQLite's file lock (busy_timeout) orders them
+  - metrics counters: per worker, hydra_worker_leader{pid} tells scrapes apart
+HYDRA_WORKERS defaults to 1, where none of this applies.
+"""
@@ -1,37 +1,82 @@
 from fastapi import FastAPI, HTTPException, APIRouter, UploadFile, File, Path
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
+from contextlib import asynccontextmanager
 from typing import Optional
 import logging
 import asyncio
+import functools
+import os
 
 # Your project imports
 from .saved import path as p
 # Sql lite service
 from .sql_lite.operation.create import sql_creation
+from .sql_lite.operation.migrate import migrate_all
 from .sql_lite.service.csv_import import import_csv
 from .sql_lite.service.csv_export import export_csv
 from .sql_lite.operation.read import resolve_component, ComponentType
 from .sql_lite.operation.write import Write
 from .sql_lite.operation.delete import Delete
+from .sql_lite.service.retention import run_retention_worker
+from .sql_lite.service.archive import query_archive
+from .sql_lite.operation.poll_log import query_polls
+from .sql_lite.service.writer import writer_stats
 
 from .youtube.bulk import run_batch# ← this is an async function!
-from .youtube.timmer import start_feed_processors # async function!
+from .youtube.timmer import start_feed_processors, scheduler_lag # async function!
+from .youtube.feed.throttle import throttle
+from .youtube.feed.resilience import breaker
+from .youtube.feed.parse_pool import parse_pool
+from .youtube.feed.leveller import projected_polls
+from .youtube.budget import budget, run_budget_allocator
+from .youtube.feed.processor import insert_totals
+from .youtube.jobs import fetch_queue
+from . import metrics
+from .profiler import profiler
+from .leader import API_WORKERS, MIGRATE_LOCK_FILE, run_exclusive, scheduler_leader
 
 
 # Logging
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Every user DB reaches the current schema version before anything touches it.
+    # Workers take turns on the lock → the first migrates, the others find nothing to do.
+    await asyncio.to_thread(run_exclusive, MIGRATE_LOCK_FILE, migrate_all, p)
+    # Read-only, so every worker can answer them, not just the leader
+    metrics.SCHEDULER_LAG.collect = functools.partial(scheduler_lag, p)
+    metrics.WORKER_LEADER.collect = lambda: {(str(os.getpid()),): float(scheduler_leader.lock.held)}
+    if API_WORKERS > 1 and not fetch_queue.enabled:
+        log.warning("HYDRA_WORKERS=%d without HYDRA_FETCH_QUEUE: CSV bulk polls are paced by the "
+                    "throttle of whichever worker takes the upload, next to the leader's", API_WORKERS)
+    # One worker (file lock in content/) polls YouTube and runs retention; the rest only serve.
+    # The budget allocation is computed in every worker: bulk polls clamp against it too
+    leadership = asyncio.create_task(scheduler_leader.run(
+        functools.partial(start_feed_processors, p),
+        functools.partial(run_retention_worker, p),
+    ))
+    allocator = asyncio.create_task(run_budget_allocator(p))
+    try:
+        yield
+    finally:
+        leadership.cancel()
+        allocator.cancel()
+        await asyncio.gather(leadership, allocator, return_exceptions=True)
+        parse_pool.shutdown()
+
 app = FastAPI(
     title="YouTube Batch Processor API",
     version="1.0",
-    description="Multi-tool API: DB init • CSV ↔ SQLite • YouTube bulk processing"
+    description="Multi-tool API: DB init • CSV ↔ SQLite • YouTube bulk processing",
+    lifespan=lifespan,
 )
-asyncio.get_event_loop().create_task(start_feed_processors(p))
 # ----------- Router for CSV services -----------
 router = APIRouter()
 
 @router.post("/csv/{service}/{name}", summary="Import CSV → DB (+YouTube) or Export DB → CSV")
+@profiler.route("csv")
 async def csv_to_sql(
     name: str = Path(..., description="Username / identifier"),
     service: str = Path(..., description="Service type: 'import' or 'export'"),
@@ -94,8 +139,8 @@ async def csv_to_sql(
             file_size = Path_csv.stat().st_size
             log.info(f"CSV file successfully saved as {Path_csv} (size: {file_size} bytes)")
 
-            # Proceed with import
-            imported_rows = import_csv(Path_csv, Path_db)
+            # Proceed with import: CSV parsing + waiting on the DB's writer stay off the event loop
+            imported_rows = await asyncio.to_thread(import_csv, Path_csv, Path_db)
             log.info(f"Imported {imported_rows or 0} rows from CSV")
 
             log.info("Starting YouTube batch processing...")
@@ -177,6 +222,7 @@ async def auth_handler(mode: str, username: str):
 @app.get("/dashboard/{username}")
 @app.get("/dashboard/{username}/{domain}")
 @app.get("/dashboard/{username}/{domain}/{subdomain}")
+@profiler.route("dashboard")
 async def dashboard_handler(
     username: str,
     domain: str | None = None,
@@ -201,10 +247,42 @@ async def dashboard_handler(
         subdomain=subdomain,
     )
 
+# ----------- Archive (seen videos, cold tier) -----------
+@app.get("/archive/{username}", summary="Seen videos moved out of the feed, by channel and month")
+async def archive_handler(
+    username: str,
+    channel: str | None = None,
+    month: str | None = None,
+    limit: int = 100,
+):
+    db_path = p / f"{username}.db"
+    if not db_path.is_file():
+        raise HTTPException(status_code=404, detail=f"User database not found: {username}")
+    try:
+        return query_archive(db_path, channel=channel, month=month, limit=max(1, min(limit, 1000)))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# ----------- Poll history (scheduler tuning) -----------
+@app.get("/debug/{username}/polls", summary="Recent feed polls: timings, HTTP status, outcome, rank/ts before and after")
+async def polls_handler(
+    username: str,
+    rss_id: str | None = None,
+    outcome: str | None = None,
+    since: int | None = None,
+    until: int | None = None,
+    limit: int = 100,
+):
+    db_path = p / f"{username}.db"
+    if not db_path.is_file():
+        raise HTTPException(status_code=404, detail=f"User database not found: {username}")
+    return query_polls(db_path, rss_id=rss_id, outcome=outcome, since=since, until=until, limit=limit)
+
 # ----------- Settings -----------
 @app.get("/setting/{username}")
 @app.get("/setting/{username}/{operation}/{a}/{b}")
 @app.get("/setting/{username}/{operation}/{a}/{b}/{c}")
+@profiler.route("setting")
 async def setting_endpoint(
     username: str,
     operation: str | None = None,
@@ -228,7 +306,7 @@ async def setting_endpoint(
         )
     elif operation:
         log.info(f"[WRITE] operation={operation} for user={username}")
-        Write(
+        await Write(
             username=username,
             db_dir=p,
             operation=operation,
@@ -238,3 +316,65 @@ async def setting_endpoint(
         )
 
     return resolve_component(username, p, ComponentType.SETTING)
+
+# ----------- Fetch pipeline status -----------
+@app.get("/status/throttle", summary="Current adaptive request rate, concurrency, circuit state and parse pool")
+async def throttle_status():
+    return {
+        "throttle": throttle.snapshot(),
+        "circuit": breaker.snapshot(),
+        "parse_pool": parse_pool.status(),
+        "worker": scheduler_leader.worker(),
+    }
+
+@app.get("/status/leader", summary="Which worker process owns the feed schedulers (per answering worker)")
+async def leader_status():
+    return scheduler_leader.status()
+
+@app.get("/status/fetch-queue", summary="Fetch worker pool: queue backend, live workers and jobs by state")
+async def fetch_queue_status():
+    return await asyncio.to_thread(fetch_queue.status)
+
+@app.get("/status/budget", summary="Daily request budget and its per-user fair shares")
+async def budget_status():
+    return {**budget.snapshot(), "worker": scheduler_leader.worker()}
+
+@app.get("/status/ingest", summary="Video inserts vs duplicates, and group-commit stats per DB writer")
+async def ingest_status():
+    return {
+        "videos": insert_totals(),
+        "writers": writer_stats(),
+        "worker": scheduler_leader.worker(),
+    }
+
+@app.get("/metrics", summary="Prometheus text exposition: fetch / parse / DB / scheduler hot paths",
+         response_class=PlainTextResponse)
+async def metrics_endpoint():
+    # Collectors read every user DB (scheduler lag) → off the event loop
+    return PlainTextResponse(await asyncio.to_thread(metrics.render), media_type="text/plain; version=0.0.4")
+
+@app.get("/admin/profiler", summary="Sampling profiler state and the collapsed-stack files written so far")
+async def profiler_status():
+    return profiler.status()
+
+@app.post("/admin/profiler", summary="Set the sampled fraction of requests / scheduler batches (0 = off), optionally flush")
+async def profiler_control(rate: float | None = None, flush: bool = False):
+    if rate is not None:
+        if not 0.0 <= rate <= 1.0:
+            raise HTTPException(status_code=400, detail="rate must be between 0 and 1")
+        profiler.set_rate(rate)   # every API worker follows within a second
+        log.info("Profiler sample rate set to %.3f", rate)
+    written = profiler.flush() if flush else []
+    return {**profiler.status(), "flushed": [f.name for f in written]}
+
+@app.get("/status/schedule", summary="Projected polls per hour across every user DB")
+@app.get("/status/schedule/{username}", summary="Projected polls per hour for one user")
+async def schedule_status(username: str | None = None, hours: int = 48):
+    if username is None:
+        db_paths = sorted(p.glob("*.db"))
+    else:
+        db_path = p / f"{username}.db"
+        if not db_path.is_file():
+            raise HTTPException(status_code=404, detail=f"User database not found: {username}")
+        db_paths = [db_path]
+    return projected_polls(db_paths, hours=max(1, min(hours, 24 * 60)))
@@ -0,0 +1,181 @@
+from __future__ import annotations
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Tuple
+
+# ===============================
+# Prometheus text exposition (format 0.0.4), no client library needed
+# ===============================
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _num(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.label_names = labels
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def values(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> list[str]:
+        return self.header() + [
+            f"{self.name}{_labels(self.label_names, key)} {_num(v)}" for key, v in sorted(self.values().items())
+        ]
+
+
+class Gauge(_Metric):
+    """Values come from a callback evaluated at scrape time: () → {label values: value}."""
+    kind = "gauge"
+
+    def __init__(self, *args, collect: Callable[[], Dict[LabelValues, float]] | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.collect = collect
+
+    def render(self) -> list[str]:
+        values = self.collect() if self.collect else {}
+        return self.header() + [
+            f"{self.name}{_labels(self.label_names, key)} {_num(v)}" for key, v in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[LabelValues, list] = {}   # key → [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[Dict[str, str]]:
+        """Times the block; labels may be filled in inside it (e.g. the outcome)."""
+        started = time.perf_counter()
+        late = dict(labels)
+        try:
+            yield late
+        finally:
+            self.observe(time.perf_counter() - started, **late)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        lines = self.header()
+        for key, values in sorted(series.items()):
+            for bound, count in zip(self.buckets, values):
+                le = 'le="%s"' % _num(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {values[-2]!r}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {values[-1]}")
+        return lines
+
+# ===============================
+# Registry
+# ===============================
+_registry: list[_Metric] = []
+
+
+def _register(metric):
+    _registry.append(metric)
+    return metric
+
+
+def render() -> str:
+    lines: list[str] = []
+    for metric in _registry:
+        try:
+            lines.extend(metric.render())
+        except Exception as e:  # one broken collector must not hide the rest
+            lines.append(f"# {metric.name} collection failed: {_escape(str(e))}")
+    return "\n".join(lines) + "\n"
+
+# ===============================
+# Hot-path metrics
+# ===============================
+FETCH_SECONDS = _register(Histogram(
+    "hydra_feed_fetch_seconds", "HTTP time of one RSS feed request (throttle wait excluded)", ("outcome",)))
+PARSE_SECONDS = _register(Histogram(
+    "hydra_feed_parse_seconds", "feedparser + Video building time per feed"))
+SAVE_SECONDS = _register(Histogram(
+    "hydra_save_data_seconds", "processor._save_data time per channel with new videos"))
+COMPONENT_SECONDS = _register(Histogram(
+    "hydra_resolve_component_seconds", "Dashboard component build time", ("component",)))
+POLLS = _register(Counter(
+    "hydra_polls_total", "Feed polls applied to a user DB, by outcome", ("outcome",)))
+VIDEOS_SAVED = _register(Counter(
+    "hydra_videos_saved_total", "Videos offered to Result: inserted or ignored as duplicate", ("result",)))
+SCHEDULER_LAG = _register(Gauge(
+    "hydra_scheduler_lag_seconds", "now - earliest Channels.ts per user DB (0 when nothing is overdue)", ("db",)))
+WORKER_LEADER = _register(Gauge(
+    "hydra_worker_leader", "1 if the API worker answering this scrape runs the schedulers, else 0", ("pid",)))
+
+# ===============================
+# Module Summary
+# ===============================
+"""
+GET /metrics (main.py) → render(). Scrape it locally:
+    curl -s localhost:8000/metrics
+
+Instrumented:
+  - fetcher.feed_fetcher     → FETCH_SECONDS{outcome}, PARSE_SECONDS (parse_feed)
+  - processor._save_data     → SAVE_SECONDS, VIDEOS_SAVED{result}
+  - processor.apply_batch    → POLLS{outcome=new|old|empty|error}, error includes polls that raised
+  - read.resolve_component   → COMPONENT_SECONDS{component}
+  - timmer.scheduler_lag     → SCHEDULER_LAG{db} collected at scrape time, by any worker
+  - main.py lifespan         → WORKER_LEADER{pid}: counters and histograms are per
+                               API worker, this tells which one a scrape reached
+"""
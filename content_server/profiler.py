@@ -0,0 +1,272 @@
+from __future__ import annotations
+import atexit
+import functools
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from .saved import path as content_dir
+
+log = logging.getLogger(__name__)
+
+# ===============================
+# Settings
+# ===============================
+PROFILE_RATE = float(os.environ.get("HYDRA_PROFILE_RATE", 0.0))                 # fraction sampled, 0 = off
+PROFILE_INTERVAL_MS = float(os.environ.get("HYDRA_PROFILE_INTERVAL_MS", 10))    # stack sample period
+PROFILE_FLUSH_SEC = float(os.environ.get("HYDRA_PROFILE_FLUSH_SEC", 60))
+PROFILE_KEEP = int(os.environ.get("HYDRA_PROFILE_KEEP", 24))                    # files kept per label
+PROFILE_DIR = Path(os.environ.get("HYDRA_PROFILE_DIR", content_dir / "profiles"))
+# Runtime rate set through /admin/profiler, shared by every API worker process
+PROFILE_RATE_FILE = Path(os.environ.get("HYDRA_PROFILE_RATE_FILE", content_dir / ".profiler_rate"))
+RATE_CHECK_SEC = 1.0                # how often a worker looks for a new shared rate
+
+
+def _frame_name(code) -> str:
+    file = Path(code.co_filename)
+    return f"{file.parent.name}/{file.stem}:{code.co_name}"
+
+
+def _collapse(frame) -> str:
+    """Root-first "pkg/module:func;..." — the collapsed-stack format of flamegraph.pl / speedscope."""
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+# ===============================
+# Sampling profiler
+# ===============================
+class SamplingProfiler:
+    """
+    Threads register while they run a sampled unit of work (API request,
+    timmer batch, bulk channel). One background thread reads their stacks
+    through sys._current_frames() every interval → no tracing hooks, the
+    profiled code runs at full speed between samples.
+    """
+
+    def __init__(self, rate: float, interval_ms: float, out_dir: Path, keep: int, flush_sec: float,
+                 rate_file: Path | None = None) -> None:
+        self.rate = rate
+        self.rate_file = rate_file
+        # A rate file left by an earlier run is ignored: HYDRA_PROFILE_RATE wins at start
+        self._rate_mtime = self._mtime()
+        self._rate_checked = time.monotonic()
+        self.interval = interval_ms / 1000
+        self.out_dir = out_dir
+        self.keep = max(1, keep)
+        self.flush_sec = flush_sec
+        self._lock = threading.Lock()
+        self._active: dict[int, str] = {}           # thread id → label
+        self._claims: dict[int, list[tuple[object, str]]] = {}   # thread id → open profile() calls, in start order
+        self._stacks: dict[str, Counter] = {}       # label → {collapsed stack: samples}
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._last_flush = time.monotonic()
+        self.samples = 0
+
+    # ---------- Shared rate
+    def _mtime(self) -> float | None:
+        try:
+            return self.rate_file.stat().st_mtime_ns if self.rate_file else None
+        except OSError:
+            return None
+
+    def _sync_rate(self) -> None:
+        """Pick up a rate another worker set (one stat per RATE_CHECK_SEC)."""
+        now = time.monotonic()
+        if self.rate_file is None or now - self._rate_checked < RATE_CHECK_SEC:
+            return
+        self._rate_checked = now
+        mtime = self._mtime()
+        if mtime is None or mtime == self._rate_mtime:
+            return
+        try:
+            self.rate = float(self.rate_file.read_text().strip())
+        except (OSError, ValueError):
+            return
+        self._rate_mtime = mtime
+        log.info("Profiler sample rate %.3f picked up from %s", self.rate, self.rate_file)
+
+    def set_rate(self, rate: float) -> None:
+        """Set the rate here and, through rate_file, in every other worker within RATE_CHECK_SEC."""
+        self.rate = rate
+        if self.rate_file is None:
+            return
+        try:
+            self.rate_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.rate_file.with_name(f"{self.rate_file.name}.{os.getpid()}")
+            tmp.write_text(f"{rate}\n")
+            os.replace(tmp, self.rate_file)
+            self._rate_mtime = self._mtime()
+        except OSError:
+            log.exception("Could not share the profiler rate through %s", self.rate_file)
+
+    # ---------- Deciding / registering
+    def should_sample(self) -> bool:
+        self._sync_rate()
+        return self.rate > 0 and random.random() < self.rate
+
+    @contextmanager
+    def profile(self, label: str, sampled: bool | None = None) -> Iterator[bool]:
+        """Sample the current thread for the duration of the block (if picked)."""
+        if sampled is None:
+            sampled = self.should_sample()
+        if not sampled:
+            yield False
+            return
+        tid = threading.get_ident()
+        token = object()
+        with self._lock:
+            self._claims.setdefault(tid, []).append((token, label))
+            self._active[tid] = label
+            self._ensure_thread()
+        self._wake.set()
+        try:
+            yield True
+        finally:
+            # Coroutines on the event loop thread overlap instead of nesting → they can
+            # finish in any order: drop only this call's claim, the newest open one labels
+            with self._lock:
+                claims = [claim for claim in self._claims.get(tid, []) if claim[0] is not token]
+                if claims:
+                    self._claims[tid] = claims
+                    self._active[tid] = claims[-1][1]
+                else:
+                    self._claims.pop(tid, None)
+                    self._active.pop(tid, None)
+
+    def bind(self, label: str, fn: Callable, sampled: bool = True) -> Callable:
+        """fn, profiled under `label` in whichever thread ends up running it."""
+        if not sampled:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with self.profile(label, True):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def follow(self, fn: Callable) -> Callable:
+        """Carry the current thread's profiling over to another thread (e.g. a writer op)."""
+        label = self._active.get(threading.get_ident())
+        return fn if label is None else self.bind(label, fn)
+
+    def route(self, label: str) -> Callable:
+        """
+        Decorator for async FastAPI handlers. The event loop thread is sampled,
+        so concurrently running coroutines can show up in the same profile.
+        """
+        def decorator(fn: Callable) -> Callable:
+            @functools.wraps(fn)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.profile(label):
+                    return await fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    # ---------- Sampler thread
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while True:
+            with self._lock:
+                active = dict(self._active)
+            if not active:
+                # Idle: nothing to sample → sleep until a profiled unit starts
+                self._wake.wait(timeout=self.flush_sec)
+                self._wake.clear()
+            else:
+                frames = sys._current_frames()
+                with self._lock:
+                    for tid, label in active.items():
+                        frame = frames.get(tid)
+                        if frame is not None and tid != own:
+                            self._stacks.setdefault(label, Counter())[_collapse(frame)] += 1
+                            self.samples += 1
+                del frames
+                time.sleep(self.interval)
+            if time.monotonic() - self._last_flush >= self.flush_sec:
+                self.flush()
+
+    # ---------- Output
+    def flush(self) -> list[Path]:
+        """Write one <label>-<timestamp>-<pid>.collapsed per label, keep the newest PROFILE_KEEP."""
+        with self._lock:
+            stacks, self._stacks = self._stacks, {}
+            self._last_flush = time.monotonic()
+        if not stacks:
+            return []
+        written: list[Path] = []
+        try:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            for label, counts in stacks.items():
+                out = self.out_dir / f"{label}-{stamp}-{os.getpid()}.collapsed"   # one file per worker
+                with open(out, "a", encoding="utf-8") as f:
+                    for stack, count in counts.most_common():
+                        f.write(f"{stack} {count}\n")
+                written.append(out)
+                for old in sorted(self.out_dir.glob(f"{label}-*.collapsed"))[:-self.keep]:
+                    old.unlink(missing_ok=True)
+        except OSError:
+            log.exception("Profile flush to %s failed", self.out_dir)
+        return written
+
+    def status(self) -> dict:
+        self._sync_rate()
+        with self._lock:
+            pending = {label: sum(c.values()) for label, c in self._stacks.items()}
+            active = len(self._active)
+        files = sorted(p.name for p in self.out_dir.glob("*.collapsed")) if self.out_dir.is_dir() else []
+        return {
+            "rate": self.rate,
+            "pid": os.getpid(),
+            "interval_ms": self.interval * 1000,
+            "flush_sec": self.flush_sec,
+            "active_threads": active,
+            "samples_total": self.samples,
+            "pending_samples": pending,
+            "dir": str(self.out_dir),
+            "files": files,
+        }
+
+
+profiler = SamplingProfiler(PROFILE_RATE, PROFILE_INTERVAL_MS, PROFILE_DIR, PROFILE_KEEP, PROFILE_FLUSH_SEC,
+                            PROFILE_RATE_FILE)
+atexit.register(profiler.flush)
+
+# ===============================
+# Module Summary
+# ===============================
+"""
+Opt-in, production-safe: HYDRA_PROFILE_RATE=0.05 at start, or at runtime
+    POST /admin/profiler?rate=0.05     (rate=0 turns it off, flush=true writes now)
+    GET  /admin/profiler               → status + files
+
+With several API workers the rate goes through content/.profiler_rate and every
+worker applies it within RATE_CHECK_SEC; flush=true only flushes the answering
+worker, the others write on their own PROFILE_FLUSH_SEC timer.
+
+Sampled units (each picked with probability `rate`):
+  - API: dashboard_handler, setting_endpoint, csv_to_sql (profiler.route)
+  - timmer.dispatch_batch: fetch threads + the apply_batch writer op
+  - bulk: process_feed per channel (+ its writer op through follow())
+
+Output: content/profiles/<label>-<YYYYmmdd-HHMMSS>-<pid>.collapsed, "stack count" lines
+    flamegraph.pl dashboard-*.collapsed > dashboard.svg   (or drop into speedscope)
+Frames read "pkg/module:func" → feedparser/api:parse, pydantic/main:__init__,
+sql_lite/read:... make the feedparser / pydantic / sqlite split visible.
+"""
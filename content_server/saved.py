@@ -1,5 +1,7 @@
+import os
 from pathlib import Path
 
 # Absolute path inside the container (matches the volume mount)
-path = path = Path(__file__).resolve().parents[1] / "content"
+# HYDRA_CONTENT_DIR points a server at another set of user DBs (load tests, staging copies)
+path = path = Path(os.environ.get("HYDRA_CONTENT_DIR", Path(__file__).resolve().parents[1] / "content"))
 print(path)
@@ -0,0 +1,96 @@
+import re
+import sqlite3
+from datetime import datetime
+from typing import Any
+
+# Result stores only the 11-char video id; everything URL-shaped is rebuilt here.
+_VIDEO_ID = re.compile(r"(?:v=|/vi/|youtu\.be/|/shorts/|yt:video:)([0-9A-Za-z_-]{11})")
+
+def video_id_of(value: str | None) -> str | None:
+    """Video id from a watch / shorts / thumbnail URL; bare ids pass through."""
+    if not value:
+        return value
+    match = _VIDEO_ID.search(value)
+    return match.group(1) if match else value
+
+def watch_url(video_id: str) -> str:
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+def thumbnail_url(video_id: str) -> str:
+    return f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
+
+def published_epoch(value: Any) -> int | None:
+    """ISO 8601 (what the RSS feed gives) → Unix seconds."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return int(datetime.fromisoformat(str(value)).timestamp())
+    except ValueError:
+        return None
+
+# ===============================
+# Migration: URL-keyed Result → id-keyed WITHOUT ROWID Result
+# ===============================
+RESULT_DDL = """
+CREATE TABLE IF NOT EXISTS {name} (
+    video_id      TEXT PRIMARY KEY,               -- 11-char YouTube id, URLs rebuilt at read time
+    title         TEXT NOT NULL,
+    channel_id    INTEGER NOT NULL,
+    published     INTEGER,                        -- Unix ts (seconds) of upload
+    seen          INTEGER DEFAULT 0,              -- 0 is false, 1 is true. 2 hour delete feature
+    seen_at       INTEGER,                        -- Unix ts of marking seen, retention clock
+    FOREIGN KEY (channel_id) REFERENCES Channel(id_channel)
+        ON DELETE CASCADE
+) WITHOUT ROWID
+"""
+
+RESULT_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_result_channel   ON Result(channel_id)",
+    "CREATE INDEX IF NOT EXISTS idx_result_published ON Result(published)",
+    "CREATE INDEX IF NOT EXISTS idx_result_seen_at   ON Result(seen_at)",
+    # Per-channel uploads in a time window (catchup / budget upload rate), covering
+    "CREATE INDEX IF NOT EXISTS idx_result_channel_published ON Result(channel_id, published)",
+]
+
+def is_compact(con: sqlite3.Connection) -> bool:
+    columns = {row[1] for row in con.execute("PRAGMA table_info(Result)")}
+    return not columns or "video_id" in columns
+
+def migrate_result_compact(con: sqlite3.Connection) -> int:
+    """
+    Rebuild a legacy Result (video_url TEXT PK + thumbnail + published_at TEXT)
+    in the compact layout. Idempotent; returns the number of rows copied.
+    Caller must run this with foreign_keys OFF and commit afterwards.
+    """
+    if is_compact(con):
+        return 0
+    columns = {row[1] for row in con.execute("PRAGMA table_info(Result)")}
+    seen_at = "seen_at" if "seen_at" in columns else "NULL"
+
+    con.create_function("video_id_of", 1, video_id_of, deterministic=True)
+    con.create_function("published_epoch", 1, published_epoch, deterministic=True)
+    con.execute("DROP TABLE IF EXISTS Result_compact")
+    con.execute(RESULT_DDL.format(name="Result_compact"))
+    cur = con.execute(f"""
+        INSERT OR IGNORE INTO Result_compact (video_id, title, channel_id, published, seen, seen_at)
+        SELECT video_id_of(video_url), title, channel_id, published_epoch(published_at), seen, {seen_at}
+        FROM Result
+    """)
+    copied = cur.rowcount
+    con.execute("DROP TABLE Result")
+    con.execute("ALTER TABLE Result_compact RENAME TO Result")
+    for stmt in RESULT_INDEXES:
+        con.execute(stmt)
+    return copied
+
+"""
+Layout:
+  - Result keyed by the 11-char video id (WITHOUT ROWID) → no rowid b-tree,
+    no duplicated URL / thumbnail strings, published as an integer
+  - watch_url / thumbnail_url rebuild what the frontend needs at read time
+
+Imported by:
+  - migrate.py (startup), read.py, processor.py, archive.py
+"""
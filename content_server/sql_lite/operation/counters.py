@@ -0,0 +1,145 @@
+from __future__ import annotations
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+
+# ===============================
+# Schema: one row per domain (0 = uncategorized), kept current by triggers
+# ===============================
+DOMAIN_COUNTS_DDL: list[str] = [
+    """
+    CREATE TABLE IF NOT EXISTS DomainCounts (
+        domain_key    INTEGER PRIMARY KEY,            -- Domains.id_domain, 0 when the channel has none
+        count         INTEGER NOT NULL DEFAULT 0      -- Result rows of channels in this domain
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_domaincounts_result_insert
+    AFTER INSERT ON Result
+    WHEN EXISTS (SELECT 1 FROM Channel WHERE id_channel = NEW.channel_id)
+    BEGIN
+        INSERT INTO DomainCounts (domain_key, count)
+        VALUES ((SELECT COALESCE(id_domain, 0) FROM Channel WHERE id_channel = NEW.channel_id), 1)
+        ON CONFLICT(domain_key) DO UPDATE SET count = count + 1;
+    END
+    """,
+    """
+    -- Cascade deletes from Channel run after the parent row is gone → handled by
+    -- the Channel trigger below, this one only sees direct deletes (retention, cleanup).
+    CREATE TRIGGER IF NOT EXISTS trg_domaincounts_result_delete
+    AFTER DELETE ON Result
+    WHEN EXISTS (SELECT 1 FROM Channel WHERE id_channel = OLD.channel_id)
+    BEGIN
+        UPDATE DomainCounts SET count = count - 1
+        WHERE domain_key = (SELECT COALESCE(id_domain, 0) FROM Channel WHERE id_channel = OLD.channel_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_domaincounts_channel_delete
+    BEFORE DELETE ON Channel
+    BEGIN
+        UPDATE DomainCounts
+        SET count = count - (SELECT COUNT(*) FROM Result WHERE channel_id = OLD.id_channel)
+        WHERE domain_key = COALESCE(OLD.id_domain, 0);
+    END
+    """,
+    """
+    -- Re-categorization, including Domains ON DELETE SET NULL
+    CREATE TRIGGER IF NOT EXISTS trg_domaincounts_channel_domain
+    AFTER UPDATE OF id_domain ON Channel
+    WHEN OLD.id_domain IS NOT NEW.id_domain
+    BEGIN
+        UPDATE DomainCounts
+        SET count = count - (SELECT COUNT(*) FROM Result WHERE channel_id = NEW.id_channel)
+        WHERE domain_key = COALESCE(OLD.id_domain, 0);
+        INSERT INTO DomainCounts (domain_key, count)
+        VALUES (COALESCE(NEW.id_domain, 0), (SELECT COUNT(*) FROM Result WHERE channel_id = NEW.id_channel))
+        ON CONFLICT(domain_key) DO UPDATE SET count = count + excluded.count;
+    END
+    """,
+]
+
+# ===============================
+# Centralized SQL Queries
+# ===============================
+QUERIES = {
+    # Ground truth: what the counters must equal
+    "recount": """
+        SELECT COALESCE(c.id_domain, 0) AS domain_key, COUNT(*) AS count
+        FROM Result r
+        JOIN Channel c ON c.id_channel = r.channel_id
+        GROUP BY COALESCE(c.id_domain, 0)
+    """,
+    "stored": "SELECT domain_key, count FROM DomainCounts WHERE count != 0",
+    "clear": "DELETE FROM DomainCounts",
+    "insert": "INSERT INTO DomainCounts (domain_key, count) VALUES (?, ?)",
+}
+
+# ===============================
+# Check / rebuild
+# ===============================
+def rebuild_domain_counts(conn: sqlite3.Connection) -> None:
+    """Recompute every counter from Result. Caller owns the transaction."""
+    counts = conn.execute(QUERIES["recount"]).fetchall()
+    conn.execute(QUERIES["clear"])
+    conn.executemany(QUERIES["insert"], counts)
+
+
+def check_domain_counts(conn: sqlite3.Connection) -> dict[int, tuple[int, int]]:
+    """{domain_key: (stored, actual)} for every counter that drifted; empty when consistent."""
+    actual = dict(conn.execute(QUERIES["recount"]).fetchall())
+    stored = dict(conn.execute(QUERIES["stored"]).fetchall())
+    return {
+        key: (stored.get(key, 0), actual.get(key, 0))
+        for key in sorted(set(actual) | set(stored))
+        if stored.get(key, 0) != actual.get(key, 0)
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Check (or rebuild) the DomainCounts notification counters.")
+    parser.add_argument("db", nargs="+", type=Path, help="user DB file(s), e.g. content/*.db")
+    parser.add_argument("--rebuild", action="store_true", help="rewrite counters that drifted")
+    args = parser.parse_args(argv)
+
+    drifted = 0
+    for db_path in args.db:
+        conn = sqlite3.connect(db_path)
+        try:
+            drift = check_domain_counts(conn)
+            if not drift:
+                print(f"{db_path.name}: ok")
+                continue
+            drifted += 1
+            for key, (stored, actual) in drift.items():
+                print(f"{db_path.name}: domain {key} stored={stored} actual={actual}")
+            if args.rebuild:
+                with conn:
+                    rebuild_domain_counts(conn)
+                print(f"{db_path.name}: rebuilt")
+        finally:
+            conn.close()
+    return 1 if drifted and not args.rebuild else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# ===============================
+# Module Summary
+# ===============================
+"""
+Notification used to JOIN Channel × Domains × Result + COUNT(*) on every
+dashboard load; it now reads DomainCounts (one row per domain).
+
+Kept exact by triggers on:
+  - Result insert / delete (processor, retention, cleanup)
+  - Channel delete (covers the Result CASCADE) and id_domain changes
+
+Usage:
+  python -m content_server.sql_lite.operation.counters content/*.db [--rebuild]
+
+Installed by:
+  - create.py (new DBs), migrate.py step "domain_counts" (existing DBs)
+"""
@@ -1,5 +1,9 @@
 import sqlite3
 from pathlib import Path
+from .migrate import migrate_db
+from .counters import DOMAIN_COUNTS_DDL
+from .feed_items import FEED_ITEM_DDL
+from .poll_log import POLL_LOG_DDL
 
 def sql_creation(path: str | Path) -> None:
     """
@@ -7,6 +11,7 @@ def sql_creation(path: str | Path) -> None:
     - Domains/SubDomains: survive deletion (SET NULL)
     - Results & tracking: auto-deleted on channel delete (CASCADE)
     """
+    migrate_db(path)  # new file → page_size / auto_vacuum / WAL before any table; old file → upgraded first
     con = sqlite3.connect(path)
     con.execute("PRAGMA foreign_keys = ON")
     cur = con.cursor()
@@ -55,17 +60,21 @@ CREATE INDEX IF NOT EXISTS idx_channel_url       ON Channel(channel_url);
 -- =============================================================
 -- Videos / results collected from channels
 -- =============================================================
+-- Compact: 11-char id key, URL + thumbnail rebuilt from it at read time (compact.py)
 CREATE TABLE IF NOT EXISTS Result (
+    video_id      TEXT PRIMARY KEY,
     title         TEXT NOT NULL,
-    video_url     TEXT PRIMARY KEY,
-    thumbnail     TEXT,
     channel_id    INTEGER NOT NULL,
+    published     INTEGER,                        -- Unix ts (seconds) of upload
     seen          INTEGER DEFAULT 0,              -- 0 is false, 1 is true. 2 hour delete feature
-    published_at  TEXT,                           -- ISO 8601 format recommended
+    seen_at       INTEGER,                        -- Unix ts of marking seen, retention clock
     FOREIGN KEY (channel_id) REFERENCES Channel(id_channel)
         ON DELETE CASCADE
-);
+) WITHOUT ROWID;
 CREATE INDEX IF NOT EXISTS idx_result_channel    ON Result(channel_id);
+CREATE INDEX IF NOT EXISTS idx_result_published  ON Result(published);
+CREATE INDEX IF NOT EXISTS idx_result_seen_at    ON Result(seen_at);
+CREATE INDEX IF NOT EXISTS idx_result_channel_published ON Result(channel_id, published);
 
 -- Future Feature:
 CREATE TABLE IF NOT EXISTS Stocked(
@@ -98,13 +107,23 @@ CREATE TABLE IF NOT EXISTS Channels (
 CREATE INDEX IF NOT EXISTS idx_tracking_channel ON Channels(id_channel);
 CREATE INDEX IF NOT EXISTS idx_tracking_ts      ON Channels(ts);
     """)
+    for stmt in DOMAIN_COUNTS_DDL:  # Notification counters (counters.py)
+        cur.execute(stmt)
+    for stmt in FEED_ITEM_DDL:      # Feed read model (feed_items.py)
+        cur.execute(stmt)
+    for stmt in POLL_LOG_DDL:       # Per-poll history ring buffer (poll_log.py)
+        cur.execute(stmt)
     con.commit()
     con.close()
     print("Database schema created/updated successfully!")
+
 # ===============================
 # Module Summary(Status: Success)
 # ===============================
 """
+Existing DBs never re-run this DDL → every schema / index / PRAGMA change also
+needs a Step in migrate.py.
+
 AnyChanges in YOutube schema needs changes in following modules:
     - csv variants -> csv_import.py, csv_export.py
     - processor.py
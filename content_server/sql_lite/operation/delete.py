@@ -1,22 +1,48 @@
 # delete.py
-import aiosqlite
-import asyncio
-from contextlib import asynccontextmanager
+import sqlite3
+import time
 from pathlib import Path
 from typing import Any
 
-
-@asynccontextmanager
-async def _db_connection(db_path: Path, readonly: bool = False):
-    conn_str = f"file:{db_path}?mode=ro" if readonly else str(db_path)
-    uri = readonly
-    conn = await aiosqlite.connect(conn_str, uri=uri)
-    conn.row_factory = aiosqlite.Row
-    await conn.execute("PRAGMA foreign_keys = ON")
-    try:
-        yield conn
-    finally:
-        await conn.close()
+from ..service.writer import write_async
+
+# ===============================
+# Centralized SQL Queries
+# ===============================
+QUERIES = {
+    "find_domain": "SELECT id_domain FROM Domains WHERE domain_name = ?",
+    "find_subdomain": "SELECT id_subdomain FROM SubDomains WHERE subdomain_name = ?",
+    # batch → whichever of domain / subdomain was given
+    "delete_by_domain": "DELETE FROM Channel WHERE id_domain = ?",
+    "delete_by_subdomain": "DELETE FROM Channel WHERE id_subdomain = ?",
+    "delete_by_domain_subdomain": "DELETE FROM Channel WHERE id_domain = ? AND id_subdomain = ?",
+    "delete_channel": "DELETE FROM Channel WHERE id_channel = ?",
+    "mark_all_seen": "UPDATE Result SET seen = 1, seen_at = ? WHERE seen = 0",
+    "delete_abandoned": """
+        DELETE FROM Channel
+        WHERE id_channel IN (
+            SELECT c.id_channel FROM Channel c
+            JOIN Channels t ON c.id_channel = t.id_channel
+            WHERE t.rank = 'abandoned'
+        )
+    """,
+    "cleanup_domains": """
+        DELETE FROM Domains
+        WHERE id_domain NOT IN (
+            SELECT id_domain FROM Channel WHERE id_domain IS NOT NULL
+            UNION
+            SELECT id_domain FROM Stocked WHERE id_domain IS NOT NULL
+        )
+    """,
+    "cleanup_subdomains": """
+        DELETE FROM SubDomains
+        WHERE id_subdomain NOT IN (
+            SELECT id_subdomain FROM Channel WHERE id_subdomain IS NOT NULL
+            UNION
+            SELECT id_subdomain FROM Stocked WHERE id_subdomain IS NOT NULL
+        )
+    """,
+}
 
 
 def _normalize(name: str | None) -> str | None:
@@ -26,55 +52,35 @@ def _normalize(name: str | None) -> str | None:
     return stripped if stripped else None
 
 
-async def _get_domain_id(conn: aiosqlite.Connection, domain_name: str) -> int:
+def _get_domain_id(conn: sqlite3.Connection, domain_name: str) -> int:
     domain_name = domain_name.strip()
     if not domain_name:
         raise ValueError("Domain name cannot be empty.")
-    async with conn.execute(
-        "SELECT id_domain FROM Domains WHERE domain_name = ?",
-        (domain_name,),
-    ) as cur:
-        row = await cur.fetchone()
+    cur = conn.execute(QUERIES["find_domain"], (domain_name,))
+    row = cur.fetchone()
     if not row:
         raise ValueError(f"Domain '{domain_name}' not found.")
     return row["id_domain"]
 
 
-async def _get_subdomain_id(conn: aiosqlite.Connection, subdomain_name: str) -> int:
+def _get_subdomain_id(conn: sqlite3.Connection, subdomain_name: str) -> int:
     subdomain_name = subdomain_name.strip()
     if not subdomain_name:
         raise ValueError("Subdomain name cannot be empty.")
-    async with conn.execute(
-        "SELECT id_subdomain FROM SubDomains WHERE subdomain_name = ?",
-        (subdomain_name,),
-    ) as cur:
-        row = await cur.fetchone()
+    cur = conn.execute(QUERIES["find_subdomain"], (subdomain_name,))
+    row = cur.fetchone()
     if not row:
         raise ValueError(f"Subdomain '{subdomain_name}' not found.")
     return row["id_subdomain"]
 
 
-async def _cleanup_unused_categories(conn: aiosqlite.Connection) -> None:
-    await conn.execute("""
-        DELETE FROM Domains
-        WHERE id_domain NOT IN (
-            SELECT id_domain FROM Channel WHERE id_domain IS NOT NULL
-            UNION
-            SELECT id_domain FROM Stocked WHERE id_domain IS NOT NULL
-        )
-    """)
-    await conn.execute("""
-        DELETE FROM SubDomains
-        WHERE id_subdomain NOT IN (
-            SELECT id_subdomain FROM Channel WHERE id_subdomain IS NOT NULL
-            UNION
-            SELECT id_subdomain FROM Stocked WHERE id_subdomain IS NOT NULL
-        )
-    """)
+def _cleanup_unused_categories(conn: sqlite3.Connection) -> None:
+    conn.execute(QUERIES["cleanup_domains"])
+    conn.execute(QUERIES["cleanup_subdomains"])
 
 
-async def _handle_batch_delete(
-    conn: aiosqlite.Connection,
+def _handle_batch_delete(
+    conn: sqlite3.Connection,
     domain_name: str | None,
     subdomain_name: str | None,
 ) -> dict[str, Any]:
@@ -84,20 +90,20 @@ async def _handle_batch_delete(
         raise ValueError(
             "At least one of domain or subdomain must be provided")
 
-    conditions: list[str] = []
     params: list[Any] = []
     if domain_norm:
-        conditions.append("id_domain = ?")
-        params.append(await _get_domain_id(conn, domain_norm))
+        params.append(_get_domain_id(conn, domain_norm))
     if subdomain_norm:
-        conditions.append("id_subdomain = ?")
-        params.append(await _get_subdomain_id(conn, subdomain_norm))
+        params.append(_get_subdomain_id(conn, subdomain_norm))
 
-    where = " AND ".join(conditions)
-    async with conn.execute(f"DELETE FROM Channel WHERE {where}", params) as cur:
-        deleted_count = cur.rowcount
+    if domain_norm and subdomain_norm:
+        query = QUERIES["delete_by_domain_subdomain"]
+    else:
+        query = QUERIES["delete_by_domain" if domain_norm else "delete_by_subdomain"]
+    cur = conn.execute(query, params)
+    deleted_count = cur.rowcount
 
-    await _cleanup_unused_categories(conn)
+    _cleanup_unused_categories(conn)
     return {
         "status": "success",
         "operation": "batch_delete",
@@ -107,17 +113,15 @@ async def _handle_batch_delete(
     }
 
 
-async def _handle_individual_delete(
-    conn: aiosqlite.Connection,
+def _handle_individual_delete(
+    conn: sqlite3.Connection,
     channel_id: int,
 ) -> dict[str, Any]:
-    async with conn.execute("SELECT 1 FROM Channel WHERE id_channel = ?", (channel_id,)) as cur:
-        row = await cur.fetchone()
-    if not row:
+    cur = conn.execute(QUERIES["delete_channel"], (channel_id,))
+    if cur.rowcount == 0:
         return {"status": "no_changes", "reason": f"Channel {channel_id} not found"}
 
-    await conn.execute("DELETE FROM Channel WHERE id_channel = ?", (channel_id,))
-    await _cleanup_unused_categories(conn)
+    _cleanup_unused_categories(conn)
 
     return {
         "status": "success",
@@ -127,69 +131,29 @@ async def _handle_individual_delete(
     }
 
 
-async def _mark_seen_then_cleanup_after_delay(
-    db_path: Path | str,
-    delay_hours: float = 2.0
-) -> None:
+def _handle_daily_cleanup(conn: sqlite3.Connection) -> dict[str, Any]:
     """
-    Background task: mark all unseen → seen=1, wait, then delete all seen=1
+    "daily_cleanup" on login: stamp every unseen result as seen, right now.
+    Deletion happens later in the retention worker (sql_lite/service/retention.py),
+    which survives restarts because the clock lives in Result.seen_at.
     """
-    db_path_str = str(db_path)
-    try:
-        conn = await aiosqlite.connect(db_path_str)
-        try:
-            # 1. Mark
-            await conn.execute("UPDATE Result SET seen = 1 WHERE seen = 0")
-            await conn.commit()
-
-            # 2. Wait (non-blocking for event loop)
-            await asyncio.sleep(delay_hours * 3600)
-
-            # 3. Delete
-            await conn.execute("DELETE FROM Result WHERE seen = 1")
-            await conn.commit()
-        finally:
-            await conn.close()
-    except Exception as e:
-        # In real app → replace with proper logging
-        print(f"[delayed cleanup] failed after {delay_hours}h: {e}")
-
-
-async def _handle_daily_cleanup(conn: aiosqlite.Connection, db_path: Path) -> dict[str, Any]:
-    """
-    New behavior for "daily_cleanup":
-      - Immediately marks all unseen results as seen
-      - Schedules deletion of all seen results after 2 hours (background)
-    """
-    # Mark everything unseen → seen right now
-    await conn.execute("UPDATE Result SET seen = 1 WHERE seen = 0")
-    await conn.commit()
-
-    # Fire background cleanup task
-    asyncio.create_task(
-        _mark_seen_then_cleanup_after_delay(db_path, delay_hours=2.0)
-    )
+    cur = conn.execute(QUERIES["mark_all_seen"], (int(time.time()),))
+    marked = cur.rowcount
 
     return {
         "status": "success",
         "operation": "daily_cleanup",
-        "message": "All unseen results marked as seen. Cleanup of seen results scheduled in 2 hours (background).",
+        "marked_seen": marked,
+        "message": "All unseen results marked as seen. They are removed by the retention worker once expired.",
     }
 
 
-async def _handle_abandoned_delete(conn: aiosqlite.Connection) -> dict[str, Any]:
-    async with conn.execute("""
-        DELETE FROM Channel
-        WHERE id_channel IN (
-            SELECT c.id_channel FROM Channel c
-            JOIN Channels t ON c.id_channel = t.id_channel
-            WHERE t.rank = 'abandoned'
-        )
-    """) as cur:
-        deleted_count = cur.rowcount
+def _handle_abandoned_delete(conn: sqlite3.Connection) -> dict[str, Any]:
+    cur = conn.execute(QUERIES["delete_abandoned"])
+    deleted_count = cur.rowcount
 
     if deleted_count > 0:
-        await _cleanup_unused_categories(conn)
+        _cleanup_unused_categories(conn)
 
     return {
         "status": "success",
@@ -198,6 +162,33 @@ async def _handle_abandoned_delete(conn: aiosqlite.Connection) -> dict[str, Any]
     }
 
 
+def _delete_op(conn: sqlite3.Connection, mode: str, b: str | None, c: str | None) -> dict[str, Any]:
+    """Writer op: runs inside the writer's transaction (one savepoint)."""
+    if mode == "batch":
+        return _handle_batch_delete(conn, b, c)
+    if mode == "individual":
+        if b is None or not (b_str := str(b).strip()):
+            raise ValueError(
+                "Channel ID (b) is required for individual delete")
+        try:
+            channel_id = int(b_str)
+        except ValueError:
+            raise ValueError("Channel ID (b) must be an integer")
+        return _handle_individual_delete(conn, channel_id)
+    if mode == "daily_cleanup":
+        if b is not None or c is not None:
+            raise ValueError(
+                "daily_cleanup mode takes no additional parameters")
+        return _handle_daily_cleanup(conn)
+    if mode == "abandoned":
+        if b is not None or c is not None:
+            raise ValueError(
+                "abandoned mode takes no additional parameters")
+        return _handle_abandoned_delete(conn)
+    raise ValueError(
+        "Delete mode must be 'batch', 'individual', 'daily_cleanup', or 'abandoned'")
+
+
 async def Delete(
     username: str,
     db_dir: str | Path | None = None,
@@ -208,7 +199,7 @@ async def Delete(
 ) -> dict[str, Any]:
     """
     Public async delete API.
-    Handles: batch, individual, daily_cleanup (now mark+delayed), abandoned.
+    Handles: batch, individual, daily_cleanup (mark seen; retention deletes later), abandoned.
     """
     db_path = (Path(db_dir) if db_dir else Path.cwd()) / f"{username}.db"
     if not db_path.is_file():
@@ -223,36 +214,5 @@ async def Delete(
 
     mode = str(a).strip().lower()
 
-    async with _db_connection(db_path, readonly=False) as conn:
-        await conn.execute("BEGIN")
-        try:
-            if mode == "batch":
-                result = await _handle_batch_delete(conn, b, c)
-            elif mode == "individual":
-                if b is None or not (b_str := str(b).strip()):
-                    raise ValueError(
-                        "Channel ID (b) is required for individual delete")
-                try:
-                    channel_id = int(b_str)
-                except ValueError:
-                    raise ValueError("Channel ID (b) must be an integer")
-                result = await _handle_individual_delete(conn, channel_id)
-            elif mode == "daily_cleanup":
-                if b is not None or c is not None:
-                    raise ValueError(
-                        "daily_cleanup mode takes no additional parameters")
-                result = await _handle_daily_cleanup(conn, db_path)
-            elif mode == "abandoned":
-                if b is not None or c is not None:
-                    raise ValueError(
-                        "abandoned mode takes no additional parameters")
-                result = await _handle_abandoned_delete(conn)
-            else:
-                raise ValueError(
-                    "Delete mode must be 'batch', 'individual', 'daily_cleanup', or 'abandoned'")
-
-            await conn.commit()
-            return result
-        except Exception:
-            await conn.rollback()
-            raise
+    # Queued on the DB's single writer, committed together with whatever else is pending
+    return await write_async(db_path, _delete_op, mode, b, c)
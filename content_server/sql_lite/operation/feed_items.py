@@ -0,0 +1,98 @@
+from __future__ import annotations
+import sqlite3
+
+# ===============================
+# Schema: Result joined with its channel's categories, stored in page order
+# ===============================
+NO_CATEGORY = 0  # id_domain / id_subdomain IS NULL
+
+FEED_ITEM_DDL: list[str] = [
+    """
+    CREATE TABLE IF NOT EXISTS FeedItem (
+        domain_id       INTEGER NOT NULL,           -- Channel.id_domain, 0 when none
+        subdomain_id    INTEGER NOT NULL,           -- Channel.id_subdomain, 0 when none
+        published       INTEGER NOT NULL,           -- Result.published, 0 when unknown
+        video_id        TEXT NOT NULL,
+        title           TEXT NOT NULL,
+        channel_id      INTEGER NOT NULL,
+        channel_name    TEXT NOT NULL,
+        PRIMARY KEY (domain_id, subdomain_id, published, video_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_feeditem_video ON FeedItem(video_id)",
+    "CREATE INDEX IF NOT EXISTS idx_feeditem_channel ON FeedItem(channel_id)",
+    "CREATE INDEX IF NOT EXISTS idx_feeditem_domain_published ON FeedItem(domain_id, published DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_feeditem_published ON FeedItem(published DESC)",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_feeditem_result_insert
+    AFTER INSERT ON Result
+    BEGIN
+        INSERT OR REPLACE INTO FeedItem
+            (domain_id, subdomain_id, published, video_id, title, channel_id, channel_name)
+        SELECT COALESCE(c.id_domain, 0), COALESCE(c.id_subdomain, 0), COALESCE(NEW.published, 0),
+               NEW.video_id, NEW.title, c.id_channel, c.channel_name
+        FROM Channel c
+        WHERE c.id_channel = NEW.channel_id;
+    END
+    """,
+    # Fires for retention / cleanup deletes and for the Channel CASCADE alike
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_feeditem_result_delete
+    AFTER DELETE ON Result
+    BEGIN
+        DELETE FROM FeedItem WHERE video_id = OLD.video_id;
+    END
+    """,
+    # Write assign / replace-merge, Domains ON DELETE SET NULL, CSV re-import
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_feeditem_channel_update
+    AFTER UPDATE OF id_domain, id_subdomain, channel_name ON Channel
+    WHEN OLD.id_domain IS NOT NEW.id_domain
+      OR OLD.id_subdomain IS NOT NEW.id_subdomain
+      OR OLD.channel_name IS NOT NEW.channel_name
+    BEGIN
+        UPDATE FeedItem
+        SET domain_id = COALESCE(NEW.id_domain, 0),
+            subdomain_id = COALESCE(NEW.id_subdomain, 0),
+            channel_name = NEW.channel_name
+        WHERE channel_id = NEW.id_channel;
+    END
+    """,
+]
+
+# ===============================
+# Centralized SQL Queries
+# ===============================
+QUERIES = {
+    "clear": "DELETE FROM FeedItem",
+    "backfill": """
+        INSERT INTO FeedItem
+            (domain_id, subdomain_id, published, video_id, title, channel_id, channel_name)
+        SELECT COALESCE(c.id_domain, 0), COALESCE(c.id_subdomain, 0), COALESCE(r.published, 0),
+               r.video_id, r.title, c.id_channel, c.channel_name
+        FROM Result r
+        JOIN Channel c ON c.id_channel = r.channel_id
+    """,
+}
+
+
+def rebuild_feed_items(conn: sqlite3.Connection) -> int:
+    """Refill FeedItem from Result. Caller owns the transaction."""
+    conn.execute(QUERIES["clear"])
+    return conn.execute(QUERIES["backfill"]).rowcount
+
+# ===============================
+# Module Summary
+# ===============================
+"""
+Read model for read.Feed: one row per Result with the channel name and the
+category ids already resolved, clustered on (domain, subdomain, published)
+→ a dashboard page is one index range scan, no 4-table join.
+
+Kept current by triggers on Result insert / delete and Channel category or
+name changes; Domain / SubDomain renames need nothing (names are looked up
+by id at read time).
+
+Installed by:
+  - create.py (new DBs), migrate.py step "feed_items" (existing DBs)
+"""
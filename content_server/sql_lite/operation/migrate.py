@@ -0,0 +1,188 @@
+from __future__ import annotations
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+from .compact import RESULT_INDEXES, is_compact, migrate_result_compact
+from .counters import DOMAIN_COUNTS_DDL, rebuild_domain_counts
+from .feed_items import FEED_ITEM_DDL, rebuild_feed_items
+from .poll_log import POLL_LOG_DDL
+
+log = logging.getLogger(__name__)
+
+# ===============================
+# Settings
+# ===============================
+PAGE_SIZE = int(os.environ.get("HYDRA_PAGE_SIZE", 4096))
+MIGRATE_WORKERS = int(os.environ.get("HYDRA_MIGRATE_WORKERS", min(8, os.cpu_count() or 1)))
+
+AUTO_VACUUM_INCREMENTAL = 2  # PRAGMA auto_vacuum value
+
+# ===============================
+# Steps (append only: the position + 1 is the user_version they leave behind)
+# ===============================
+def _columns(con: sqlite3.Connection, table: str) -> set[str]:
+    return {row[1] for row in con.execute(f"PRAGMA table_info({table})")}
+
+
+def _result_seen_at(con: sqlite3.Connection) -> None:
+    """Retention clock for results marked seen before the worker existed."""
+    columns = _columns(con, "Result")
+    if columns and "seen_at" not in columns:
+        con.execute("ALTER TABLE Result ADD COLUMN seen_at INTEGER")
+
+
+def _result_compact(con: sqlite3.Connection) -> None:
+    copied = migrate_result_compact(con)
+    if copied:
+        log.info("Result rebuilt in compact layout (%d rows)", copied)
+
+
+def _storage_layout(con: sqlite3.Connection) -> None:
+    """
+    page_size / auto_vacuum only change through a full VACUUM (and page_size
+    not at all in WAL) → rebuild once if needed, then switch to WAL for good.
+    """
+    page_size = con.execute("PRAGMA page_size").fetchone()[0]
+    auto_vacuum = con.execute("PRAGMA auto_vacuum").fetchone()[0]
+    if page_size != PAGE_SIZE or auto_vacuum != AUTO_VACUUM_INCREMENTAL:
+        con.execute("PRAGMA journal_mode = DELETE")
+        con.execute(f"PRAGMA page_size = {PAGE_SIZE}")
+        con.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        con.execute("VACUUM")
+    con.execute("PRAGMA journal_mode = WAL")
+
+
+def _result_indexes(con: sqlite3.Connection) -> None:
+    if _columns(con, "Result") and is_compact(con):
+        for stmt in RESULT_INDEXES:
+            con.execute(stmt)
+
+
+def _domain_counts(con: sqlite3.Connection) -> None:
+    """Trigger-maintained Notification counters, seeded from the current rows."""
+    if not (_columns(con, "Result") and _columns(con, "Channel")):
+        return  # brand new file → create.py installs them with the schema
+    for stmt in DOMAIN_COUNTS_DDL:
+        con.execute(stmt)
+    rebuild_domain_counts(con)
+
+
+def _feed_items(con: sqlite3.Connection) -> None:
+    """Denormalized Feed read model, backfilled from the current rows."""
+    if not (_columns(con, "Result") and _columns(con, "Channel")):
+        return  # brand new file → create.py installs it with the schema
+    for stmt in FEED_ITEM_DDL:
+        con.execute(stmt)
+    rebuilt = rebuild_feed_items(con)
+    if rebuilt:
+        log.info("FeedItem backfilled (%d rows)", rebuilt)
+
+
+def _poll_log(con: sqlite3.Connection) -> None:
+    """Per-poll history ring buffer (standalone table, no backfill)."""
+    for stmt in POLL_LOG_DDL:
+        con.execute(stmt)
+
+
+class Step(NamedTuple):
+    name: str
+    apply: Callable[[sqlite3.Connection], None]
+    transactional: bool = True   # False → VACUUM / journal_mode, can't run inside BEGIN
+
+
+MIGRATIONS: list[Step] = [
+    Step("result_seen_at", _result_seen_at),
+    Step("result_compact", _result_compact),
+    Step("storage_layout", _storage_layout, transactional=False),
+    Step("result_indexes", _result_indexes),
+    Step("domain_counts", _domain_counts),
+    Step("feed_items", _feed_items),
+    Step("poll_log", _poll_log),
+    Step("result_channel_published", _result_indexes),   # RESULT_INDEXES grew one entry
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+# ===============================
+# Runner
+# ===============================
+def user_version(con: sqlite3.Connection) -> int:
+    return con.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate_db(db_path: Path | str) -> list[tuple[str, float]]:
+    """
+    Apply every pending step to one DB. Each step commits together with its
+    user_version bump → a crash resumes at the first step not yet recorded.
+    Returns [(step name, seconds)] for the steps that ran.
+    """
+    ran: list[tuple[str, float]] = []
+    con = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    try:
+        con.execute("PRAGMA foreign_keys = OFF")  # table rebuilds must not cascade
+        current = user_version(con)
+        for version, step in enumerate(MIGRATIONS[current:], start=current + 1):
+            started = time.perf_counter()
+            if step.transactional:
+                con.execute("BEGIN IMMEDIATE")
+                try:
+                    step.apply(con)
+                    con.execute(f"PRAGMA user_version = {version}")
+                    con.execute("COMMIT")
+                except BaseException:
+                    con.execute("ROLLBACK")
+                    raise
+            else:
+                step.apply(con)
+                con.execute(f"PRAGMA user_version = {version}")
+            elapsed = time.perf_counter() - started
+            ran.append((step.name, elapsed))
+            log.info("Migrated %s → v%d %s (%.3fs)", Path(db_path).name, version, step.name, elapsed)
+    finally:
+        con.close()
+    return ran
+
+
+def _migrate_one(db_path: Path) -> tuple[Path, list[tuple[str, float]] | None]:
+    try:
+        return db_path, migrate_db(db_path)
+    except Exception:
+        log.exception("Migration failed for %s (stays at its last completed version)", db_path)
+        return db_path, None
+
+
+def migrate_all(db_dir: Path | str, workers: int = MIGRATE_WORKERS) -> dict[str, int]:
+    """Startup: bring every content/*.db to SCHEMA_VERSION, files in parallel."""
+    db_paths = sorted(Path(db_dir).glob("*.db"))
+    started = time.perf_counter()
+    migrated = failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for _, ran in pool.map(_migrate_one, db_paths):
+            if ran is None:
+                failed += 1
+            elif ran:
+                migrated += 1
+    log.info(
+        "Schema v%d: %d DB(s) checked, %d migrated, %d failed (%.2fs)",
+        SCHEMA_VERSION, len(db_paths), migrated, failed, time.perf_counter() - started,
+    )
+    return {"checked": len(db_paths), "migrated": migrated, "failed": failed}
+
+# ===============================
+# Module Summary
+# ===============================
+"""
+PRAGMA user_version = number of MIGRATIONS applied.
+
+Adding a schema / index / PRAGMA change for existing users:
+  - append a Step (never reorder or remove one), keep it idempotent
+  - mirror the end state in create.py for brand new files
+
+Called by:
+  - main.py on startup (migrate_all)
+  - create.sql_creation before its CREATE ... IF NOT EXISTS (new and re-created DBs)
+"""
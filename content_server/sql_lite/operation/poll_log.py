@@ -0,0 +1,127 @@
+from __future__ import annotations
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, Sequence
+
+# ===============================
+# Settings
+# ===============================
+POLL_LOG_CAPACITY = int(os.environ.get("HYDRA_POLL_LOG_CAPACITY", 20000))  # rows kept per user DB
+POLL_LOG_MAX_LIMIT = 1000
+
+# ===============================
+# Schema: fixed-size ring, slot = seq % capacity → old rows are overwritten in place
+# ===============================
+POLL_LOG_DDL: list[str] = [
+    """
+    CREATE TABLE IF NOT EXISTS PollLog (
+        slot          INTEGER PRIMARY KEY,            -- seq % POLL_LOG_CAPACITY
+        seq           INTEGER NOT NULL,               -- monotonic poll number
+        rss_id        TEXT NOT NULL,                  -- no FK: history outlives a deleted channel
+        started_at    INTEGER NOT NULL,               -- Unix ts (seconds) the fetch started
+        fetch_ms      INTEGER,                        -- HTTP time, NULL when no request was sent
+        parse_ms      INTEGER,
+        db_ms         INTEGER,                        -- _apply_result inside the writer
+        bytes         INTEGER,
+        http_status   INTEGER,
+        outcome       TEXT NOT NULL,                  -- new / old / empty / error:<kind> / exception
+        new_videos    INTEGER NOT NULL DEFAULT 0,
+        rank_before   TEXT,
+        ts_before     INTEGER,
+        rank_after    TEXT,
+        ts_after      INTEGER
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_polllog_seq ON PollLog(seq)",
+    "CREATE INDEX IF NOT EXISTS idx_polllog_rss ON PollLog(rss_id, seq)",
+]
+
+# ===============================
+# Centralized SQL Queries
+# ===============================
+QUERIES = {
+    "next_seq": "SELECT COALESCE(MAX(seq), 0) + 1 FROM PollLog",
+    "insert": """
+        INSERT OR REPLACE INTO PollLog (
+            slot, seq, rss_id, started_at, fetch_ms, parse_ms, db_ms, bytes, http_status,
+            outcome, new_videos, rank_before, ts_before, rank_after, ts_after
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    # Slots left over from a larger HYDRA_POLL_LOG_CAPACITY
+    "trim": "DELETE FROM PollLog WHERE slot >= ?",
+    "select": """
+        SELECT seq, rss_id, started_at, fetch_ms, parse_ms, db_ms, bytes, http_status,
+               outcome, new_videos, rank_before, ts_before, rank_after, ts_after
+        FROM PollLog
+    """,
+}
+
+# ===============================
+# Write (writer op, inside the poll batch transaction)
+# ===============================
+def record_polls(conn: sqlite3.Connection, rows: Sequence[tuple]) -> None:
+    """
+    rows: (rss_id, started_at, fetch_ms, parse_ms, db_ms, bytes, http_status,
+           outcome, new_videos, rank_before, ts_before, rank_after, ts_after)
+    One executemany for the whole batch.
+    """
+    if not rows:
+        return
+    seq = conn.execute(QUERIES["next_seq"]).fetchone()[0]
+    conn.executemany(QUERIES["insert"], [
+        ((seq + i) % POLL_LOG_CAPACITY, seq + i, *row) for i, row in enumerate(rows)
+    ])
+    conn.execute(QUERIES["trim"], (POLL_LOG_CAPACITY,))
+
+# ===============================
+# Read (/debug/{username}/polls)
+# ===============================
+def query_polls(
+    db_path: Path,
+    *,
+    rss_id: str | None = None,
+    outcome: str | None = None,
+    since: int | None = None,
+    until: int | None = None,
+    limit: int = 100,
+) -> list[dict[str, Any]]:
+    """Newest first. outcome="error" also matches every "error:<kind>"."""
+    conditions: list[str] = []
+    params: list[Any] = []
+    if rss_id:
+        conditions.append("rss_id = ?")
+        params.append(rss_id)
+    if outcome:
+        conditions.append("(outcome = ? OR outcome LIKE ? || ':%')")
+        params.extend([outcome, outcome])
+    if since is not None:
+        conditions.append("started_at >= ?")
+        params.append(since)
+    if until is not None:
+        conditions.append("started_at < ?")
+        params.append(until)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    params.append(max(1, min(limit, POLL_LOG_MAX_LIMIT)))
+
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute(f"{QUERIES['select']}{where} ORDER BY seq DESC LIMIT ?", params).fetchall()
+    finally:
+        conn.close()
+    return [dict(row) for row in rows]
+
+# ===============================
+# Module Summary
+# ===============================
+"""
+Per-poll history for tuning the scheduler: why did a channel's videos show up late?
+
+Written by processor.apply_batch → one record_polls() per timmer / bulk batch,
+in the same writer transaction as the polls themselves.
+Read by GET /debug/{username}/polls?rss_id=&outcome=&since=&until=&limit=
+
+Installed by:
+  - create.py (new DBs), migrate.py step "poll_log" (existing DBs)
+"""
@@ -3,6 +3,8 @@ from pathlib import Path
 from enum import StrEnum
 from typing import Protocol, Any
 from contextlib import contextmanager
+from .compact import thumbnail_url, watch_url
+from ...metrics import COMPONENT_SECONDS
 
 # -------- Internal Use
 class ComponentFactory(Protocol):
@@ -50,22 +52,29 @@ def resolve_component(
     factory = FACTORY_REGISTRY.get(component_type)
     if factory is None:
         raise ValueError(f"Unknown component type: {component_type.value!r}")
-    return factory(db_path, domain=domain, subdomain=subdomain)
+    with COMPONENT_SECONDS.time(component=component_type.value):
+        return factory(db_path, domain=domain, subdomain=subdomain)
 
 # ------ Centralized queries
 QUERIES: dict[str, str] = {
+    # DomainCounts is trigger-maintained (counters.py) → O(domains), not O(results)
     "notification_domains": """
         SELECT
             COALESCE(d.domain_name, 'uncategorized') AS key,
-            COUNT(r.video_url) AS count
-        FROM Channel c
-        LEFT JOIN Domains d ON c.id_domain = d.id_domain
-        LEFT JOIN Result r ON r.channel_id = c.id_channel
-        GROUP BY c.id_domain
-        HAVING count > 0
+            dc.count AS count
+        FROM DomainCounts dc
+        LEFT JOIN Domains d ON dc.domain_key = d.id_domain
+        WHERE dc.count > 0
         ORDER BY key
     """,
-    "notification_total": "SELECT COUNT(*) AS total FROM Result",
+    "feed_items": """
+        SELECT video_id AS id, title, channel_name AS creator, domain_id, subdomain_id
+        FROM FeedItem
+    """,
+    "feed_domain_ids": "SELECT id_domain FROM Domains WHERE LOWER(TRIM(domain_name)) = LOWER(TRIM(?))",
+    "feed_subdomain_ids": "SELECT id_subdomain FROM SubDomains WHERE LOWER(TRIM(subdomain_name)) = LOWER(TRIM(?))",
+    "domain_names": "SELECT id_domain, domain_name FROM Domains",
+    "subdomain_names": "SELECT id_subdomain, subdomain_name FROM SubDomains",
     "sidebar_structure": """
         SELECT
             COALESCE(d.domain_name, 'uncategorized') AS domain_name,
@@ -108,7 +117,7 @@ def _db_connection(db_path: Path | str, *, readonly: bool = True):
 def Notification(db_path: Path | str):
     with _db_connection(db_path) as conn:
         domain_rows = conn.execute(QUERIES["notification_domains"]).fetchall()
-        total_all = conn.execute(QUERIES["notification_total"]).fetchone()["total"]
+        total_all = sum(row["count"] for row in domain_rows)
 
         domains = []
         for row in domain_rows:
@@ -124,6 +133,15 @@ def Notification(db_path: Path | str):
 
 
 def Feed(db_path: Path | str, domain: str, subdomain: str | None = None):
+    """
+    Payload per video: id, video_id, title, creator, thumbnail, url, domain, subdomain.
+      - id is the 11-char YouTube video id (still a string). Result is WITHOUT ROWID
+        since the compact schema, so the old rowid-based id no longer exists; it was
+        only ever used as a list key. video_id carries the same value explicitly.
+      - thumbnail is rebuilt from the id (i.ytimg.com/vi/{id}/hqdefault.jpg): the
+        feed's media:thumbnail is that same image on an iN.ytimg.com shard, so it
+        is not stored. Never empty → the /placeholder.svg fallback is gone.
+    """
     domain_input = (domain or "").strip()
     domain_lower = domain_input.lower() or "all"
 
@@ -131,47 +149,42 @@ def Feed(db_path: Path | str, domain: str, subdomain: str | None = None):
     sub_lower = subdomain_input.lower() or "all"
 
     with _db_connection(db_path) as conn:
-        base_query = """
-            SELECT
-                r.rowid AS id,
-                r.title,
-                r.video_url AS url,
-                r.thumbnail,
-                c.channel_name AS creator,
-                COALESCE(d.domain_name, 'No domain') AS domain,          -- or whatever fallback you prefer
-                COALESCE(sd.subdomain_name, 'No subdomain') AS subdomain -- or 'None', '', etc.
-            FROM Result r
-            JOIN Channel c ON r.channel_id = c.id_channel
-            LEFT JOIN Domains d ON c.id_domain = d.id_domain
-            LEFT JOIN SubDomains sd ON c.id_subdomain = sd.id_subdomain
-        """
-
+        # Names → ids first, then one range scan of the FeedItem read model (feed_items.py)
         where_parts = []
         params: list[Any] = []
 
         if domain_lower != "all":
-            where_parts.append("LOWER(TRIM(d.domain_name)) = LOWER(TRIM(?))")
-            params.append(domain_input)
+            domain_ids = [r[0] for r in conn.execute(QUERIES["feed_domain_ids"], (domain_input,))]
+            if not domain_ids:
+                return {"videos": []}
+            where_parts.append(f"domain_id IN ({', '.join('?' * len(domain_ids))})")
+            params.extend(domain_ids)
 
         if sub_lower != "all":
-            where_parts.append("LOWER(TRIM(sd.subdomain_name)) = LOWER(TRIM(?))")
-            params.append(subdomain_input)
+            subdomain_ids = [r[0] for r in conn.execute(QUERIES["feed_subdomain_ids"], (subdomain_input,))]
+            if not subdomain_ids:
+                return {"videos": []}
+            where_parts.append(f"subdomain_id IN ({', '.join('?' * len(subdomain_ids))})")
+            params.extend(subdomain_ids)
 
         where_clause = ("WHERE " + " AND ".join(where_parts)) if where_parts else ""
 
-        full_query = f"{base_query}\n{where_clause}\nORDER BY r.published_at DESC"
+        full_query = f"{QUERIES['feed_items']}\n{where_clause}\nORDER BY published DESC"
 
         rows = conn.execute(full_query, params).fetchall()
+        domain_names = dict(conn.execute(QUERIES["domain_names"]).fetchall())
+        subdomain_names = dict(conn.execute(QUERIES["subdomain_names"]).fetchall())
 
         videos = [
             {
                 "id": str(row["id"]),
+                "video_id": row["id"],
                 "title": row["title"],
                 "creator": row["creator"],
-                "thumbnail": row["thumbnail"] or "/placeholder.svg",
-                "url": row["url"],
-                "domain": row["domain"],
-                "subdomain": row["subdomain"],
+                "thumbnail": thumbnail_url(row["id"]),
+                "url": watch_url(row["id"]),
+                "domain": domain_names.get(row["domain_id"], "No domain"),
+                "subdomain": subdomain_names.get(row["subdomain_id"], "No subdomain"),
             }
             for row in rows
         ]
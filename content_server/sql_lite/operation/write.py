@@ -1,63 +1,72 @@
 # write.py
 import sqlite3
-from contextlib import contextmanager
 from pathlib import Path
 from typing import Any
 
-@contextmanager
-def _db_connection(db_path: Path, readonly: bool = False):
-    conn_str = f"file:{db_path}?mode=ro" if readonly else str(db_path)
-    uri = readonly
-    conn = sqlite3.connect(conn_str, uri=uri)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
-    try:
-        yield conn
-    finally:
-        conn.close()
+from ..service.writer import write_async
+
+# ===============================
+# Centralized SQL Queries
+# ===============================
+QUERIES = {
+    # Get-or-create in one statement: the no-op DO UPDATE makes RETURNING yield the existing id too
+    "upsert_domain": """
+        INSERT INTO Domains (domain_name) VALUES (?)
+        ON CONFLICT(domain_name) DO UPDATE SET domain_name = excluded.domain_name
+        RETURNING id_domain
+    """,
+    "upsert_subdomain": """
+        INSERT INTO SubDomains (subdomain_name) VALUES (?)
+        ON CONFLICT(subdomain_name) DO UPDATE SET subdomain_name = excluded.subdomain_name
+        RETURNING id_subdomain
+    """,
+    "find_domain": "SELECT id_domain FROM Domains WHERE domain_name = ?",
+    "find_subdomain": "SELECT id_subdomain FROM SubDomains WHERE subdomain_name = ?",
+    "channel_exists": "SELECT 1 FROM Channel WHERE id_channel = ?",
+    # replace → merge into an existing name, or rename in place
+    "merge_domain": "UPDATE Channel SET id_domain = ? WHERE id_domain = ?",
+    "merge_subdomain": "UPDATE Channel SET id_subdomain = ? WHERE id_subdomain = ?",
+    "drop_domain": "DELETE FROM Domains WHERE id_domain = ?",
+    "drop_subdomain": "DELETE FROM SubDomains WHERE id_subdomain = ?",
+    "rename_domain": "UPDATE Domains SET domain_name = ? WHERE id_domain = ?",
+    "rename_subdomain": "UPDATE SubDomains SET subdomain_name = ? WHERE id_subdomain = ?",
+    "cleanup_domains": """
+        DELETE FROM Domains
+        WHERE id_domain NOT IN (
+            SELECT id_domain FROM Channel WHERE id_domain IS NOT NULL
+            UNION
+            SELECT id_domain FROM Stocked WHERE id_domain IS NOT NULL
+        )
+    """,
+    "cleanup_subdomains": """
+        DELETE FROM SubDomains
+        WHERE id_subdomain NOT IN (
+            SELECT id_subdomain FROM Channel WHERE id_subdomain IS NOT NULL
+            UNION
+            SELECT id_subdomain FROM Stocked WHERE id_subdomain IS NOT NULL
+        )
+    """,
+}
 
 def _get_or_create_domain(conn: sqlite3.Connection, domain_name: str) -> int:
     domain_name = domain_name.strip()
     if not domain_name:
         raise ValueError("Domain name cannot be empty.")
-    cur = conn.execute(
-        "SELECT id_domain FROM Domains WHERE domain_name = ?",
-        (domain_name,),
-    )
-    row = cur.fetchone()
-    if row:
-        return row["id_domain"]
-    cur = conn.execute(
-        "INSERT INTO Domains (domain_name) VALUES (?)",
-        (domain_name,),
-    )
-    return cur.lastrowid
+    row = conn.execute(QUERIES["upsert_domain"], (domain_name,)).fetchone()
+    return row["id_domain"]
 
 def _get_or_create_subdomain(conn: sqlite3.Connection, subdomain_name: str) -> int:
     subdomain_name = subdomain_name.strip()
     if not subdomain_name:
         raise ValueError("Subdomain name cannot be empty.")
-    cur = conn.execute(
-        "SELECT id_subdomain FROM SubDomains WHERE subdomain_name = ?",
-        (subdomain_name,),
-    )
-    row = cur.fetchone()
-    if row:
-        return row["id_subdomain"]
-    cur = conn.execute(
-        "INSERT INTO SubDomains (subdomain_name) VALUES (?)",
-        (subdomain_name,),
-    )
-    return cur.lastrowid
+    row = conn.execute(QUERIES["upsert_subdomain"], (subdomain_name,)).fetchone()
+    return row["id_subdomain"]
 
 def _get_domain_id(conn: sqlite3.Connection, domain_name: str) -> int:
     domain_name = domain_name.strip()
     if not domain_name:
         raise ValueError("Domain name cannot be empty.")
-    cur = conn.execute(
-        "SELECT id_domain FROM Domains WHERE domain_name = ?",
-        (domain_name,),
-    )
+    cur = conn.execute(QUERIES["find_domain"], (domain_name,))
     row = cur.fetchone()
     if not row:
         raise ValueError(f"Domain '{domain_name}' not found.")
@@ -67,32 +76,15 @@ def _get_subdomain_id(conn: sqlite3.Connection, subdomain_name: str) -> int:
     subdomain_name = subdomain_name.strip()
     if not subdomain_name:
         raise ValueError("Subdomain name cannot be empty.")
-    cur = conn.execute(
-        "SELECT id_subdomain FROM SubDomains WHERE subdomain_name = ?",
-        (subdomain_name,),
-    )
+    cur = conn.execute(QUERIES["find_subdomain"], (subdomain_name,))
     row = cur.fetchone()
     if not row:
         raise ValueError(f"Subdomain '{subdomain_name}' not found.")
     return row["id_subdomain"]
 
 def _cleanup_unused_categories(conn: sqlite3.Connection) -> None:
-    conn.execute("""
-        DELETE FROM Domains
-        WHERE id_domain NOT IN (
-            SELECT id_domain FROM Channel WHERE id_domain IS NOT NULL
-            UNION
-            SELECT id_domain FROM Stocked WHERE id_domain IS NOT NULL
-        )
-    """)
-    conn.execute("""
-        DELETE FROM SubDomains
-        WHERE id_subdomain NOT IN (
-            SELECT id_subdomain FROM Channel WHERE id_subdomain IS NOT NULL
-            UNION
-            SELECT id_subdomain FROM Stocked WHERE id_subdomain IS NOT NULL
-        )
-    """)
+    conn.execute(QUERIES["cleanup_domains"])
+    conn.execute(QUERIES["cleanup_subdomains"])
 
 def _handle_assign(
     conn: sqlite3.Connection,
@@ -100,7 +92,7 @@ def _handle_assign(
     domain_name: str | None,
     subdomain_name: str | None,
 ) -> dict[str, Any]:
-    if not conn.execute("SELECT 1 FROM Channel WHERE id_channel = ?", (channel_id,)).fetchone():
+    if not conn.execute(QUERIES["channel_exists"], (channel_id,)).fetchone():
         raise ValueError(f"Channel with ID {channel_id} not found")
     updates: list[str] = []
     params: list[Any] = []
@@ -141,25 +133,47 @@ def _handle_replace(
         raise ValueError("Old and new names cannot be empty")
     if old_name == new_name:
         return {"status": "no_changes", "reason": "old and new names are identical"}
-    is_domain = target == "domain"
-    table = "Domains" if is_domain else "SubDomains"
-    id_col = "id_domain" if is_domain else "id_subdomain"
-    name_col = "domain_name" if is_domain else "subdomain_name"
-    get_id = _get_domain_id if is_domain else _get_subdomain_id
+    get_id = _get_domain_id if target == "domain" else _get_subdomain_id
     old_id = get_id(conn, old_name)
-    cur = conn.execute(f"SELECT {id_col} FROM {table} WHERE {name_col} = ?", (new_name,))
+    cur = conn.execute(QUERIES[f"find_{target}"], (new_name,))
     new_row = cur.fetchone()
     if new_row:
-        new_id = new_row[id_col]
-        conn.execute(f"UPDATE Channel SET {id_col} = ? WHERE {id_col} = ?", (new_id, old_id))
-        conn.execute(f"DELETE FROM {table} WHERE {id_col} = ?", (old_id,))
+        new_id = new_row[0]
+        conn.execute(QUERIES[f"merge_{target}"], (new_id, old_id))
+        conn.execute(QUERIES[f"drop_{target}"], (old_id,))
         _cleanup_unused_categories(conn)
         return {"status": "success", "operation": "merged", "from": old_name, "into": new_name}
     else:
-        conn.execute(f"UPDATE {table} SET {name_col} = ? WHERE {id_col} = ?", (new_name, old_id))
+        conn.execute(QUERIES[f"rename_{target}"], (new_name, old_id))
         return {"status": "success", "operation": "renamed", "from": old_name, "to": new_name}
 
-def Write(
+def _write_op(
+    conn: sqlite3.Connection,
+    operation: str,
+    a: str | None,
+    b: str | None,
+    c: str | None,
+) -> dict[str, Any]:
+    """Writer op: runs inside the writer's transaction (one savepoint)."""
+    if operation == "assign":
+        if c is None or not (c_str := str(c).strip()):
+            raise ValueError("Channel ID (c) is required for assign operation")
+        try:
+            channel_id = int(c_str)
+        except ValueError:
+            raise ValueError("Channel ID (c) must be an integer")
+        return _handle_assign(conn, channel_id, a, b)
+    if a is None or not (target := str(a).strip().lower()):
+        raise ValueError("Parameter 'a' must be 'domain' or 'subdomain'")
+    if target not in {"domain", "subdomain"}:
+        raise ValueError("Parameter 'a' must be 'domain' or 'subdomain'")
+    if b is None or not (old := str(b).strip()):
+        raise ValueError("Old name (b) is required")
+    if c is None or not (new := str(c).strip()):
+        raise ValueError("New name (c) is required")
+    return _handle_replace(conn, target, old, new)
+
+async def Write(
     username: str,
     db_dir: str | Path | None = None,
     operation: str = "",
@@ -177,29 +191,5 @@ def Write(
     operation = operation.strip().lower()
     if operation not in {"assign", "replace"}:
         raise ValueError("Operation must be 'assign' or 'replace' (delete operations are now in delete.py)")
-    with _db_connection(db_path, readonly=False) as conn:
-        conn.execute("BEGIN")
-        try:
-            if operation == "assign":
-                if c is None or not (c_str := str(c).strip()):
-                    raise ValueError("Channel ID (c) is required for assign operation")
-                try:
-                    channel_id = int(c_str)
-                except ValueError:
-                    raise ValueError("Channel ID (c) must be an integer")
-                result = _handle_assign(conn, channel_id, a, b)
-            elif operation == "replace":
-                if a is None or not (target := str(a).strip().lower()):
-                    raise ValueError("Parameter 'a' must be 'domain' or 'subdomain'")
-                if target not in {"domain", "subdomain"}:
-                    raise ValueError("Parameter 'a' must be 'domain' or 'subdomain'")
-                if b is None or not (old := str(b).strip()):
-                    raise ValueError("Old name (b) is required")
-                if c is None or not (new := str(c).strip()):
-                    raise ValueError("New name (c) is required")
-                result = _handle_replace(conn, target, old, new)
-            conn.commit()
-            return result
-        except Exception:
-            conn.rollback()
-            raise
+    # Queued on the DB's single writer, committed together with whatever else is pending
+    return await write_async(db_path, _write_op, operation, a, b, c)
@@ -0,0 +1,237 @@
+from __future__ import annotations
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable
+
+from ..operation.compact import thumbnail_url, watch_url
+
+try:  # Optional: smaller title blobs
+    import zstandard as zstd
+except ImportError:  # pragma: no cover - optional dependency
+    zstd = None
+
+# ===============================
+# Settings
+# ===============================
+ARCHIVE_ENABLED = os.environ.get("HYDRA_ARCHIVE_ENABLED", "1") != "0"
+ARCHIVE_ZSTD = os.environ.get("HYDRA_ARCHIVE_ZSTD", "1") != "0" and zstd is not None
+ARCHIVE_DIRNAME = "archive"     # content/archive/{username}.db → outside the content/*.db glob
+
+CODEC_TEXT = 0
+CODEC_ZSTD = 1
+
+# ===============================
+# Centralized SQL Queries
+# ===============================
+QUERIES = {
+    "create_catalog": """
+        CREATE TABLE IF NOT EXISTS archive.Partitions (
+            month   TEXT PRIMARY KEY,          -- 'YYYYMM'
+            rows    INTEGER NOT NULL DEFAULT 0
+        )
+    """,
+    # {month} is always a 6-digit string built by _month_of()
+    "create_partition": """
+        CREATE TABLE IF NOT EXISTS archive.Archive_{month} (
+            video_id      TEXT PRIMARY KEY,
+            channel_id    INTEGER,
+            channel_name  TEXT,
+            title         BLOB NOT NULL,
+            codec         INTEGER NOT NULL DEFAULT 0,
+            published     INTEGER,
+            seen_at       INTEGER
+        ) WITHOUT ROWID
+    """,
+    "create_partition_index": """
+        CREATE INDEX IF NOT EXISTS archive.idx_archive_{month}_channel
+        ON Archive_{month}(channel_id, published)
+    """,
+    # Channel filter by name: = ? COLLATE NOCASE can use it, LOWER(channel_name) could not
+    "create_partition_name_index": """
+        CREATE INDEX IF NOT EXISTS archive.idx_archive_{month}_name
+        ON Archive_{month}(channel_name COLLATE NOCASE, published)
+    """,
+    # video_id is the key: a batch copied again after an interrupted move is a no-op
+    "insert_partition": """
+        INSERT OR IGNORE INTO archive.Archive_{month}
+        (video_id, channel_id, channel_name, title, codec, published, seen_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """,
+    "bump_catalog": """
+        INSERT INTO archive.Partitions (month, rows) VALUES (?, ?)
+        ON CONFLICT(month) DO UPDATE SET rows = rows + excluded.rows
+    """,
+    "list_partitions": "SELECT month FROM Partitions ORDER BY month DESC",
+    "list_attached_partitions": "SELECT month FROM archive.Partitions",
+    # Read side, completed by query_archive with one of FILTERS
+    "select_partition": """
+        SELECT video_id, channel_id, channel_name, title, codec, published, seen_at
+        FROM Archive_{month}
+    """,
+}
+FILTERS = {
+    "all": "",
+    "channel_id": "WHERE channel_id = ?",
+    "channel_name": "WHERE channel_name = ? COLLATE NOCASE",
+}
+
+# ===============================
+# Helpers
+# ===============================
+def archive_path(db_path: Path | str) -> Path:
+    db_path = Path(db_path)
+    return db_path.parent / ARCHIVE_DIRNAME / f"{db_path.stem}.db"
+
+
+def _month_of(epoch: int | None) -> str:
+    return datetime.fromtimestamp(epoch or 0).strftime("%Y%m")
+
+
+def _encode_title(title: str) -> tuple[bytes, int]:
+    raw = title.encode("utf-8")
+    if ARCHIVE_ZSTD:
+        packed = zstd.ZstdCompressor(level=9).compress(raw)
+        if len(packed) < len(raw):
+            return packed, CODEC_ZSTD
+    return raw, CODEC_TEXT
+
+
+def _decode_title(blob: bytes | str, codec: int) -> str:
+    if isinstance(blob, str):
+        return blob
+    if codec == CODEC_ZSTD:
+        if zstd is None:
+            return "(compressed title: install zstandard to read)"
+        return zstd.ZstdDecompressor().decompress(blob).decode("utf-8")
+    return blob.decode("utf-8")
+
+
+def _create_partition(conn: sqlite3.Connection, month: str) -> None:
+    conn.execute(QUERIES["create_partition"].format(month=month))
+    conn.execute(QUERIES["create_partition_index"].format(month=month))
+    conn.execute(QUERIES["create_partition_name_index"].format(month=month))
+
+# ===============================
+# Write side (called by retention, one op per file: see retention._archive_batch)
+# ===============================
+def attach(conn: sqlite3.Connection, db_path: Path | str) -> None:
+    if any(row[1] == "archive" for row in conn.execute("PRAGMA database_list")):
+        return  # long-lived writer connection, a previous pass never detached
+    path = archive_path(db_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn.execute("ATTACH DATABASE ? AS archive", (str(path),))
+    conn.execute(QUERIES["create_catalog"])
+    # Partitions written before the name index existed get it here (IF NOT EXISTS → cheap)
+    for (month,) in conn.execute(QUERIES["list_attached_partitions"]).fetchall():
+        _create_partition(conn, month)
+
+
+def detach(conn: sqlite3.Connection) -> None:
+    conn.execute("DETACH DATABASE archive")
+
+
+def append_rows(conn: sqlite3.Connection, rows: Iterable[tuple]) -> int:
+    """
+    rows: (video_id, title, channel_id, channel_name, published, seen_at)
+    Partitioned by month of publication (seen_at when unknown). Append-only and
+    idempotent: rows already archived are skipped and not counted again.
+    """
+    by_month: dict[str, list[tuple]] = {}
+    for video_id, title, channel_id, channel_name, published, seen_at in rows:
+        blob, codec = _encode_title(title or "")
+        month = _month_of(published or seen_at)
+        by_month.setdefault(month, []).append(
+            (video_id, channel_id, channel_name, blob, codec, published, seen_at)
+        )
+
+    written = 0
+    for month, batch in by_month.items():
+        _create_partition(conn, month)
+        cur = conn.executemany(QUERIES["insert_partition"].format(month=month), batch)
+        conn.execute(QUERIES["bump_catalog"], (month, cur.rowcount))
+        written += cur.rowcount
+    return written
+
+# ===============================
+# Read side (lazy: opened only when asked)
+# ===============================
+@contextmanager
+def _archive_connection(db_path: Path | str):
+    path = archive_path(db_path)
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def query_archive(
+    db_path: Path | str,
+    channel: str | None = None,
+    month: str | None = None,
+    limit: int = 100,
+) -> dict[str, Any]:
+    """
+    channel: channel name (case-insensitive) or numeric channel id
+    month:   'YYYY-MM' or 'YYYYMM'; newest partitions first when omitted
+    """
+    if not archive_path(db_path).is_file():
+        return {"videos": [], "months": []}
+
+    wanted = month.replace("-", "") if month else None
+    if wanted is not None and not re.fullmatch(r"\d{6}", wanted):
+        raise ValueError("month must look like YYYY-MM")
+
+    with _archive_connection(db_path) as conn:
+        months = [r["month"] for r in conn.execute(QUERIES["list_partitions"])]
+        scan = [m for m in months if m == wanted] if wanted else months
+
+        where, params = FILTERS["all"], []
+        if channel:
+            if channel.isdigit():
+                where, params = FILTERS["channel_id"], [int(channel)]
+            else:
+                where, params = FILTERS["channel_name"], [channel.strip()]
+
+        videos: list[dict[str, Any]] = []
+        for m in scan:
+            if len(videos) >= limit:
+                break
+            rows = conn.execute(
+                f"{QUERIES['select_partition'].format(month=m)} {where} ORDER BY published DESC LIMIT ?",
+                [*params, limit - len(videos)],
+            ).fetchall()
+            videos.extend(
+                {
+                    "id": row["video_id"],
+                    "title": _decode_title(row["title"], row["codec"]),
+                    "creator": row["channel_name"],
+                    "url": watch_url(row["video_id"]),
+                    "thumbnail": thumbnail_url(row["video_id"]),
+                    "published": row["published"],
+                    "seen_at": row["seen_at"],
+                }
+                for row in rows
+            )
+
+    return {"videos": videos, "months": [f"{m[:4]}-{m[4:]}" for m in months]}
+
+"""
+Layout:
+  - content/archive/{username}.db, one WITHOUT ROWID table per month (Archive_YYYYMM)
+  - Partitions catalog → reads only open the months they need
+  - Titles zstd-compressed when `zstandard` is installed and it actually helps
+  - Per partition: (channel_id, published) and (channel_name NOCASE, published) indexes
+    → a channel filter is one index range per month, already in published order
+  - Idempotent appends (INSERT OR IGNORE on video_id): a cross-file commit on an
+    ATTACHed DB is not atomic under WAL, so retention copies and deletes in two commits
+
+Imported by:
+  - retention.py (write, ATTACHed on the writer connection for a pass)
+  - main.py (read API)
+"""
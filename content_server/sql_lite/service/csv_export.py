@@ -41,7 +41,7 @@ class DBExporter:
         output_csv.parent.mkdir(parents=True, exist_ok=True)
 
         cursor.execute(QUERIES["get_tracked_channels"])
-        raw_rows = cursor.fetchuncategorized()  # (rss_id, id_channel, name, url, domain, subdomain)
+        raw_rows = cursor.fetchall()  # (rss_id, id_channel, name, url, domain, subdomain)
 
         if not raw_rows:
             print("No tracked channels found (Channels table empty or no valid UC ids).")
@@ -7,14 +7,23 @@ from typing import List, Optional, Dict
 from pydantic import BaseModel, AnyUrl, ValidationError, StringConstraints
 from typing_extensions import Annotated
 
+from .writer import write
+
 # ===============================
 # Centralized SQL Queries (Updated for new schema)
 # ===============================
 QUERIES = {
-    "upsert_domain": "INSERT OR IGNORE INTO Domains (domain_name) VALUES (?)",
-    "get_domain_id": "SELECT id_domain FROM Domains WHERE domain_name = ?",
-    "upsert_subdomain": "INSERT OR IGNORE INTO SubDomains (subdomain_name) VALUES (?)",
-    "get_subdomain_id": "SELECT id_subdomain FROM SubDomains WHERE subdomain_name = ?",
+    # Get-or-create in one statement: the no-op DO UPDATE lets RETURNING see existing rows
+    "upsert_domain": """
+        INSERT INTO Domains (domain_name) VALUES (?)
+        ON CONFLICT(domain_name) DO UPDATE SET domain_name = excluded.domain_name
+        RETURNING id_domain
+    """,
+    "upsert_subdomain": """
+        INSERT INTO SubDomains (subdomain_name) VALUES (?)
+        ON CONFLICT(subdomain_name) DO UPDATE SET subdomain_name = excluded.subdomain_name
+        RETURNING id_subdomain
+    """,
     "upsert_channel": """
         INSERT INTO Channel
         (channel_name, channel_url, channel_logo, id_domain, id_subdomain)
@@ -23,8 +32,8 @@ QUERIES = {
             channel_name = excluded.channel_name,
             id_domain = excluded.id_domain,
             id_subdomain = excluded.id_subdomain
+        RETURNING id_channel
     """,
-    "get_channel_id": "SELECT id_channel FROM Channel WHERE channel_url = ?",
     "upsert_backend": """
         INSERT INTO Channels (rss_id, id_channel)
         VALUES (?, ?)
@@ -136,38 +145,27 @@ class DatabaseImporter:
     @staticmethod
     def import_channels(cursor: sqlite3.Cursor, channels: List[ChannelRow]) -> None:
         # Ensure default domain/subdomain exist
-        cursor.execute(QUERIES["upsert_domain"], ("uncategorized",))
-        cursor.execute(QUERIES["get_domain_id"], ("uncategorized",))
-        default_domain_id = cursor.fetchone()[0]
-        cursor.execute(QUERIES["upsert_subdomain"], ("uncategorized",))
-        cursor.execute(QUERIES["get_subdomain_id"], ("uncategorized",))
-        default_subdomain_id = cursor.fetchone()[0]
+        cursor.execute(QUERIES["upsert_domain"], ("uncategorized",)).fetchone()
+        default_subdomain_id = cursor.execute(QUERIES["upsert_subdomain"], ("uncategorized",)).fetchone()[0]
 
         inserted = 0
         for ch in channels:
             try:
                 # Domain
                 domain_name = ch.domain or "uncategorized"
-                cursor.execute(QUERIES["upsert_domain"], (domain_name,))
-                cursor.execute(QUERIES["get_domain_id"], (domain_name,))
-                domain_id = cursor.fetchone()[0]
+                domain_id = cursor.execute(QUERIES["upsert_domain"], (domain_name,)).fetchone()[0]
 
                 # Subdomain
                 subdomain_name = ch.subdomain or "uncategorized"
-                cursor.execute(QUERIES["upsert_subdomain"], (subdomain_name,))
-                cursor.execute(QUERIES["get_subdomain_id"], (subdomain_name,))
-                row = cursor.fetchone()
+                row = cursor.execute(QUERIES["upsert_subdomain"], (subdomain_name,)).fetchone()
                 subdomain_id = row[0] if row else default_subdomain_id
 
                 # Channel upsert (proper upsert on unique channel_url, logo untouched on conflict)
-                cursor.execute(
+                # RETURNING hands back the id of the inserted or updated row
+                id_channel = cursor.execute(
                     QUERIES["upsert_channel"],
                     (ch.channel_name, str(ch.channel_url), None, domain_id, subdomain_id)
-                )
-
-                # Retrieve channel by unique channel_url
-                cursor.execute(QUERIES["get_channel_id"], (str(ch.channel_url),))
-                id_channel = cursor.fetchone()[0]
+                ).fetchone()[0]
 
                 # Backend tracking link (upsert on rss_id)
                 cursor.execute(QUERIES["upsert_backend"], (ch.rss_id, id_channel))
@@ -179,25 +177,25 @@ class DatabaseImporter:
 
         print(f"Successfully imported {inserted}/{len(channels)} channels")
 
+def _import_op(conn: sqlite3.Connection, channels: List[ChannelRow]) -> None:
+    """Writer op (sql_lite/service/writer.py)."""
+    DatabaseImporter.import_channels(conn.cursor(), channels)
+
 # ===============================
 # THE ONE AND ONLY PUBLIC FUNCTION
 # ===============================
 def import_csv(csv_path: Path, db_path: Path) -> None:
     """
     Single entry point.
-    This function opens its own connection, enables foreign keys,
-    and commits the transaction.
+    Parses here, then hands the inserts to the DB's single writer
+    (one transaction, foreign keys on) and waits for the commit.
     """
     try:
         csv_path = Path(csv_path)
         db_path = Path(db_path)
         print(f"Starting CSV import → {csv_path.name}")
         channels = CSVParser.parse(csv_path)
-        with sqlite3.connect(db_path) as conn:
-            conn.execute("PRAGMA foreign_keys = ON")
-            cursor = conn.cursor()
-            DatabaseImporter.import_channels(cursor, channels)
-            conn.commit()
+        write(db_path, _import_op, channels)
         print("CSV import completed successfully")
     except Exception as e:
         print(f"Import failed: {e}")
@@ -209,7 +207,8 @@ def import_csv(csv_path: Path, db_path: Path) -> None:
 """
 Handled:
     - Both CSV styles (standard + with Domains/Sub Domains)
-    - Proper upserts using unique constraints (channel_url UNIQUE, rss_id PRIMARY KEY)
+    - Proper upserts using unique constraints (channel_url UNIQUE, rss_id PRIMARY KEY),
+      ids via RETURNING (no upsert-then-select round trip)
     - channel_name no longer assumed unique → retrieval by channel_url
     - channel_logo left untouched on updates (remains None or previously set)
     - Foreign keys respected
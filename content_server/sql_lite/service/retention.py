@@ -0,0 +1,141 @@
+from __future__ import annotations
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from . import archive
+from .writer import write
+
+log = logging.getLogger(__name__)
+
+# ===============================
+# Settings
+# ===============================
+RETENTION_AFTER_SEEN_SEC = int(os.environ.get("HYDRA_RETENTION_AFTER_SEEN_SEC", 2 * 3600))
+RETENTION_INTERVAL_SEC = int(os.environ.get("HYDRA_RETENTION_INTERVAL_SEC", 10 * 60))
+RETENTION_BATCH_ROWS = 500        # rows per DELETE transaction → short write locks
+VACUUM_PAGES_PER_PASS = 256       # incremental_vacuum budget per DB per pass
+
+# ===============================
+# Centralized SQL Queries
+# ===============================
+QUERIES = {
+    # Rows marked seen before seen_at existed lost their sleeping task → start their clock now
+    "stamp_legacy_seen": "UPDATE Result SET seen_at = ? WHERE seen = 1 AND seen_at IS NULL",
+    "select_expired_batch": """
+        SELECT r.video_id, r.title, r.channel_id, c.channel_name, r.published, r.seen_at
+        FROM Result r
+        LEFT JOIN Channel c ON c.id_channel = r.channel_id
+        WHERE r.seen_at IS NOT NULL AND r.seen_at <= ?
+        LIMIT ?
+    """,
+    # Second half of a move: only rows the first op copied, and only if still expired
+    "delete_archived": "DELETE FROM Result WHERE video_id = ? AND seen_at <= ?",
+    "delete_expired_batch": """
+        DELETE FROM Result
+        WHERE video_id IN (
+            SELECT video_id FROM Result
+            WHERE seen_at IS NOT NULL AND seen_at <= ?
+            LIMIT ?
+        )
+    """,
+}
+
+# ===============================
+# One DB
+# ===============================
+def purge_db(db_path: Path | str, now: float | None = None) -> int:
+    """
+    Move expired seen results to the cold archive (or just delete them when
+    archiving is off) in bounded batches, then give pages back.
+    Every step is a separate op on the DB's writer → other writes interleave.
+    """
+    now = now or time.time()
+    cutoff = int(now - RETENTION_AFTER_SEEN_SEC)
+    removed = 0
+    write(db_path, _stamp_legacy_seen, int(now))
+    if archive.ARCHIVE_ENABLED:
+        write(db_path, archive.attach, db_path, transactional=False)
+    try:
+        while True:
+            if archive.ARCHIVE_ENABLED:
+                # Copy, then delete: two ops → two commits, each on one file
+                video_ids = write(db_path, _archive_batch, cutoff)
+                removed += write(db_path, _delete_archived, video_ids, cutoff) if video_ids else 0
+                count = len(video_ids)
+            else:
+                count = write(db_path, _delete_batch, cutoff)
+                removed += count
+            if count < RETENTION_BATCH_ROWS:
+                break
+    finally:
+        if archive.ARCHIVE_ENABLED:
+            write(db_path, archive.detach, transactional=False)
+    if removed:
+        write(db_path, _incremental_vacuum, transactional=False)
+    return removed
+
+
+def _stamp_legacy_seen(conn: sqlite3.Connection, now: int) -> None:
+    conn.execute(QUERIES["stamp_legacy_seen"], (now,))
+
+
+def _incremental_vacuum(conn: sqlite3.Connection) -> None:
+    # No-op unless the file is auto_vacuum=INCREMENTAL (migrate.py step storage_layout)
+    conn.execute(f"PRAGMA incremental_vacuum({VACUUM_PAGES_PER_PASS})").fetchall()
+
+
+def _delete_batch(conn: sqlite3.Connection, cutoff: int) -> int:
+    return conn.execute(QUERIES["delete_expired_batch"], (cutoff, RETENTION_BATCH_ROWS)).rowcount
+
+
+def _archive_batch(conn: sqlite3.Connection, cutoff: int) -> list[str]:
+    """Copy one batch to the archive (INSERT OR IGNORE) → the video_ids now safe to delete."""
+    rows = conn.execute(QUERIES["select_expired_batch"], (cutoff, RETENTION_BATCH_ROWS)).fetchall()
+    if rows:
+        archive.append_rows(conn, rows)
+    return [row[0] for row in rows]
+
+
+def _delete_archived(conn: sqlite3.Connection, video_ids: list[str], cutoff: int) -> int:
+    return conn.executemany(QUERIES["delete_archived"], ((video_id, cutoff) for video_id in video_ids)).rowcount
+
+# ===============================
+# Worker (one for all user DBs)
+# ===============================
+async def run_retention_worker(db_dir: Path | str) -> None:
+    db_dir = Path(db_dir)
+    log.info("Retention worker started: %s (keep seen results %ds)", db_dir, RETENTION_AFTER_SEEN_SEC)
+    while True:
+        for db_path in sorted(db_dir.glob("*.db")):
+            try:
+                deleted = await asyncio.to_thread(purge_db, db_path)
+                if deleted:
+                    log.info("Retention: archived %d expired result(s) from %s", deleted, db_path.name)
+            except Exception:
+                log.exception("Retention pass failed for %s", db_path)
+        await asyncio.sleep(RETENTION_INTERVAL_SEC)
+
+"""
+Replaces:
+  - delete._mark_seen_then_cleanup_after_delay (one sleeping task + open connection per login)
+
+Operation:
+  - Login → Delete(daily_cleanup) → single UPDATE stamping seen_at
+  - This worker → every RETENTION_INTERVAL_SEC, each DB: move seen_at older than
+    RETENTION_AFTER_SEEN_SEC to the cold archive (archive.py) in RETENTION_BATCH_ROWS
+    chunks, then incremental_vacuum
+  - Restart-safe: the only state is Result.seen_at
+  - Moves are idempotent, not atomic: a transaction over the ATTACHed archive and
+    the WAL main DB can commit one file and not the other. So a batch is copied
+    (INSERT OR IGNORE on video_id) in one op and deleted from Result in the next.
+    A crash in between leaves rows in both places. The next pass copies them again
+    as no-ops and deletes them.
+  - Writes go through the DB's single writer (writer.py), one op per batch
+
+Imported by:
+  - main.py
+"""
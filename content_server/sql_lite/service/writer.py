@@ -0,0 +1,222 @@
+from __future__ import annotations
+import asyncio
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, NamedTuple
+
+log = logging.getLogger(__name__)
+
+# ===============================
+# Settings
+# ===============================
+GROUP_COMMIT_MAX_OPS = int(os.environ.get("HYDRA_GROUP_COMMIT_MAX_OPS", 64))
+WRITER_IDLE_SEC = float(os.environ.get("HYDRA_WRITER_IDLE_SEC", 300))  # thread + connection closed after this
+
+Op = Callable[..., Any]  # op(conn, *args) → result; never commits itself
+
+
+class _Item(NamedTuple):
+    op: Op
+    args: tuple
+    future: Future
+    transactional: bool
+
+# ===============================
+# One writer per user DB
+# ===============================
+class DBWriter:
+    """
+    Owns the only write connection of one DB. Operations queue up from any
+    thread or event loop; the writer drains whatever is waiting, runs it in
+    ONE transaction (a savepoint per operation, so one failure doesn't sink
+    the others) and resolves every future after the single COMMIT.
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = db_path
+        self._queue: queue.Queue[_Item] = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"writer:{db_path.stem}", daemon=True)
+        self.alive = True
+        self.stats = {"ops": 0, "commits": 0, "max_group": 0}
+        self._thread.start()
+
+    # ---------- Submit side (any thread)
+    def submit(self, op: Op, *args: Any, transactional: bool = True) -> Future:
+        """transactional=False → run alone, outside BEGIN (ATTACH, VACUUM ...)."""
+        fut: Future = Future()
+        self._queue.put(_Item(op, args, fut, transactional))
+        return fut
+
+    # ---------- Writer thread
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=15, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA busy_timeout = 5000")
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def _run(self) -> None:
+        conn: sqlite3.Connection | None = None
+        item: _Item | None = None
+        pending: _Item | None = None
+        group: list[_Item] = []
+        try:
+            conn = self._connect()
+            while True:
+                if pending is None:
+                    try:
+                        pending = self._queue.get(timeout=WRITER_IDLE_SEC)
+                    except queue.Empty:
+                        if _retire(self):
+                            return
+                        continue
+                item, pending = pending, None
+                if not item.transactional:
+                    self._run_alone(conn, item)
+                    continue
+                group = [item]
+                while len(group) < GROUP_COMMIT_MAX_OPS:
+                    try:
+                        nxt = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if not nxt.transactional:
+                        pending = nxt  # runs right after this group commits
+                        break
+                    group.append(nxt)
+                self._run_group(conn, group)
+                group = []
+        except BaseException as e:
+            # Connect failed, or COMMIT / ROLLBACK itself did: nobody may wait on this thread
+            log.exception("Writer for %s died", self.db_path.name)
+            self._abandon(e, [*group, *(held for held in (item, pending) if held is not None)])
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _abandon(self, error: BaseException, items: list[_Item]) -> None:
+        """Fail every unresolved future and leave the registry → the next write() starts a new writer."""
+        with _registry_lock:  # _submit holds it too → nothing can be queued here after this
+            self.alive = False
+            if _writers.get(self.db_path) is self:
+                del _writers[self.db_path]
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        for item in items:
+            if not item.future.done():
+                item.future.set_exception(error)
+
+    def _run_alone(self, conn: sqlite3.Connection, item: _Item) -> None:
+        if not item.future.set_running_or_notify_cancel():
+            return  # caller gave up before its turn
+        try:
+            item.future.set_result(item.op(conn, *item.args))
+        except Exception as e:
+            item.future.set_exception(e)
+
+    def _run_group(self, conn: sqlite3.Connection, group: list[_Item]) -> None:
+        outcomes: list[tuple[Future, bool, Any]] = []
+        started = time.perf_counter()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for op, args, fut, _ in group:
+                if not fut.set_running_or_notify_cancel():
+                    continue  # caller gave up before its turn
+                conn.execute("SAVEPOINT op")
+                try:
+                    outcomes.append((fut, True, op(conn, *args)))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO op")
+                    outcomes.append((fut, False, e))
+                conn.execute("RELEASE op")
+            conn.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            log.exception("Group commit failed for %s (%d op(s))", self.db_path.name, len(group))
+            for item in group:
+                fut = item.future
+                if not fut.done() and (fut.running() or fut.set_running_or_notify_cancel()):
+                    fut.set_exception(e)
+            return
+
+        self.stats["ops"] += len(group)
+        self.stats["commits"] += 1
+        self.stats["max_group"] = max(self.stats["max_group"], len(group))
+        if len(group) > 1:
+            log.debug("Group commit %s: %d op(s) in %.1fms",
+                      self.db_path.name, len(group), (time.perf_counter() - started) * 1000)
+        for fut, ok, value in outcomes:
+            if ok:
+                fut.set_result(value)
+            else:
+                fut.set_exception(value)
+
+# ===============================
+# Registry
+# ===============================
+_writers: dict[Path, DBWriter] = {}
+_registry_lock = threading.Lock()
+
+
+def _retire(writer: DBWriter) -> bool:
+    """Idle writer leaves the registry, unless work slipped in meanwhile."""
+    with _registry_lock:
+        if not writer._queue.empty():
+            return False
+        writer.alive = False
+        if _writers.get(writer.db_path) is writer:
+            del _writers[writer.db_path]
+        return True
+
+
+def write(db_path: Path | str, op: Op, *args: Any, transactional: bool = True) -> Any:
+    """Blocking: queue `op` on the DB's writer and wait for its committed result."""
+    return _submit(db_path, op, args, transactional).result()
+
+
+async def write_async(db_path: Path | str, op: Op, *args: Any, transactional: bool = True) -> Any:
+    """Event-loop friendly write(): awaits the commit without blocking the loop."""
+    return await asyncio.wrap_future(_submit(db_path, op, args, transactional))
+
+
+def _submit(db_path: Path | str, op: Op, args: tuple, transactional: bool) -> Future:
+    key = Path(db_path).resolve()
+    with _registry_lock:  # held across put → _retire can't drop a writer with queued work
+        writer = _writers.get(key)
+        if writer is None or not writer.alive:
+            writer = _writers[key] = DBWriter(key)
+        return writer.submit(op, *args, transactional=transactional)
+
+
+def writer_stats() -> dict[str, dict[str, int]]:
+    with _registry_lock:
+        return {path.stem: dict(w.stats) for path, w in _writers.items()}
+
+# ===============================
+# Module Summary
+# ===============================
+"""
+Every mutation of content/{username}.db goes through write()/write_async():
+  - processor (timmer batches, bulk import), Write / Delete (settings page),
+    csv_import, retention
+  - one thread + one connection per DB, spawned on first use, retired when idle
+  - a writer that dies (connect / COMMIT / ROLLBACK error) fails everything it
+    holds and leaves the registry → write() never waits on a dead thread
+  - group commit: everything queued meanwhile shares one BEGIN IMMEDIATE … COMMIT,
+    one SAVEPOINT per op → per-op result or exception
+
+Readers keep their own read-only connections (WAL → they never block the writer).
+An op must not call write() itself (it would wait on its own thread).
+"""
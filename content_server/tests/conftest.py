@@ -0,0 +1,34 @@
+import logging
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# saved.path is read at import time: keep the suite away from the real content/ directory
+os.environ.setdefault("HYDRA_CONTENT_DIR", tempfile.mkdtemp(prefix="hydra-tests-"))
+
+from ..bench.synth import Shape, make_user_db  # noqa: E402  (after HYDRA_CONTENT_DIR)
+
+
+@pytest.fixture(autouse=True)
+def _quiet_migrations(caplog):
+    caplog.set_level(logging.WARNING)  # migrate_db logs every step of every fixture
+
+
+@pytest.fixture
+def user_db(tmp_path: Path) -> Path:
+    """Production schema (create.py, triggers included) with synthetic channels and results."""
+    return make_user_db(tmp_path / "user.db", Shape.for_results(600), seed=7)
+
+
+@pytest.fixture
+def conn(user_db: Path):
+    """Plain connection the way Write / Delete ops get one from the writer (FKs on, autocommit)."""
+    conn = sqlite3.connect(user_db, isolation_level=None)
+    conn.execute("PRAGMA foreign_keys = ON")
+    try:
+        yield conn
+    finally:
+        conn.close()
@@ -0,0 +1,57 @@
+import sqlite3
+import time
+from pathlib import Path
+
+from ..sql_lite.service import archive, retention
+from ..sql_lite.service.retention import purge_db
+from ..sql_lite.service.writer import write
+
+LATER = time.time() + 30 * 86400   # every seen result is past retention by then
+
+
+def _archived(user_db: Path) -> tuple[list[str], int]:
+    conn = sqlite3.connect(archive.archive_path(user_db))
+    try:
+        months = [m for (m,) in conn.execute("SELECT month FROM Partitions")]
+        ids = [v for m in months for (v,) in conn.execute(f"SELECT video_id FROM Archive_{m}")]
+        catalog = conn.execute("SELECT SUM(rows) FROM Partitions").fetchone()[0]
+        return ids, catalog
+    finally:
+        conn.close()
+
+
+def test_interrupted_move_is_finished_by_the_next_pass(user_db: Path, conn: sqlite3.Connection):
+    cutoff = int(LATER - retention.RETENTION_AFTER_SEEN_SEC)
+    expired = conn.execute("SELECT COUNT(*) FROM Result WHERE seen_at <= ?", (cutoff,)).fetchone()[0]
+    assert expired > 0
+
+    # Crash between the two commits: the batch is in the archive AND still in Result
+    write(user_db, archive.attach, user_db, transactional=False)
+    copied = write(user_db, retention._archive_batch, cutoff)
+    write(user_db, archive.detach, transactional=False)
+    assert copied and conn.execute("SELECT COUNT(*) FROM Result WHERE video_id = ?", (copied[0],)).fetchone()[0] == 1
+
+    assert purge_db(user_db, now=LATER) == expired
+    assert conn.execute("SELECT COUNT(*) FROM Result WHERE seen_at <= ?", (cutoff,)).fetchone()[0] == 0
+    ids, catalog = _archived(user_db)
+    assert len(ids) == len(set(ids)) == expired
+    assert catalog == expired   # copied-again rows are not counted twice
+
+
+def test_channel_name_filter_is_case_insensitive_and_indexed(user_db: Path):
+    purge_db(user_db, now=LATER)
+    video_id, name = next(
+        (v["id"], v["creator"]) for v in archive.query_archive(user_db, limit=50)["videos"] if v["creator"]
+    )
+    found = archive.query_archive(user_db, channel=name.swapcase(), limit=1000)["videos"]
+    assert video_id in {v["id"] for v in found}
+    assert {v["creator"] for v in found} == {name}
+
+    arch = sqlite3.connect(archive.archive_path(user_db))
+    try:
+        month = arch.execute("SELECT month FROM Partitions LIMIT 1").fetchone()[0]
+        sql = f"{archive.QUERIES['select_partition'].format(month=month)} {archive.FILTERS['channel_name']}"
+        plan = " ".join(row[3] for row in arch.execute(f"EXPLAIN QUERY PLAN {sql} ORDER BY published DESC", (name,)))
+    finally:
+        arch.close()
+    assert f"USING INDEX idx_archive_{month}_name" in plan and "TEMP B-TREE" not in plan
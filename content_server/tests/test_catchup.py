@@ -0,0 +1,46 @@
+import sqlite3
+import time
+from pathlib import Path
+
+import pytest
+
+from ..youtube import catchup
+from ..youtube.budget import BudgetAllocator
+from ..youtube.catchup import RESULT_WINDOW_DAYS, window_start
+
+DAY = 86400
+
+
+@pytest.fixture
+def channel(conn: sqlite3.Connection) -> tuple[str, int]:
+    """One tracked channel with no results, overdue, at the bottom of the ladder."""
+    rss_id, id_channel = conn.execute("SELECT rss_id, id_channel FROM Channels LIMIT 1").fetchone()
+    conn.execute("DELETE FROM Result WHERE channel_id = ?", (id_channel,))
+    conn.execute("UPDATE Channels SET rank = 'abandoned', counter = 0, ts = 1 WHERE rss_id = ?", (rss_id,))
+    return rss_id, id_channel
+
+
+def _add_results(conn: sqlite3.Connection, id_channel: int, prefix: str, published: list[float]) -> None:
+    conn.executemany(
+        "INSERT INTO Result (video_id, title, channel_id, published) VALUES (?, 't', ?, ?)",
+        [(f"{prefix}{i:08d}", id_channel, int(ts)) for i, ts in enumerate(published)],
+    )
+
+
+def _recent(conn: sqlite3.Connection, rss_id: str, now: float) -> int:
+    rows = conn.execute(catchup.QUERY_OVERDUE, (window_start(now), now))
+    return next(recent for rid, *_, recent in rows if rid == rss_id)
+
+
+def test_old_unseen_results_are_not_uploads(user_db: Path, conn: sqlite3.Connection, channel: tuple[str, int]):
+    rss_id, id_channel = channel
+    now = time.time()
+    # A backlog of 60 unseen results from months ago: not a sign of a busy channel
+    _add_results(conn, id_channel, "old", [now - (RESULT_WINDOW_DAYS + 100 + i) * DAY for i in range(60)])
+    assert _recent(conn, rss_id, now) == 0
+
+    _add_results(conn, id_channel, "new", [now - i * DAY for i in range(3)])
+    assert _recent(conn, rss_id, now) == 3
+
+    (rate,) = [rate for rid, _, rate in BudgetAllocator()._read_demands(user_db) if rid == rss_id]
+    assert rate == pytest.approx(3 / RESULT_WINDOW_DAYS)
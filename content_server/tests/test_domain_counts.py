@@ -0,0 +1,94 @@
+import sqlite3
+import time
+from pathlib import Path
+
+from ..sql_lite.operation import delete, write as write_ops
+from ..sql_lite.operation.counters import check_domain_counts, rebuild_domain_counts
+from ..sql_lite.service.retention import purge_db
+from ..sql_lite.service.writer import write
+
+
+def _busiest_channel(conn: sqlite3.Connection) -> tuple[int, int, int]:
+    """(id_channel, id_domain, results) of the categorized channel with the most results."""
+    return conn.execute("""
+        SELECT c.id_channel, c.id_domain, COUNT(*) AS n
+        FROM Channel c JOIN Result r ON r.channel_id = c.id_channel
+        WHERE c.id_domain IS NOT NULL
+        GROUP BY c.id_channel ORDER BY n DESC LIMIT 1
+    """).fetchone()
+
+
+def _count(conn: sqlite3.Connection, domain_key: int) -> int:
+    row = conn.execute("SELECT count FROM DomainCounts WHERE domain_key = ?", (domain_key,)).fetchone()
+    return row[0] if row else 0
+
+
+def test_fixture_starts_consistent(conn: sqlite3.Connection):
+    assert check_domain_counts(conn) == {}
+    assert sum(count for _, count in conn.execute("SELECT domain_key, count FROM DomainCounts")) == \
+        conn.execute("SELECT COUNT(*) FROM Result").fetchone()[0]
+
+
+def test_channel_delete_cascade(user_db: Path, conn: sqlite3.Connection):
+    channel, domain, results = _busiest_channel(conn)
+    before = _count(conn, domain)
+
+    # Same path as DELETE /setting/{user}/delete/individual: writer op, FKs on → Result CASCADE
+    assert write(user_db, delete._delete_op, "individual", str(channel), None)["status"] == "success"
+
+    assert conn.execute("SELECT COUNT(*) FROM Result WHERE channel_id = ?", (channel,)).fetchone()[0] == 0
+    assert _count(conn, domain) == before - results
+    assert check_domain_counts(conn) == {}
+
+
+def test_batch_delete_by_domain(user_db: Path, conn: sqlite3.Connection):
+    _, domain, _ = _busiest_channel(conn)
+    name = conn.execute("SELECT domain_name FROM Domains WHERE id_domain = ?", (domain,)).fetchone()[0]
+
+    write(user_db, delete._delete_op, "batch", name, None)
+
+    assert _count(conn, domain) == 0
+    assert check_domain_counts(conn) == {}
+
+
+def test_recategorize_and_domain_set_null(user_db: Path, conn: sqlite3.Connection):
+    channel, domain, results = _busiest_channel(conn)
+
+    write(user_db, write_ops._write_op, "assign", "brand-new-domain", None, str(channel))
+    new_domain = conn.execute("SELECT id_domain FROM Channel WHERE id_channel = ?", (channel,)).fetchone()[0]
+    assert _count(conn, new_domain) == results
+    assert check_domain_counts(conn) == {}
+
+    # Domains ON DELETE SET NULL moves every channel of the domain to "uncategorized" (key 0)
+    uncategorized = _count(conn, 0)
+    conn.execute("DELETE FROM Domains WHERE id_domain = ?", (new_domain,))
+    assert _count(conn, 0) == uncategorized + results
+    assert check_domain_counts(conn) == {}
+
+
+def test_result_insert_and_retention_delete(user_db: Path, conn: sqlite3.Connection):
+    channel, domain, _ = _busiest_channel(conn)
+    before = _count(conn, domain)
+    conn.executemany(
+        "INSERT INTO Result (video_id, title, channel_id, published) VALUES (?, ?, ?, ?)",
+        [(f"newvideo{i:03d}", f"new {i}", channel, int(time.time())) for i in range(3)],
+    )
+    assert _count(conn, domain) == before + 3
+
+    # Login marks everything seen, retention removes it once expired
+    write(user_db, delete._delete_op, "daily_cleanup", None, None)
+    assert purge_db(user_db, now=time.time() + 30 * 86400) > 0
+    assert conn.execute("SELECT COUNT(*) FROM Result").fetchone()[0] == 0
+    assert check_domain_counts(conn) == {}
+
+
+def test_check_reports_drift_and_rebuild_repairs_it(conn: sqlite3.Connection):
+    _, domain, _ = _busiest_channel(conn)
+    conn.execute("UPDATE DomainCounts SET count = count + 5 WHERE domain_key = ?", (domain,))
+    stored, actual = check_domain_counts(conn)[domain]
+    assert stored - actual == 5
+
+    with conn:
+        conn.execute("BEGIN")
+        rebuild_domain_counts(conn)
+    assert check_domain_counts(conn) == {}
@@ -0,0 +1,91 @@
+import sqlite3
+import time
+from pathlib import Path
+
+from ..sql_lite.operation import delete, write as write_ops
+from ..sql_lite.operation.compact import thumbnail_url, watch_url
+from ..sql_lite.operation.read import Feed
+from ..sql_lite.service.writer import write
+
+# What FeedItem must hold: Result joined with its channel right now (same shape as feed_items.backfill)
+EXPECTED = """
+    SELECT COALESCE(c.id_domain, 0), COALESCE(c.id_subdomain, 0), COALESCE(r.published, 0),
+           r.video_id, r.title, c.id_channel, c.channel_name
+    FROM Result r
+    JOIN Channel c ON c.id_channel = r.channel_id
+"""
+STORED = """
+    SELECT domain_id, subdomain_id, published, video_id, title, channel_id, channel_name
+    FROM FeedItem
+"""
+
+
+def assert_in_sync(conn: sqlite3.Connection) -> None:
+    expected = set(conn.execute(EXPECTED).fetchall())
+    stored = set(conn.execute(STORED).fetchall())
+    assert stored == expected, (
+        f"{len(stored - expected)} stale FeedItem row(s), {len(expected - stored)} missing"
+    )
+
+
+def _categorized_channel(conn: sqlite3.Connection) -> tuple[int, int]:
+    """(id_channel, id_domain) of the channel with both categories and the most results."""
+    return conn.execute("""
+        SELECT c.id_channel, c.id_domain FROM Channel c JOIN Result r ON r.channel_id = c.id_channel
+        WHERE c.id_domain IS NOT NULL AND c.id_subdomain IS NOT NULL
+        GROUP BY c.id_channel ORDER BY COUNT(*) DESC LIMIT 1
+    """).fetchone()
+
+
+def test_fixture_starts_in_sync(conn: sqlite3.Connection):
+    assert conn.execute("SELECT COUNT(*) FROM FeedItem").fetchone()[0] > 0
+    assert_in_sync(conn)
+
+
+def test_insert_and_duplicate(conn: sqlite3.Connection):
+    channel, _ = _categorized_channel(conn)
+    conn.execute("INSERT INTO Result (video_id, title, channel_id, published) VALUES ('freshvideo1', 'fresh', ?, ?)",
+                 (channel, int(time.time())))
+    # processor inserts with OR IGNORE: a duplicate must not touch the read model
+    conn.execute("INSERT OR IGNORE INTO Result (video_id, title, channel_id) VALUES ('freshvideo1', 'dup', ?)",
+                 (channel,))
+    assert conn.execute("SELECT title FROM FeedItem WHERE video_id = 'freshvideo1'").fetchone()[0] == "fresh"
+    assert_in_sync(conn)
+
+
+def test_channel_delete_cascade(user_db: Path, conn: sqlite3.Connection):
+    channel, _ = _categorized_channel(conn)
+    write(user_db, delete._delete_op, "individual", str(channel), None)
+    assert conn.execute("SELECT COUNT(*) FROM FeedItem WHERE channel_id = ?", (channel,)).fetchone()[0] == 0
+    assert_in_sync(conn)
+
+
+def test_assign_rename_and_merge(user_db: Path, conn: sqlite3.Connection):
+    channel, _ = _categorized_channel(conn)
+    write(user_db, write_ops._write_op, "assign", "", "another-sub", str(channel))   # domain → none
+    assert_in_sync(conn)
+
+    conn.execute("UPDATE Channel SET channel_name = 'Renamed' WHERE id_channel = ?", (channel,))
+    assert_in_sync(conn)
+
+    # Merge one used domain into another: every channel of the old id moves over
+    old, new = [name for (name,) in conn.execute(
+        "SELECT DISTINCT d.domain_name FROM Domains d JOIN Channel c ON c.id_domain = d.id_domain LIMIT 2")]
+    write(user_db, write_ops._write_op, "replace", "domain", old, new)
+    assert_in_sync(conn)
+
+    # Domains ON DELETE SET NULL
+    conn.execute("DELETE FROM Domains WHERE domain_name = ?", (new,))
+    assert_in_sync(conn)
+
+
+def test_feed_payload_contract(user_db: Path, conn: sqlite3.Connection):
+    videos = Feed(user_db, "all")["videos"]
+    assert len(videos) == conn.execute("SELECT COUNT(*) FROM Result").fetchone()[0]
+    first = videos[0]
+    assert first["id"] == first["video_id"] and len(first["id"]) == 11
+    assert first["thumbnail"] == thumbnail_url(first["id"])
+    assert first["url"] == watch_url(first["id"])
+    published = [conn.execute("SELECT published FROM Result WHERE video_id = ?", (v["id"],)).fetchone()[0]
+                 for v in videos[:50]]
+    assert published == sorted(published, reverse=True)
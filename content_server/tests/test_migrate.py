@@ -0,0 +1,169 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from ..sql_lite.operation import migrate
+from ..sql_lite.operation.compact import thumbnail_url, watch_url
+from ..sql_lite.operation.counters import check_domain_counts
+from ..sql_lite.operation.create import sql_creation
+from ..sql_lite.operation.migrate import AUTO_VACUUM_INCREMENTAL, PAGE_SIZE, SCHEMA_VERSION, migrate_db, user_version
+
+# Schema of a DB created before the user_version chain (URL-keyed Result, rowid table)
+LEGACY_SCHEMA = """
+CREATE TABLE Domains (
+    id_domain     INTEGER PRIMARY KEY AUTOINCREMENT,
+    domain_name   TEXT NOT NULL DEFAULT 'uncategorized' UNIQUE
+);
+CREATE TABLE SubDomains (
+    id_subdomain     INTEGER PRIMARY KEY AUTOINCREMENT,
+    subdomain_name   TEXT NOT NULL DEFAULT 'uncategorized' UNIQUE
+);
+CREATE TABLE Channel (
+    id_channel      INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel_name    TEXT NOT NULL,
+    channel_url     TEXT NOT NULL UNIQUE,
+    channel_logo    TEXT,
+    id_domain       INTEGER,
+    id_subdomain    INTEGER,
+    FOREIGN KEY (id_domain)    REFERENCES Domains(id_domain)    ON DELETE SET NULL,
+    FOREIGN KEY (id_subdomain) REFERENCES SubDomains(id_subdomain) ON DELETE SET NULL
+);
+CREATE TABLE Result (
+    title         TEXT NOT NULL,
+    video_url     TEXT PRIMARY KEY,
+    thumbnail     TEXT,
+    channel_id    INTEGER NOT NULL,
+    seen          INTEGER DEFAULT 0,
+    published_at  TEXT,
+    FOREIGN KEY (channel_id) REFERENCES Channel(id_channel) ON DELETE CASCADE
+);
+CREATE INDEX idx_result_channel ON Result(channel_id);
+CREATE TABLE Channels (
+    rss_id          TEXT PRIMARY KEY,
+    last_video_id   TEXT,
+    ts              INTEGER,
+    ts_read         TEXT,
+    rank            TEXT,
+    counter         INTEGER DEFAULT 0,
+    id_channel      INTEGER NOT NULL UNIQUE,
+    FOREIGN KEY (id_channel) REFERENCES Channel(id_channel) ON DELETE CASCADE
+);
+"""
+
+LEGACY_PAGE_SIZE = 1024 if PAGE_SIZE != 1024 else 2048   # anything else → storage_layout must VACUUM
+
+
+@pytest.fixture
+def legacy_db(tmp_path: Path) -> Path:
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA page_size = {LEGACY_PAGE_SIZE}")
+    conn.executescript(LEGACY_SCHEMA)
+    with conn:
+        conn.executemany("INSERT INTO Domains (id_domain, domain_name) VALUES (?, ?)", [(1, "music"), (2, "tech")])
+        conn.execute("INSERT INTO SubDomains (id_subdomain, subdomain_name) VALUES (1, 'live')")
+        conn.executemany(
+            "INSERT INTO Channel (id_channel, channel_name, channel_url, id_domain, id_subdomain) VALUES (?, ?, ?, ?, ?)",
+            [(1, "Alpha", "https://www.youtube.com/channel/UCalpha", 1, 1),
+             (2, "Beta", "https://www.youtube.com/channel/UCbeta", 2, None),
+             (3, "Gamma", "https://www.youtube.com/channel/UCgamma", None, None)],
+        )
+        conn.executemany(
+            "INSERT INTO Channels (rss_id, id_channel) VALUES (?, ?)",
+            [("UCalpha", 1), ("UCbeta", 2), ("UCgamma", 3)],
+        )
+        conn.executemany(
+            "INSERT INTO Result (title, video_url, thumbnail, channel_id, seen, published_at) VALUES (?, ?, ?, ?, ?, ?)",
+            [("a1", "https://www.youtube.com/watch?v=aaaaaaaaaa1", "https://i.ytimg.com/vi/aaaaaaaaaa1/hq720.jpg",
+              1, 0, "2026-01-02T10:00:00+00:00"),
+             ("a2", "https://www.youtube.com/shorts/aaaaaaaaaa2", None, 1, 1, "2026-01-03T10:00:00+00:00"),
+             ("b1", "https://youtu.be/bbbbbbbbbb1", None, 2, 0, ""),
+             ("g1", "https://www.youtube.com/watch?v=ggggggggggg", None, 3, 0, "2026-01-04T10:00:00+00:00")],
+        )
+    conn.close()
+    return path
+
+
+def _pragma(path: Path, name: str):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"PRAGMA {name}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_legacy_db_walks_the_whole_chain(legacy_db: Path):
+    ran = migrate_db(legacy_db)
+
+    assert [name for name, _ in ran] == [step.name for step in migrate.MIGRATIONS]
+    assert _pragma(legacy_db, "user_version") == SCHEMA_VERSION
+    # storage_layout: the VACUUM rebuild took, and WAL is on for good
+    assert _pragma(legacy_db, "page_size") == PAGE_SIZE
+    assert _pragma(legacy_db, "auto_vacuum") == AUTO_VACUUM_INCREMENTAL
+    assert _pragma(legacy_db, "journal_mode") == "wal"
+    assert _pragma(legacy_db, "integrity_check") == "ok"
+
+    conn = sqlite3.connect(legacy_db)
+    try:
+        rows = conn.execute("SELECT video_id, channel_id, published, seen FROM Result ORDER BY video_id").fetchall()
+        assert rows == [
+            ("aaaaaaaaaa1", 1, 1767348000, 0),
+            ("aaaaaaaaaa2", 1, 1767434400, 1),
+            ("bbbbbbbbbb1", 2, None, 0),
+            ("ggggggggggg", 3, 1767520800, 0),
+        ]
+        assert conn.execute("SELECT COUNT(*) FROM pragma_table_info('Result') WHERE name = 'video_url'").fetchone()[0] == 0
+        # Read models seeded from the migrated rows
+        assert check_domain_counts(conn) == {}
+        assert dict(conn.execute("SELECT domain_key, count FROM DomainCounts")) == {0: 1, 1: 2, 2: 1}
+        assert conn.execute("SELECT COUNT(*) FROM FeedItem").fetchone()[0] == 4
+        assert conn.execute("SELECT COUNT(*) FROM PollLog").fetchone()[0] == 0
+    finally:
+        conn.close()
+
+    assert watch_url("aaaaaaaaaa1") == "https://www.youtube.com/watch?v=aaaaaaaaaa1"
+    assert thumbnail_url("aaaaaaaaaa1") == "https://i.ytimg.com/vi/aaaaaaaaaa1/hqdefault.jpg"
+
+
+def test_current_db_is_left_alone(legacy_db: Path):
+    migrate_db(legacy_db)
+    assert migrate_db(legacy_db) == []
+    assert _pragma(legacy_db, "user_version") == SCHEMA_VERSION
+
+
+def test_new_file_gets_layout_before_tables(tmp_path: Path):
+    path = tmp_path / "new.db"
+    sql_creation(path)
+    assert _pragma(path, "user_version") == SCHEMA_VERSION
+    assert _pragma(path, "page_size") == PAGE_SIZE
+    assert _pragma(path, "auto_vacuum") == AUTO_VACUUM_INCREMENTAL
+    # Re-running create on an existing file changes nothing
+    sql_creation(path)
+    assert migrate_db(path) == []
+
+
+def test_failed_step_resumes_where_it_stopped(legacy_db: Path, monkeypatch: pytest.MonkeyPatch):
+    failing = next(i for i, step in enumerate(migrate.MIGRATIONS) if step.name == "domain_counts")
+
+    def boom(con: sqlite3.Connection) -> None:
+        con.execute("CREATE TABLE half_done (x)")   # must be rolled back with the step
+        raise RuntimeError("disk full")
+
+    steps = list(migrate.MIGRATIONS)
+    steps[failing] = steps[failing]._replace(apply=boom)
+    monkeypatch.setattr(migrate, "MIGRATIONS", steps)
+    with pytest.raises(RuntimeError):
+        migrate_db(legacy_db)
+
+    conn = sqlite3.connect(legacy_db)
+    try:
+        assert user_version(conn) == failing
+        assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'half_done'").fetchone()[0] == 0
+    finally:
+        conn.close()
+
+    monkeypatch.undo()
+    ran = migrate_db(legacy_db)
+    assert [name for name, _ in ran] == [step.name for step in migrate.MIGRATIONS[failing:]]
+    assert _pragma(legacy_db, "user_version") == SCHEMA_VERSION
@@ -0,0 +1,67 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from ..sql_lite.operation import poll_log
+from ..sql_lite.operation.poll_log import query_polls, record_polls
+from ..sql_lite.service.writer import write
+
+CAPACITY = 5
+
+
+def _poll(rss_id: str, started_at: int, outcome: str = "old") -> tuple:
+    # (rss_id, started_at, fetch_ms, parse_ms, db_ms, bytes, http_status,
+    #  outcome, new_videos, rank_before, ts_before, rank_after, ts_after)
+    return (rss_id, started_at, 120, 4, 1, 2048, 200, outcome, 0, "day", started_at, "day", started_at + 86400)
+
+
+@pytest.fixture
+def small_ring(monkeypatch: pytest.MonkeyPatch) -> int:
+    monkeypatch.setattr(poll_log, "POLL_LOG_CAPACITY", CAPACITY)
+    return CAPACITY
+
+
+def _ring(conn: sqlite3.Connection) -> list[tuple[int, int, int]]:
+    return conn.execute("SELECT slot, seq, started_at FROM PollLog ORDER BY seq").fetchall()
+
+
+def test_ring_wraps_and_keeps_the_newest(user_db: Path, conn: sqlite3.Connection, small_ring: int):
+    started = 1_700_000_000
+    for batch in range(3):   # 4 + 4 + 4 polls through a ring of 5
+        write(user_db, record_polls, [_poll(f"UC{batch}{i}", started + batch * 10 + i) for i in range(4)])
+
+    rows = _ring(conn)
+    assert [seq for _, seq, _ in rows] == list(range(8, 13))
+    assert all(slot == seq % small_ring for slot, seq, _ in rows)
+    assert len({slot for slot, _, _ in rows}) == small_ring
+
+    polls = query_polls(user_db, limit=3)
+    assert [p["seq"] for p in polls] == [12, 11, 10]
+    assert polls[0]["rss_id"] == "UC23"
+
+
+def test_one_batch_larger_than_the_ring(user_db: Path, conn: sqlite3.Connection, small_ring: int):
+    write(user_db, record_polls, [_poll(f"UC{i}", 1_700_000_000 + i) for i in range(small_ring * 2 + 1)])
+    assert [seq for _, seq, _ in _ring(conn)] == list(range(small_ring + 2, small_ring * 2 + 2))
+
+
+def test_shrunk_capacity_trims_leftover_slots(user_db: Path, conn: sqlite3.Connection,
+                                              monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(poll_log, "POLL_LOG_CAPACITY", 10)
+    write(user_db, record_polls, [_poll(f"UC{i}", 1_700_000_000 + i) for i in range(8)])
+    monkeypatch.setattr(poll_log, "POLL_LOG_CAPACITY", 3)
+    write(user_db, record_polls, [_poll("UCnext", 1_700_000_100)])
+
+    rows = _ring(conn)
+    assert all(slot < 3 for slot, _, _ in rows)
+    assert rows[-1][1] == 9   # seq keeps counting across the resize
+
+
+def test_query_filters(user_db: Path, small_ring: int):
+    write(user_db, record_polls, [
+        _poll("UCa", 100), _poll("UCb", 200, "error:timeout"), _poll("UCa", 300, "new"), _poll("UCb", 400, "error"),
+    ])
+    assert [p["started_at"] for p in query_polls(user_db, outcome="error")] == [400, 200]
+    assert [p["started_at"] for p in query_polls(user_db, rss_id="UCa")] == [300, 100]
+    assert [p["started_at"] for p in query_polls(user_db, since=200, until=400)] == [300, 200]
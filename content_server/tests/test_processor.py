@@ -0,0 +1,39 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from ..metrics import POLLS
+from ..sql_lite.service.writer import write
+from ..youtube.feed import processor
+from ..youtube.feed.fetcher import PollTrace
+
+
+def _polls(outcome: str) -> float:
+    return POLLS.values().get((outcome,), 0.0)
+
+
+def _some_channel(conn: sqlite3.Connection) -> str:
+    return conn.execute("SELECT rss_id FROM Channels LIMIT 1").fetchone()[0]
+
+
+def test_failing_poll_counts_as_error(user_db: Path, conn: sqlite3.Connection, monkeypatch: pytest.MonkeyPatch):
+    def explode(conn: sqlite3.Connection, rss_id: str, result, now=None):
+        raise RuntimeError("bad row")
+
+    monkeypatch.setattr(processor, "_apply_result", explode)
+    before = _polls("error")
+    rss_id = _some_channel(conn)
+    assert write(user_db, processor.apply_batch, [(rss_id, "old", PollTrace())]) == 1
+    assert _polls("error") == before + 1
+    outcome = conn.execute("SELECT outcome FROM PollLog ORDER BY seq DESC LIMIT 1").fetchone()[0]
+    assert outcome == "exception"
+
+
+def test_each_poll_counted_once(user_db: Path, conn: sqlite3.Connection):
+    before = {o: _polls(o) for o in ("old", "empty", "error")}
+    rss_id = _some_channel(conn)
+    write(user_db, processor.apply_batch, [(rss_id, "old", PollTrace()), (rss_id, None, PollTrace())])
+    assert _polls("old") == before["old"] + 1
+    assert _polls("empty") == before["empty"] + 1
+    assert _polls("error") == before["error"]
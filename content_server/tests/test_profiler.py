@@ -0,0 +1,59 @@
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+
+from ..profiler import SamplingProfiler
+
+
+@pytest.fixture
+def profiler(tmp_path: Path) -> SamplingProfiler:
+    # Every unit sampled, sampler thread mostly asleep, nothing flushed during the test
+    return SamplingProfiler(1.0, 1000, tmp_path / "profiles", 4, 3600)
+
+
+def test_overlapping_requests_release_the_loop_thread(profiler: SamplingProfiler):
+    first_started, second_done = asyncio.Event(), asyncio.Event()
+    seen: dict[str, str | None] = {}
+
+    @profiler.route("dashboard")
+    async def dashboard() -> None:
+        first_started.set()
+        await second_done.wait()   # finishes AFTER the request that started later
+
+    @profiler.route("setting")
+    async def setting() -> None:
+        seen["during"] = profiler._active.get(threading.get_ident())
+        second_done.set()
+
+    async def main() -> None:
+        first = asyncio.create_task(dashboard())
+        await first_started.wait()
+        await setting()
+        seen["after_second"] = profiler._active.get(threading.get_ident())
+        await first
+
+    asyncio.run(main())
+    assert seen == {"during": "setting", "after_second": "dashboard"}
+    assert profiler._active == {}
+    assert profiler._claims == {}
+
+
+def test_out_of_order_exit_keeps_the_open_label(profiler: SamplingProfiler):
+    tid = threading.get_ident()
+    outer = profiler.profile("outer", True)
+    inner = profiler.profile("inner", True)
+    outer.__enter__()
+    inner.__enter__()
+    outer.__exit__(None, None, None)   # the older call ends first
+    assert profiler._active[tid] == "inner"
+    inner.__exit__(None, None, None)
+    assert tid not in profiler._active
+
+
+def test_rate_zero_samples_nothing(profiler: SamplingProfiler):
+    profiler.set_rate(0.0)
+    with profiler.profile("dashboard") as sampled:
+        assert sampled is False
+        assert profiler._active == {}
@@ -0,0 +1,78 @@
+import re
+
+import pytest
+
+from ..bench import query_plans
+from ..bench.query_plans import audit, collect, fixture_db
+
+# Tables that grow with a user's subscriptions / history
+HOT_TABLES = ("Result", "FeedItem", "Channels")
+
+# Full table scans (no index) of a hot table that are the point of the query. A new
+# entry here needs the same justification as one in query_plans.ALLOWED.
+FULL_SCANS = {
+    "bulk.QUERY_ALL_CHANNELS": "Channels",           # CSV import polls every channel
+    "csv_export.get_tracked_channels": "Channels",   # export writes every channel
+    "delete.delete_abandoned": "Channels",           # rank is not indexed, explicit user action
+    "delete.mark_all_seen": "Result",                # login marks every unseen row
+}
+
+
+@pytest.fixture(scope="module")
+def report():
+    queries = collect()
+    with fixture_db(2000) as conn:
+        yield queries, audit(conn, queries)
+
+
+def _aliases(sql: str) -> dict[str, str]:
+    """alias → table for the hot tables, so "SCAN c" can be told apart from a Channel scan."""
+    names = {table: table for table in HOT_TABLES}
+    for table, alias in re.findall(rf"\b({'|'.join(HOT_TABLES)})\s+(?:AS\s+)?(\w+)", sql, re.IGNORECASE):
+        if alias.upper() not in {"WHERE", "ON", "JOIN", "LEFT", "INNER", "SET", "ORDER", "GROUP", "USING", "VALUES"}:
+            names[alias] = table
+    return names
+
+
+def _full_scans(sql: str, plan: list[str]) -> set[str]:
+    aliases = _aliases(sql)
+    scanned = set()
+    for line in plan:
+        match = re.match(r"SCAN (\w+)(.*)", line.strip())
+        if match and "USING" not in match.group(2) and match.group(1) in aliases:
+            scanned.add(aliases[match.group(1)])
+    return scanned
+
+
+def test_every_query_prepares_and_stays_within_the_allowlist(report):
+    _, entries = report
+    failures = {e["query"]: e["violations"] for e in entries if e["status"] in ("violation", "error", "unknown")}
+    assert not failures, f"plans outside query_plans.ALLOWED: {failures}"
+
+
+def test_no_full_scan_of_hot_tables(report):
+    queries, entries = report
+    found = {}
+    for entry in entries:
+        scanned = _full_scans(queries.get(entry["query"], ""), entry["plan"])
+        if scanned and FULL_SCANS.get(entry["query"]) not in scanned:
+            found[entry["query"]] = sorted(scanned)
+    assert not found, f"full table scan of {HOT_TABLES}: {found}"
+
+
+def test_full_scan_exceptions_are_still_needed(report):
+    queries, entries = report
+    plans = {e["query"]: e["plan"] for e in entries}
+    stale = {key for key, table in FULL_SCANS.items() if table not in _full_scans(queries.get(key, ""), plans.get(key, []))}
+    assert not stale, f"FULL_SCANS entries that no longer scan: {sorted(stale)}"
+
+
+def test_missing_index_is_caught():
+    # The auditor itself: drop the index the scheduler relies on and the due-batch query must fail
+    with fixture_db(200) as conn:
+        conn.execute("DROP INDEX idx_tracking_ts")
+        key = "timmer.QUERY_DUE_WINDOW"
+        (entry,) = audit(conn, {key: collect()[key]}, check_allowlist=False)
+    assert entry["status"] == "violation"
+    assert any(v.startswith("SCAN") for v in entry["violations"])
+    assert query_plans._flagged("SCAN Channels") and not query_plans._flagged("SCAN CONSTANT ROW")
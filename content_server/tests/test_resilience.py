@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from ..youtube.feed import fetcher
+from ..youtube.feed.resilience import BreakerState, CircuitBreaker
+
+
+def _half_open_breaker(cooldown_sec: float = 0.0, **kwargs) -> CircuitBreaker:
+    # Cooldown already over: the next allow_request() becomes the probe
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_sec=cooldown_sec, **kwargs)
+    breaker.record_failure()
+    assert breaker.state is BreakerState.OPEN
+    return breaker
+
+
+def test_cancelled_probe_is_released(monkeypatch: pytest.MonkeyPatch):
+    breaker = _half_open_breaker()
+    monkeypatch.setattr(fetcher, "breaker", breaker)
+    sent = asyncio.Event()
+
+    async def hang(self, url, **kwargs):
+        sent.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(httpx.AsyncClient, "get", hang)
+
+    async def main() -> None:
+        probe = asyncio.create_task(fetcher.feed_fetcher("UCprobe"))
+        await sent.wait()
+        assert breaker.state is BreakerState.HALF_OPEN
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        # Schedulers are not parked: the next dispatch may become the probe
+        await asyncio.wait_for(breaker.wait_until_ready(), timeout=1.0)
+
+    asyncio.run(main())
+    assert breaker.state is BreakerState.OPEN
+    assert breaker.allow_request() is True
+
+
+def test_only_the_probe_owner_releases_it():
+    breaker = _half_open_breaker()
+    assert breaker.allow_request() is True   # this thread holds the probe
+
+    async def other_request() -> None:
+        breaker.release_probe()   # a request from another task finishing
+
+    asyncio.run(other_request())
+    assert breaker.state is BreakerState.HALF_OPEN
+    assert breaker.allow_request() is False
+
+
+def test_probe_that_never_answers_fails_after_the_deadline(monkeypatch: pytest.MonkeyPatch):
+    breaker = _half_open_breaker(cooldown_sec=2.0, probe_timeout_sec=5.0)
+    later = time.monotonic() + 3.0
+    monkeypatch.setattr(time, "monotonic", lambda: later)
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False
+    later += 6.0   # the probe never reports back
+    assert breaker.state is BreakerState.OPEN
+    assert breaker.snapshot()["cooldown_sec"] == 4.0   # a failed probe doubles the cooldown
@@ -0,0 +1,40 @@
+import time
+
+from ..youtube.feed.throttle import AdaptiveThrottle
+
+
+def test_burst_of_failures_is_one_decrease():
+    throttle = AdaptiveThrottle(rate=16.0, max_rate=20.0, max_concurrency=8)
+    throttle._concurrency = 8
+    sent = time.monotonic()
+    for _ in range(8):   # 8 requests in flight when the server starts failing
+        throttle.release(503, 0.1, started=sent)
+    snap = throttle.snapshot()
+    assert snap["decreases"] == 1
+    assert snap["rate_per_sec"] == 8.0 and snap["concurrency_limit"] == 4
+
+    # A request sent after that backoff failing is a new overload event
+    throttle.release(None, 0.1, started=time.monotonic())
+    assert throttle.snapshot()["decreases"] == 2
+
+
+def test_retry_after_still_pauses_for_an_already_counted_failure():
+    throttle = AdaptiveThrottle(rate=4.0, max_rate=20.0)
+    sent = time.monotonic()
+    throttle.release(429, 0.1, started=sent)
+    throttle.release(429, 0.1, retry_after=30, started=sent)
+    snap = throttle.snapshot()
+    assert snap["decreases"] == 1 and snap["paused_for_sec"] > 25
+
+
+def test_additive_step_scales_with_max_rate():
+    slow, fast = AdaptiveThrottle(rate=1.0, max_rate=2.0), AdaptiveThrottle(rate=1.0, max_rate=20.0)
+    for throttle in (slow, fast):
+        for _ in range(10):
+            throttle.release(200, 0.05, started=time.monotonic())
+    assert round(slow.snapshot()["rate_per_sec"], 3) == 1.1
+    assert round(fast.snapshot()["rate_per_sec"], 3) == 2.0
+
+    fast.configure(step_fraction=0.05)
+    fast.release(200, 0.05, started=time.monotonic())
+    assert round(fast.snapshot()["rate_per_sec"], 3) == 3.0
@@ -0,0 +1,123 @@
+import asyncio
+import sqlite3
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+
+import pytest
+
+from ..sql_lite.service import writer
+from ..sql_lite.service.writer import write, write_async
+
+
+@pytest.fixture
+def db(tmp_path: Path) -> Path:
+    path = tmp_path / "writer.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (k TEXT PRIMARY KEY)")
+    conn.close()
+    return path
+
+
+def _insert(conn: sqlite3.Connection, *keys: str) -> int:
+    conn.executemany("INSERT INTO t (k) VALUES (?)", [(k,) for k in keys])
+    return len(keys)
+
+
+def _insert_then_fail(conn: sqlite3.Connection, key: str) -> None:
+    _insert(conn, key)
+    raise ValueError("op failed after writing")
+
+
+def _keys(path: Path) -> list[str]:
+    conn = sqlite3.connect(path)
+    try:
+        return [k for (k,) in conn.execute("SELECT k FROM t ORDER BY k")]
+    finally:
+        conn.close()
+
+
+def _held_group(db: Path) -> tuple[threading.Event, Future]:
+    """Park the writer inside an op so everything submitted meanwhile lands in ONE next group."""
+    entered, release = threading.Event(), threading.Event()
+
+    def block(conn: sqlite3.Connection) -> None:
+        entered.set()
+        release.wait(5)
+
+    first = writer._submit(db, block, (), True)
+    assert entered.wait(5)
+    return release, first
+
+
+def test_failing_op_rolls_back_alone(db: Path):
+    release, first = _held_group(db)
+    ok_before = writer._submit(db, _insert, ("a1", "a2"), True)
+    failing = writer._submit(db, _insert_then_fail, ("b1",), True)
+    ok_after = writer._submit(db, _insert, ("c1",), True)
+    release.set()
+
+    first.result(5)
+    assert ok_before.result(5) == 2
+    assert ok_after.result(5) == 1
+    with pytest.raises(ValueError, match="after writing"):
+        failing.result(5)
+    # b1 went back with its savepoint, its neighbours committed with the group
+    assert _keys(db) == ["a1", "a2", "c1"]
+    assert writer.writer_stats()[db.stem]["max_group"] >= 3
+
+
+def test_constraint_error_keeps_the_rest_of_the_group(db: Path):
+    write(db, _insert, "dup")
+    release, _ = _held_group(db)
+    duplicate = writer._submit(db, _insert, ("new1", "dup"), True)   # new1 written, then UNIQUE fails
+    fine = writer._submit(db, _insert, ("new2",), True)
+    release.set()
+
+    with pytest.raises(sqlite3.IntegrityError):
+        duplicate.result(5)
+    assert fine.result(5) == 1
+    assert _keys(db) == ["dup", "new2"]
+
+
+def test_non_transactional_op_runs_outside_begin(db: Path):
+    assert write(db, lambda conn: conn.in_transaction, transactional=False) is False
+    assert write(db, lambda conn: conn.in_transaction) is True
+
+
+def test_write_async(db: Path):
+    async def main() -> list[int]:
+        return await asyncio.gather(*(write_async(db, _insert, f"k{i}") for i in range(20)))
+
+    assert asyncio.run(main()) == [1] * 20
+    assert len(_keys(db)) == 20
+
+
+def test_dead_writer_fails_its_futures_and_is_replaced(db: Path, monkeypatch: pytest.MonkeyPatch):
+    release, first = _held_group(db)
+    dying = writer._writers[db.resolve()]
+
+    def broken_commit(self, conn: sqlite3.Connection, group: list) -> None:
+        raise sqlite3.OperationalError("disk I/O error")   # e.g. COMMIT / ROLLBACK failing
+
+    monkeypatch.setattr(writer.DBWriter, "_run_group", broken_commit)
+    queued = [writer._submit(db, _insert, (f"q{i}",), True) for i in range(3)]
+    release.set()
+
+    first.result(5)
+    for fut in queued:
+        with pytest.raises(sqlite3.OperationalError):
+            fut.result(5)   # resolved, not left hanging
+    dying._thread.join(5)
+    assert not dying.alive and writer._writers.get(db.resolve()) is not dying
+
+    monkeypatch.undo()
+    assert write(db, _insert, "after") == 1   # a fresh writer takes over
+    assert _keys(db) == ["after"]
+
+
+def test_connect_failure_does_not_hang_write(tmp_path: Path):
+    missing = tmp_path / "no-such-dir" / "user.db"
+    with pytest.raises(sqlite3.OperationalError):
+        writer._submit(missing, _insert, ("x",), True).result(5)
+    assert missing.resolve() not in writer._writers
@@ -0,0 +1,199 @@
+# youtube/budget.py
+"""
+Global daily request budget.
+
+HYDRA_DAILY_REQUEST_BUDGET = N feed requests per day across every Channels row in
+every user DB (0 = disabled, the rank ladder alone decides).
+
+Allocation (recomputed every HYDRA_BUDGET_REFRESH_SEC):
+  1. Weighted fair share between users (max-min / water-filling): every user gets
+     an equal slice, users that need less than their slice hand the rest back.
+     One user with 3,000 channels can't starve another with 50.
+  2. Inside a user, polls/day per channel f = min(ladder frequency, c × upload rate).
+     Expected fresh detections λf/(λ+f) are concave, and the optimum under a sum
+     constraint is proportional to λ; c is solved by bisection.
+
+The budget is a ceiling: processor clamps every next check to
+now + 1/f, never earlier than the ladder / predict_ts would poll.
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .catchup import upload_rate, window_start
+
+log = logging.getLogger(__name__)
+
+DAILY_REQUEST_BUDGET = int(os.environ.get("HYDRA_DAILY_REQUEST_BUDGET", 0))
+BUDGET_REFRESH_SEC = float(os.environ.get("HYDRA_BUDGET_REFRESH_SEC", 6 * 3600))
+
+# What the rank ladder would spend, in polls/day (mirrors _handle_no_new delays)
+LADDER_POLLS_PER_DAY = {
+    "day": 1.0,
+    "dual": 0.5,
+    "week": 1 / 7,
+    "month": 1 / 30,
+    "abandoned": 1 / 365,
+}
+DEFAULT_POLLS_PER_DAY = 1.0          # freshly imported, not ranked yet
+MIN_POLLS_PER_DAY = 1 / 365          # nobody is forgotten entirely
+
+QUERY_CHANNEL_STATS = """
+    SELECT c.rss_id, c.rank, c.counter, COUNT(r.video_id)
+    FROM Channels c
+    LEFT JOIN Result r ON r.channel_id = c.id_channel AND r.published >= ?
+    GROUP BY c.rss_id
+"""
+
+# (rss_id, ladder polls/day, upload rate/day)
+Demand = Tuple[str, float, float]
+
+
+def fair_shares(demands: Dict[str, float], budget: float) -> Dict[str, float]:
+    """Max-min fair split of `budget` over users with the given total demand."""
+    shares = {u: 0.0 for u in demands}
+    remaining = dict(demands)
+    left = budget
+    while remaining and left > 1e-9:
+        slice_ = left / len(remaining)
+        satisfied = {u: d for u, d in remaining.items() if d <= slice_}
+        if not satisfied:
+            for u in remaining:
+                shares[u] += slice_
+            break
+        for u, d in satisfied.items():
+            shares[u] += d
+            left -= d
+            del remaining[u]
+    return shares
+
+
+def allocate_user(channels: List[Demand], share: float) -> Dict[str, float]:
+    """polls/day per rss_id: min(ladder, max(floor, c·λ)) summing to `share`."""
+    if not channels:
+        return {}
+
+    def total(c: float) -> float:
+        return sum(min(cap, max(MIN_POLLS_PER_DAY, c * rate)) for _, cap, rate in channels)
+
+    if total(1e9) <= share:
+        return {rss_id: cap for rss_id, cap, _ in channels}
+
+    lo, hi = 0.0, 1.0
+    while total(hi) < share:
+        hi *= 2
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        if total(mid) < share:
+            lo = mid
+        else:
+            hi = mid
+    return {rss_id: min(cap, max(MIN_POLLS_PER_DAY, lo * rate)) for rss_id, cap, rate in channels}
+
+
+class BudgetAllocator:
+    def __init__(self, daily_budget: int = DAILY_REQUEST_BUDGET) -> None:
+        self.daily_budget = daily_budget
+        self._lock = threading.Lock()
+        self._intervals: Dict[Tuple[str, str], float] = {}   # (db file, rss_id) → min seconds
+        self._report: dict = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.daily_budget > 0
+
+    def _read_demands(self, db_path: Path) -> List[Demand]:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            return [
+                (rss_id, LADDER_POLLS_PER_DAY.get(rank or "", DEFAULT_POLLS_PER_DAY), upload_rate(rank, counter, recent))
+                for rss_id, rank, counter, recent in conn.execute(QUERY_CHANNEL_STATS, (window_start(time.time()),))
+            ]
+        finally:
+            conn.close()
+
+    def recompute(self, db_paths: Iterable[Path | str]) -> dict:
+        per_user: Dict[str, List[Demand]] = {}
+        for db_path in db_paths:
+            db_path = Path(db_path).resolve()
+            try:
+                per_user[str(db_path)] = self._read_demands(db_path)
+            except sqlite3.Error as e:
+                log.warning("Budget: could not read %s: %s", db_path, e)
+
+        demands = {u: sum(cap for _, cap, _ in rows) for u, rows in per_user.items()}
+        shares = fair_shares(demands, float(self.daily_budget))
+
+        intervals: Dict[Tuple[str, str], float] = {}
+        users = {}
+        for user, rows in per_user.items():
+            alloc = allocate_user(rows, shares[user])
+            capped = 0
+            for rss_id, cap, _ in rows:
+                f = alloc[rss_id]
+                if f < cap - 1e-9:
+                    intervals[(user, rss_id)] = 86400.0 / f
+                    capped += 1
+            users[Path(user).stem] = {
+                "channels": len(rows),
+                "demand_per_day": round(demands[user], 2),
+                "share_per_day": round(shares[user], 2),
+                "channels_slowed": capped,
+            }
+
+        report = {
+            "enabled": self.enabled,
+            "daily_budget": self.daily_budget,
+            "demand_per_day": round(sum(demands.values()), 2),
+            "computed_at": datetime.now().strftime('%Y-%m-%d %H:%M'),
+            "users": users,
+        }
+        with self._lock:
+            self._intervals = intervals
+            self._report = report
+        log.info("Budget allocated: %d/day over %d user(s), %d channel(s) slowed",
+                 self.daily_budget, len(users), len(intervals))
+        return report
+
+    def min_interval(self, conn: sqlite3.Connection, rss_id: str) -> Optional[float]:
+        if not self.enabled:
+            return None
+        row = conn.execute("PRAGMA database_list").fetchone()
+        db_file = str(Path(row[2]).resolve()) if row and row[2] else ""
+        with self._lock:
+            return self._intervals.get((db_file, rss_id))
+
+    def clamp(self, conn: sqlite3.Connection, rss_id: str, ts: int, now: Optional[float] = None) -> int:
+        """Push `ts` out so this channel stays within its allocated polls/day."""
+        interval = self.min_interval(conn, rss_id)
+        if interval is None:
+            return ts
+        now = now or time.time()
+        return max(ts, int(now + interval))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._report) if self._report else {"enabled": self.enabled, "daily_budget": self.daily_budget}
+
+
+budget = BudgetAllocator()
+
+
+async def run_budget_allocator(db_dir: Path | str) -> None:
+    """Background task: refresh the allocation periodically."""
+    if not budget.enabled:
+        log.info("No daily request budget configured → rank ladder only")
+        return
+    db_dir = Path(db_dir)
+    while True:
+        try:
+            await asyncio.to_thread(budget.recompute, sorted(db_dir.glob("*.db")))
+        except Exception:
+            log.exception("Budget allocation failed")
+        await asyncio.sleep(BUDGET_REFRESH_SEC)
@@ -1,31 +1,36 @@
 # youtube/bulk.py
 import asyncio
+import functools
 import logging
 from typing import Tuple, Optional
-from asyncio import to_thread, Lock
-from .feed.processor import process_feed  # ← sync function (uses asyncio.run inside)
+from asyncio import to_thread, Semaphore
+from .feed.processor import process_feed, fetch_result_sync, apply_batch  # ← sync functions (asyncio.run inside)
+from .jobs import JOB_CHUNK, fetch_queue
+from .feed.resilience import breaker
+from .feed.throttle import throttle
+from ..profiler import profiler
+from ..sql_lite.service.writer import write_async
 
 log = logging.getLogger(__name__)
 
-# GLOBAL LOCK → ONLY ONE channel processes at a time ACROSS THE ENTIRE SERVER
-# This is exactly what you wanted: maximum safety for YouTube
-_global_channel_lock = Lock()
+QUERY_ALL_CHANNELS = """
+    SELECT rss_id, last_video_id
+    FROM Channels
+    ORDER BY counter ASC, ts ASC NULLS FIRST
+"""
 
 async def run_batch(db_path: str) -> None:
     """
-    Process all channels one-by-one with 10-second gaps.
-    Only ONE channel runs at any moment — no matter how many users trigger it.
+    Process all channels of one DB.
+    Pacing is owned by the shared AIMD throttle in feed_fetcher: channels are
+    dispatched concurrently, but never more than the throttle can let through.
     """
     import sqlite3
     conn = sqlite3.connect(db_path, timeout=30.0)
     conn.execute("PRAGMA foreign_keys = ON")
     try:
         cur = conn.cursor()
-        cur.execute("""
-            SELECT rss_id, last_video_id
-            FROM Channels
-            ORDER BY counter ASC, ts ASC NULLS FIRST
-        """)
+        cur.execute(QUERY_ALL_CHANNELS)
         rows: list[Tuple[str, Optional[str]]] = cur.fetchall()
     except Exception as e:
         log.error("Failed to read Channels table from %s: %s", db_path, e)
@@ -40,19 +45,50 @@ async def run_batch(db_path: str) -> None:
 
     log.info("batch_runner START | channels=%d | db=%s", total, db_path)
 
-    for idx, (rss_id, last_video_id) in enumerate(rows, start=1):
-        log.info("[ %d / %d ] Processing rss_id=%s", idx, total, rss_id)
+    if fetch_queue.enabled:
+        await _run_queued(db_path, rows)
+        log.info("batch_runner FINISHED – all %d channels processed by the fetch workers", total)
+        return
+
+    # Bounds the worker threads parked on the throttle, not the request rate
+    slots = Semaphore(throttle.max_concurrency)
 
-        # THIS IS THE CORE: only one channel runs at a time → YouTube is safe forever
-        async with _global_channel_lock:
+    async def _one(idx: int, rss_id: str, last_video_id: Optional[str]) -> None:
+        async with slots:
+            # Pause the whole batch while the circuit is open
+            await breaker.wait_until_ready()
+            log.info("[ %d / %d ] Processing rss_id=%s", idx, total, rss_id)
             try:
-                await to_thread(process_feed, db_path, rss_id, last_video_id)
+                process = profiler.bind("bulk", process_feed, profiler.should_sample())
+                await to_thread(process, db_path, rss_id, last_video_id)
             except Exception:
                 log.exception("Failed processing rss_id=%s – continuing with next", rss_id)
 
-        # 10-second polite delay (only between channels, not after the last one)
-        if idx < total:
-            log.debug("Sleeping 10 seconds before next channel...")
-            await asyncio.sleep(10)
+    await asyncio.gather(*(
+        _one(idx, rss_id, last_video_id)
+        for idx, (rss_id, last_video_id) in enumerate(rows, start=1)
+    ))
 
     log.info("batch_runner FINISHED – all %d channels processed successfully", total)
+
+
+async def _run_queued(db_path: str, rows: list[Tuple[str, Optional[str]]]) -> None:
+    """
+    Every chunk goes to the fetch worker pool at once (youtube/worker.py);
+    each is written by the DB's writer as soon as all its rows are answered.
+    """
+    local = functools.partial(to_thread, fetch_result_sync)
+
+    async def _chunk(chunk: list[Tuple[str, Optional[str]]]) -> None:
+        await breaker.wait_until_ready()
+        try:
+            results = await fetch_queue.fetch_many(chunk, local)
+            await write_async(db_path, apply_batch, [
+                (rss_id, result, trace) for (rss_id, _), (result, trace) in zip(chunk, results)
+            ])
+        except Exception:
+            log.exception("Failed processing %d channel(s) – continuing with next chunk", len(chunk))
+
+    await asyncio.gather(*(
+        _chunk(rows[start:start + JOB_CHUNK]) for start in range(0, len(rows), JOB_CHUNK)
+    ))
@@ -0,0 +1,110 @@
+# youtube/catchup.py
+"""
+Catch-up planner: runs once when a feed processor starts.
+
+After long downtime most Channels.ts values are in the past. Instead of
+draining them strictly by oldest ts, the overdue backlog is ordered by
+expected yield — the chance the channel uploaded while we were away:
+
+    rate   = max(rank rate × 0.8^counter, results published in the last 30 days / 30)   uploads/day
+    yield  = 1 - exp(-rate × days overdue)
+
+and drained in batches under a burst budget. Afterwards run_loop continues in
+its normal earliest-due mode.
+"""
+import asyncio
+import logging
+import math
+import os
+import sqlite3
+import time
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from .feed.resilience import breaker
+
+log = logging.getLogger(__name__)
+
+CATCHUP_MIN_BACKLOG = int(os.environ.get("HYDRA_CATCHUP_MIN_BACKLOG", 10))
+CATCHUP_BATCH_SIZE = int(os.environ.get("HYDRA_CATCHUP_BATCH_SIZE", 25))
+CATCHUP_BURST_BUDGET = int(os.environ.get("HYDRA_CATCHUP_BURST_BUDGET", 200))  # requests per burst
+CATCHUP_BURST_PAUSE_SEC = float(os.environ.get("HYDRA_CATCHUP_BURST_PAUSE_SEC", 120))
+
+# Expected uploads per day for each rank of the ladder
+RANK_RATE_PER_DAY = {
+    "day": 1.0,
+    "dual": 0.5,
+    "week": 1 / 7,
+    "month": 1 / 30,
+    "abandoned": 1 / 365,
+}
+DEFAULT_RATE_PER_DAY = 1 / 7
+COUNTER_DECAY = 0.8
+RESULT_WINDOW_DAYS = 30
+
+# Uploads inside the window only (idx_result_channel_published): a backlog of old
+# unseen results says nothing about how often the channel posts now
+QUERY_OVERDUE = """
+    SELECT c.rss_id, c.last_video_id, c.ts, c.rank, c.counter, COUNT(r.video_id)
+    FROM Channels c
+    LEFT JOIN Result r ON r.channel_id = c.id_channel AND r.published >= ?
+    WHERE c.ts IS NOT NULL AND c.ts < ?
+    GROUP BY c.rss_id
+"""
+
+Row = Tuple[str, Optional[str]]
+
+
+def window_start(now: float) -> int:
+    """Lower `published` bound of the upload-rate window."""
+    return int(now - RESULT_WINDOW_DAYS * 86400)
+
+
+def upload_rate(rank: Optional[str], counter: Optional[int], recent: int) -> float:
+    """Estimated uploads per day from the ladder state and results published in the window."""
+    rate = RANK_RATE_PER_DAY.get(rank or "", DEFAULT_RATE_PER_DAY) * COUNTER_DECAY ** (counter or 0)
+    return max(rate, recent / RESULT_WINDOW_DAYS)
+
+
+def expected_yield(rank: Optional[str], counter: Optional[int], recent: int, overdue_sec: float) -> float:
+    rate = upload_rate(rank, counter, recent)
+    return 1.0 - math.exp(-rate * max(0.0, overdue_sec) / 86400)
+
+
+def plan_catchup(conn: sqlite3.Connection, now: Optional[float] = None) -> List[Row]:
+    """Overdue channels, best expected yield first."""
+    now = now or time.time()
+    scored = []
+    for rss_id, last_video_id, ts, rank, counter, recent in conn.execute(QUERY_OVERDUE, (window_start(now), now)):
+        score = expected_yield(rank, counter, recent, now - ts)
+        scored.append((score, -(now - ts), rss_id, last_video_id))
+    scored.sort(reverse=True)
+    return [(rss_id, last_video_id) for _, _, rss_id, last_video_id in scored]
+
+
+async def drain_backlog(
+    conn: sqlite3.Connection,
+    db_path: str,
+    dispatch: Callable[[List[Row]], Awaitable[None]],
+) -> int:
+    """
+    Returns the number of channels polled in catch-up mode (0 = no backlog).
+    """
+    plan = plan_catchup(conn)
+    if len(plan) < CATCHUP_MIN_BACKLOG:
+        return 0
+
+    log.info("Catch-up mode: %d overdue channel(s) in %s → draining by expected yield", len(plan), db_path)
+    in_burst = 0
+    for i in range(0, len(plan), CATCHUP_BATCH_SIZE):
+        if in_burst >= CATCHUP_BURST_BUDGET:
+            log.info("Catch-up burst budget spent (%d) → pausing %.0fs", in_burst, CATCHUP_BURST_PAUSE_SEC)
+            await asyncio.sleep(CATCHUP_BURST_PAUSE_SEC)
+            in_burst = 0
+        await breaker.wait_until_ready()
+        batch = plan[i:i + CATCHUP_BATCH_SIZE]
+        await dispatch(batch)
+        in_burst += len(batch)
+        log.info("Catch-up progress: %d / %d", min(i + len(batch), len(plan)), len(plan))
+
+    log.info("Catch-up done for %s → back to steady-state scheduling", db_path)
+    return len(plan)
@@ -1,9 +1,17 @@
 import httpx
 import logging
-from typing import List, Optional, Tuple
-import feedparser
+from email.utils import parsedate_to_datetime
+from enum import StrEnum
+from typing import List, Literal, Optional, Tuple, Union
 from pydantic import BaseModel
 import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from .resilience import breaker
+from .throttle import throttle
+from .parse_pool import VideoRow, parse_pool, parse_rows
+from ...metrics import FETCH_SECONDS, PARSE_SECONDS
 
 # Set up
 class Video(BaseModel):
@@ -13,124 +21,243 @@ class Video(BaseModel):
     published: str
     thumbnail: Optional[str] = None
 
+@dataclass
+class PollTrace:
+    """Filled in by feed_fetcher for the PollLog row (sql_lite/operation/poll_log.py)."""
+    started_at: float = field(default_factory=time.time)
+    fetch_ms: Optional[int] = None      # None → no request sent (circuit open)
+    parse_ms: Optional[int] = None
+    bytes: Optional[int] = None
+    http_status: Optional[int] = None
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(message)s"
 )
 log = logging.getLogger(__name__)
 
-request_lock = asyncio.Lock()
+# Point at a local stand-in (content_server/bench/fake_youtube.py) for offline crawls
+FEED_BASE_URL = os.environ.get("HYDRA_FEED_BASE_URL", "https://www.youtube.com/feeds/videos.xml")
+# If-None-Match / If-Modified-Since → 304 is an "old" poll without download or parse
+CONDITIONAL_GET = os.environ.get("HYDRA_FEED_CONDITIONAL_GET", "0") == "1"
+
+# rss_id → (latest video id, ETag, Last-Modified) of the last 200 response
+_validators: dict[str, Tuple[str, Optional[str], Optional[str]]] = {}
+
+class FetchErrorKind(StrEnum):
+    TIMEOUT = "timeout"
+    NETWORK = "network"
+    SERVER = "server"              # 5xx
+    RATE_LIMITED = "rate_limited"  # 429
+    NOT_FOUND = "not_found"        # 404 → channel removed / terminated
+    CLIENT = "client"              # any other 4xx
+    CIRCUIT_OPEN = "circuit_open"  # not sent: YouTube considered unreachable
+
+# Failures that say nothing about the channel itself → backoff, rank untouched
+TRANSIENT_KINDS = {
+    FetchErrorKind.TIMEOUT,
+    FetchErrorKind.NETWORK,
+    FetchErrorKind.SERVER,
+    FetchErrorKind.RATE_LIMITED,
+    FetchErrorKind.CIRCUIT_OPEN,
+}
+
+class FeedFetchError(Exception):
+    def __init__(
+        self,
+        kind: FetchErrorKind,
+        rss_id: str,
+        status: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        super().__init__(f"{kind.value} fetching {rss_id}" + (f" (HTTP {status})" if status else ""))
+        self.kind = kind
+        self.rss_id = rss_id
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def transient(self) -> bool:
+        return self.kind in TRANSIENT_KINDS
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def _conditional_headers(rss_id: str, video_id: Optional[str]) -> dict:
+    """
+    Only when the DB already holds what that response carried (video_id is its
+    latest): a 304 after a rolled-back write would otherwise hide new videos.
+    """
+    cached = _validators.get(rss_id) if CONDITIONAL_GET else None
+    if not cached or not video_id or cached[0] != video_id:
+        return {}
+    headers = {}
+    if cached[1]:
+        headers["If-None-Match"] = cached[1]
+    if cached[2]:
+        headers["If-Modified-Since"] = cached[2]
+    return headers
+
+def _classify_status(rss_id: str, response: httpx.Response) -> FeedFetchError:
+    status = response.status_code
+    if status == 429:
+        kind = FetchErrorKind.RATE_LIMITED
+    elif status >= 500:
+        kind = FetchErrorKind.SERVER
+    elif status == 404:
+        kind = FetchErrorKind.NOT_FOUND
+    else:
+        kind = FetchErrorKind.CLIENT
+    return FeedFetchError(
+        kind, rss_id, status=status,
+        retry_after=_retry_after_seconds(response.headers.get("Retry-After")),
+    )
+
+def _pick_new_videos(
+    videos: List[Video],
+    video_id: Optional[str],
+    rss_id: str,
+) -> Optional[List[Video]]:
+    """
+    videos must be sorted newest first.
+    Returns None when nothing is new, otherwise the missed videos.
+    """
+    latest_video_id = videos[0].id
+    if video_id == latest_video_id:
+        log.info("No new video (latest already known: %s)", latest_video_id)
+        return None
+
+    if video_id is None:
+        # First run: return only the latest video
+        log.info("First run: returning latest video for %s", rss_id)
+        return [videos[0]]
+
+    # Find index of the last known video
+    try:
+        idx = next(i for i, v in enumerate(videos) if v.id == video_id)
+        log.info("Found %d new video(s) since %s", idx, video_id)
+        return videos[:idx]  # uncategorized videos newer than known one
+    except StopIteration:
+        # Known video not in feed anymore (e.g. old), funcategorized back to latest
+        log.warning("Previously seen video %s not in feed, returning latest", video_id)
+        return [videos[0]]
+
+def _videos(rows: List[VideoRow]) -> List[Video]:
+    # Fields come straight from feedparser as str / None → no re-validation
+    return [
+        Video.model_construct(id=vid, title=title, url=url, published=published, thumbnail=thumbnail)
+        for vid, title, url, published, thumbnail in rows
+    ]
+
+def parse_feed(xml: str, rss_id: str) -> Optional[Tuple[List[Video], str, str]]:
+    """
+    Parse feed XML → (videos newest first, channel_name, channel_url),
+    or None when the feed holds no usable entry. Inline, see parse_pool for the pooled stage.
+    """
+    parsed = parse_rows(xml, rss_id)
+    if parsed is None:
+        return None
+    rows, channel_name, channel_url = parsed
+    return _videos(rows), channel_name, channel_url
+
 
 async def feed_fetcher(
     rss_id: str,
-    video_id: Optional[str] = None
-) -> Optional[Tuple[List[str], List[Video], str, str, str]]:
+    video_id: Optional[str] = None,
+    trace: Optional[PollTrace] = None,
+) -> Union[Tuple[List[str], List[Video], str, str, str], Literal["old"], None]:
     """
     Fetches and parses a YouTube channel's RSS feed.
-    Returns: (recent_timestamps, new_videos, latest_video_id, channel_name, channel_url) or None
+    Returns: (recent_timestamps, new_videos, latest_video_id, channel_name, channel_url),
+             "old" when nothing is new, or None for an empty feed.
+    Raises: FeedFetchError (classified) on HTTP / network failures.
+    `trace`, when given, receives timings / size / status of this poll.
     """
-    async with request_lock:
-        feed_url = f"https://www.youtube.com/feeds/videos.xml?channel_id={rss_id}"
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(feed_url)
-                response.raise_for_status()
-                log.info("Fetched feed for channel %s", rss_id)
-                xml = response.text
-        except httpx.HTTPStatusError as err:
-            log.error("HTTP error fetching feed %s: %s", rss_id, err)
-            return None
-        except httpx.RequestError as err:
-            log.error("Network error fetching feed %s: %s", rss_id, err)
-            return None
-
-        feed = feedparser.parse(xml)
-        if not feed.entries:
-            log.info("No entries in feed for channel %s", rss_id)
-            return None
-
-        videos: List[Video] = []
-        for entry in feed.entries:
-            # Extract video ID (format: yt:video:VIDEO_ID)
-            vid = entry.get("id", "").split(":")[-1]
-            if not vid:
-                continue
-            # Title is in entry.title
-            title = entry.get("title", "No title")
-            # Published date
-            published = entry.get("published", "")
-            # Thumbnail from media:thumbnail (highest res first)
-            thumbnail = None
-            if "media_thumbnail" in entry and entry.media_thumbnail:
-                thumbnail = entry.media_thumbnail[0]["url"]
-            # Canonical URL
-            url = entry.get("link") or f"https://www.youtube.com/watch?v={vid}"
-            videos.append(Video(
-                id=vid,
-                title=title,
-                url=url,
-                published=published,
-                thumbnail=thumbnail
-            ))
-
-        if not videos:
-            log.info("No valid videos parsed for channel %s", rss_id)
-            return None
-
-        # Sort newest first by published date
-        videos.sort(key=lambda x: x.published, reverse=True)
-
-        latest_video_id = videos[0].id
-
-        channel_name = feed.feed.get("title", "Unknown Channel") if feed.feed else "Unknown Channel"
-
-        # ────────────────────────────────────────────────
-        # Added: extract channel URL (author_uri / link)
-        # ────────────────────────────────────────────────
-        channel_url = "Unknown URL"
-        if feed.feed:
-            # Most reliable: author_uri when present
-            if "author_uri" in feed.feed:
-                channel_url = feed.feed.author_uri
-            # Funcategorizedback: look for link with rel="alternate" or first link
-            elif "link" in feed.feed and isinstance(feed.feed.link, str):
-                channel_url = feed.feed.link
-            elif "links" in feed.feed and feed.feed.links:
-                for link in feed.feed.links:
-                    if link.get("rel") == "alternate" and link.get("href"):
-                        channel_url = link["href"]
-                        break
-                else:
-                    channel_url = feed.feed.links[0].get("href", "Unknown URL")
-
-        # Determine which videos are new
-        if video_id == latest_video_id:
-            log.info("No new video (latest already known: %s)", latest_video_id)
-            return "old"
-
-        elif video_id is None:
-            # First run: return only the latest video
-            new_videos = [videos[0]]
-            log.info("First run: returning latest video for %s", rss_id)
-
-        else:
-            # Find index of the last known video
-            try:
-                idx = next(i for i, v in enumerate(videos) if v.id == video_id)
-                new_videos = videos[:idx]  # uncategorized videos newer than known one
-                log.info("Found %d new video(s) since %s", len(new_videos), video_id)
-            except StopIteration:
-                # Known video not in feed anymore (e.g. old), funcategorized back to latest
-                new_videos = [videos[0]]
-                log.warning("Previously seen video %s not in feed, returning latest", video_id)
-
-        # Return up to 20 recent published timestamps (for rate limiting / health checks)
-        recent_timestamps = [v.published for v in videos[:20]]
-
-        # Polite delay to avoid hammering YouTube
-        await asyncio.sleep(10)
-
-        return recent_timestamps, new_videos, latest_video_id, channel_name, channel_url
+    trace = trace or PollTrace()
+    if not breaker.allow_request():
+        raise FeedFetchError(FetchErrorKind.CIRCUIT_OPEN, rss_id)
+
+    try:
+        feed_url = f"{FEED_BASE_URL}?channel_id={rss_id}"
+        # Pacing / concurrency come from the shared AIMD throttle (replaces the global lock + 10 s sleep)
+        async with throttle.slot() as done:
+            with FETCH_SECONDS.time(outcome="network") as timing:
+                started = time.perf_counter()
+                try:
+                    async with httpx.AsyncClient(timeout=30.0) as client:
+                        response = await client.get(feed_url, headers=_conditional_headers(rss_id, video_id))
+                        trace.fetch_ms = int((time.perf_counter() - started) * 1000)
+                        trace.http_status = response.status_code
+                        trace.bytes = len(response.content)
+                        timing["outcome"] = f"{response.status_code // 100}xx"
+                        done(response.status_code, _retry_after_seconds(response.headers.get("Retry-After")))
+                        # Before raise_for_status(): httpx treats a 304 as an error status
+                        if response.status_code == 304:
+                            log.info("Feed unchanged (304) for channel %s", rss_id)
+                            raw = None
+                        else:
+                            response.raise_for_status()
+                            log.info("Fetched feed for channel %s", rss_id)
+                            raw = response.content   # bytes: feedparser reads the XML encoding itself
+                            etag, modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+                except httpx.HTTPStatusError as err:
+                    error = _classify_status(rss_id, err.response)
+                    log.error("HTTP error fetching feed %s: %s", rss_id, err)
+                    if error.transient:
+                        breaker.record_failure(error.retry_after)
+                    else:
+                        breaker.record_success()  # YouTube answered → it's reachable
+                    raise error from err
+                except httpx.TimeoutException as err:
+                    timing["outcome"] = "timeout"
+                    trace.fetch_ms = int((time.perf_counter() - started) * 1000)
+                    log.error("Timeout fetching feed %s: %s", rss_id, err)
+                    breaker.record_failure()
+                    raise FeedFetchError(FetchErrorKind.TIMEOUT, rss_id) from err
+                except httpx.RequestError as err:
+                    trace.fetch_ms = int((time.perf_counter() - started) * 1000)
+                    log.error("Network error fetching feed %s: %s", rss_id, err)
+                    breaker.record_failure()
+                    raise FeedFetchError(FetchErrorKind.NETWORK, rss_id) from err
+        breaker.record_success()
+    finally:
+        # Cancelled / non-httpx error: a half-open probe must not stay claimed
+        breaker.release_probe()
+    if raw is None:
+        return "old"
+
+    started = time.perf_counter()
+    with PARSE_SECONDS.time():
+        # Process pool when HYDRA_PARSE_PROCS > 0, otherwise inline in this fetch thread
+        parsed = await parse_pool.parse(raw, rss_id)
+    trace.parse_ms = int((time.perf_counter() - started) * 1000)
+    if parsed is None:
+        return None
+    rows, channel_name, channel_url = parsed
+    videos = _videos(rows)
+    latest_video_id = videos[0].id
+    if CONDITIONAL_GET and (etag or modified):
+        _validators[rss_id] = (latest_video_id, etag, modified)
+
+    # Determine which videos are new
+    new_videos = _pick_new_videos(videos, video_id, rss_id)
+    if new_videos is None:
+        return "old"
+
+    # Return up to 20 recent published timestamps (for rate limiting / health checks)
+    recent_timestamps = [v.published for v in videos[:20]]
+
+    return recent_timestamps, new_videos, latest_video_id, channel_name, channel_url
 """
 Status: works
 Edge case Introduced: the return being none of whatever module uses it
@@ -138,8 +265,9 @@ Edge case Introduced: the return being none of whatever module uses it
 Operation:
 - Does guarantee sorting
 - Handles Edge cases:
-- Http status
+- Http status -> FeedFetchError (timeout / network / 5xx / 429 / 404 / other 4xx)
 - Request
+- Circuit breaker open -> FeedFetchError(CIRCUIT_OPEN), no request sent
 - if feed not found
 - if no valid video after parsing
 - Operation:
@@ -0,0 +1,163 @@
+# leveller.py
+"""
+Schedule leveller: keeps the poll rate flat.
+
+Every Channels.ts assignment goes through ScheduleLeveller.level(), which moves
+the target forward by a bounded, rank-dependent amount into the least-loaded
+hour slot. Load = per-user histogram (the user's own Channels.ts) + a process-wide
+histogram of upcoming assignments across all user DBs (a slot drops out once it
+passes, so polls already made stop counting).
+
+Never schedules earlier than the target: a poll before the predicted upload is wasted.
+"""
+import logging
+import random
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+
+log = logging.getLogger(__name__)
+
+SLOT_SEC = 3600
+# How far past the target a poll may slide, per rank
+SPREAD_SEC_BY_RANK = {
+    "day": 2 * 3600,
+    "dual": 4 * 3600,
+    "week": 12 * 3600,
+    "month": 2 * 86400,
+    "abandoned": 7 * 86400,
+}
+DEFAULT_SPREAD_SEC = 6 * 3600
+GLOBAL_WEIGHT = 0.5                 # other users' load counts half as much as your own
+
+QUERY_USER_HISTOGRAM = """
+    SELECT ts / 3600 AS slot, COUNT(*)
+    FROM Channels
+    WHERE ts >= ? AND ts < ?
+    GROUP BY slot
+"""
+
+QUERY_PROJECTED = """
+    SELECT ts / 3600 AS slot, COUNT(*)
+    FROM Channels
+    WHERE ts IS NOT NULL AND ts < ?
+    GROUP BY slot
+"""
+
+
+class ScheduleLeveller:
+    def __init__(self, rng: Optional[random.Random] = None) -> None:
+        self._lock = threading.Lock()
+        self._global: Counter[int] = Counter()
+        self._floor = 0                 # slots below this have passed and are dropped
+        self._rng = rng or random.Random()
+
+    def reset(self, rng: Optional[random.Random] = None) -> None:
+        """Empty timeline and a fresh jitter source (seeded → reproducible simulator runs)."""
+        with self._lock:
+            self._global = Counter()
+            self._floor = 0
+            self._rng = rng or random.Random()
+
+    def seed(self, db_paths: Iterable[Path | str]) -> None:
+        """Load every user's future schedule into the global histogram (startup)."""
+        now_slot = int(time.time()) // SLOT_SEC
+        totals: Counter[int] = Counter()
+        for db_path in db_paths:
+            try:
+                conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+                try:
+                    totals.update(dict(conn.execute(
+                        QUERY_USER_HISTOGRAM, (now_slot * SLOT_SEC, 2**62),
+                    ).fetchall()))
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                log.warning("Leveller could not read %s: %s", db_path, e)
+        with self._lock:
+            self._global = totals
+            self._floor = now_slot
+        log.info("Leveller seeded with %d scheduled polls", sum(totals.values()))
+
+    def level(
+        self,
+        conn: sqlite3.Connection,
+        target_ts: int,
+        rank: Optional[str] = None,
+        now: Optional[float] = None,
+    ) -> int:
+        """`now` is injectable for the virtual clock of youtube/simulate.py."""
+        spread = SPREAD_SEC_BY_RANK.get(rank or "", DEFAULT_SPREAD_SEC)
+        lo, hi = int(target_ts), int(target_ts) + spread
+        first, last = lo // SLOT_SEC, hi // SLOT_SEC
+
+        user = dict(conn.execute(
+            QUERY_USER_HISTOGRAM, (first * SLOT_SEC, (last + 1) * SLOT_SEC),
+        ).fetchall())
+
+        with self._lock:
+            # Polls already made (or overdue) no longer load the timeline
+            self._expire(int(now if now is not None else time.time()) // SLOT_SEC)
+            # Least loaded slot wins; ties go to the earliest (freshest) one
+            slot = min(
+                range(first, last + 1),
+                key=lambda s: (user.get(s, 0) + GLOBAL_WEIGHT * self._global.get(s, 0), s),
+            )
+            if slot >= self._floor:
+                self._global[slot] += 1
+
+        start = max(lo, slot * SLOT_SEC)
+        end = min(hi, (slot + 1) * SLOT_SEC - 1)
+        with self._lock:
+            return self._rng.randint(start, max(start, end))
+
+    def _expire(self, now_slot: int) -> None:
+        """Drop every slot before now_slot (caller holds the lock)."""
+        if now_slot <= self._floor:
+            return
+        if now_slot - self._floor > len(self._global):
+            stale = [s for s in self._global if s < now_slot]
+        else:
+            stale = range(self._floor, now_slot)
+        for s in stale:
+            self._global.pop(s, None)
+        self._floor = now_slot
+
+
+leveller = ScheduleLeveller()
+
+
+def ts_read_of(ts: int) -> str:
+    return datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M')
+
+
+def projected_polls(db_paths: Iterable[Path | str], hours: int = 48) -> dict:
+    """Polls per hour over the next `hours`, summed across the given DBs."""
+    now = int(time.time())
+    now_slot = now // SLOT_SEC
+    totals: Counter[int] = Counter()
+    for db_path in db_paths:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            totals.update(dict(conn.execute(
+                QUERY_PROJECTED, ((now_slot + hours) * SLOT_SEC,),
+            ).fetchall()))
+        finally:
+            conn.close()
+
+    overdue = sum(n for s, n in totals.items() if s < now_slot)
+    series = [
+        {"hour": ts_read_of(s * SLOT_SEC), "polls": totals.get(s, 0)}
+        for s in range(now_slot, now_slot + hours)
+    ]
+    counts = [p["polls"] for p in series]
+    return {
+        "overdue": overdue,
+        "peak_per_hour": max(counts, default=0),
+        "mean_per_hour": round(sum(counts) / len(counts), 2) if counts else 0,
+        "hours": series,
+    }
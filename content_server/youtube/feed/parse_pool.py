@@ -0,0 +1,165 @@
+# parse_pool.py
+"""
+Feed parsing stage of the fetch pipeline, optionally in a process pool.
+
+feedparser is pure Python: during catch-up or a bulk import dozens of feeds
+finish at once and their parses queue on the GIL with API request handling.
+With HYDRA_PARSE_PROCS > 0 the raw response bytes go to worker processes and
+compact tuples come back; 0 keeps parsing inline in the fetch thread.
+
+Imports nothing from the app: spawned children only load feedparser.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple, Union
+
+import feedparser
+
+log = logging.getLogger(__name__)
+
+PARSE_PROCS = int(os.environ.get("HYDRA_PARSE_PROCS", 0))   # 0 → inline
+POOL_RESTART_SEC = 60.0             # after a broken pool: inline parsing for this long
+
+# (id, title, url, published, thumbnail)
+VideoRow = Tuple[str, str, str, str, Optional[str]]
+ParsedFeed = Tuple[List[VideoRow], str, str]   # (rows newest first, channel_name, channel_url)
+
+# ===============================
+# Parse (runs in the pool or inline)
+# ===============================
+def parse_rows(raw: Union[bytes, str], rss_id: str) -> Optional[ParsedFeed]:
+    """
+    Feed XML (bytes as received, or text) → (rows newest first, channel_name, channel_url),
+    or None when the feed holds no usable entry.
+    """
+    feed = feedparser.parse(raw)
+    if not feed.entries:
+        log.info("No entries in feed for channel %s", rss_id)
+        return None
+
+    rows: List[VideoRow] = []
+    for entry in feed.entries:
+        # Extract video ID (format: yt:video:VIDEO_ID)
+        vid = entry.get("id", "").split(":")[-1]
+        if not vid:
+            continue
+        # Thumbnail from media:thumbnail (highest res first)
+        thumbnail = None
+        if "media_thumbnail" in entry and entry.media_thumbnail:
+            thumbnail = entry.media_thumbnail[0]["url"]
+        rows.append((
+            vid,
+            entry.get("title", "No title"),
+            entry.get("link") or f"https://www.youtube.com/watch?v={vid}",   # canonical URL
+            entry.get("published", ""),
+            thumbnail,
+        ))
+
+    if not rows:
+        log.info("No valid videos parsed for channel %s", rss_id)
+        return None
+
+    # Sort newest first by published date
+    rows.sort(key=lambda row: row[3], reverse=True)
+
+    channel_name = feed.feed.get("title", "Unknown Channel") if feed.feed else "Unknown Channel"
+
+    # Channel URL: author_uri when present, else the alternate / first link
+    channel_url = "Unknown URL"
+    if feed.feed:
+        if "author_uri" in feed.feed:
+            channel_url = feed.feed.author_uri
+        elif "link" in feed.feed and isinstance(feed.feed.link, str):
+            channel_url = feed.feed.link
+        elif "links" in feed.feed and feed.feed.links:
+            for link in feed.feed.links:
+                if link.get("rel") == "alternate" and link.get("href"):
+                    channel_url = link["href"]
+                    break
+            else:
+                channel_url = feed.feed.links[0].get("href", "Unknown URL")
+
+    return rows, channel_name, channel_url
+
+# ===============================
+# Pool
+# ===============================
+class ParsePool:
+    """
+    Lazily started ProcessPoolExecutor shared by every fetch thread's event loop.
+    A crashed child (BrokenProcessPool) → feeds are parsed inline for
+    POOL_RESTART_SEC, then the pool is rebuilt.
+    """
+
+    def __init__(self, procs: int = PARSE_PROCS) -> None:
+        self.procs = procs
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._restart_at = 0.0
+        self._parsed = 0
+        self._fallbacks = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: the parent runs many threads, fork could copy a held lock
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.procs, mp_context=multiprocessing.get_context("spawn"),
+                )
+                log.info("Parse pool started with %d process(es)", self.procs)
+            return self._executor
+
+    async def parse(self, raw: Union[bytes, str], rss_id: str) -> Optional[ParsedFeed]:
+        if self.procs <= 0 or time.monotonic() < self._restart_at:
+            return parse_rows(raw, rss_id)
+        executor = self._pool()
+        try:
+            parsed = await asyncio.get_running_loop().run_in_executor(executor, parse_rows, raw, rss_id)
+        except BrokenProcessPool:
+            with self._lock:
+                if self._executor is executor:   # first caller to notice → one warning per break
+                    self._executor = None
+                    self._restart_at = time.monotonic() + POOL_RESTART_SEC
+                    log.warning("Parse pool broken → parsing inline for %.0fs, then restarting it",
+                                POOL_RESTART_SEC)
+            self._fallbacks += 1
+            return parse_rows(raw, rss_id)
+        self._parsed += 1
+        return parsed
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def status(self) -> dict:
+        return {
+            "procs": self.procs,
+            "running": self._executor is not None,
+            "parsed_in_pool": self._parsed,
+            "inline_fallbacks": self._fallbacks,
+        }
+
+
+parse_pool = ParsePool()
+
+# ===============================
+# Module Summary
+# ===============================
+"""
+parse_rows(raw, rss_id) → ([(id, title, url, published, thumbnail), ...], name, url) | None
+  - plain tuples only: cheap to pickle back from a child process
+  - fetcher.feed_fetcher turns them into Video via model_construct (no re-validation)
+
+parse_pool.parse(raw, rss_id)
+  - HYDRA_PARSE_PROCS=0 → inline in the calling fetch thread (previous behaviour)
+  - HYDRA_PARSE_PROCS=N → N spawned processes, awaited from any fetch thread's loop
+  - shut down from main.py's lifespan
+"""
@@ -1,11 +1,21 @@
 # processor.py
 import logging
-from datetime import datetime, timedelta
-from typing import List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
 import sqlite3
 import asyncio
-from .fetcher import feed_fetcher, Video
+import random
+import time
+from .fetcher import feed_fetcher, Video, FeedFetchError, FetchErrorKind, PollTrace
+from .resilience import breaker, next_backoff, reset_backoff
 from .ts_proc import predict_ts
+from .leveller import leveller, ts_read_of
+from ..budget import budget
+from ...sql_lite.operation.compact import published_epoch
+from ...sql_lite.operation.poll_log import record_polls
+from ...sql_lite.service.writer import write
+from ...metrics import POLLS, SAVE_SECONDS, VIDEOS_SAVED
+from ...profiler import profiler
 
 log = logging.getLogger(__name__)
 
@@ -18,9 +28,7 @@ QUERIES = {
         VALUES (?, ?)
         ON CONFLICT(channel_url) DO UPDATE SET
             channel_name = excluded.channel_name
-    """,
-    "get_channel_fk": """
-        SELECT id_channel FROM Channel WHERE channel_url = ?
+        RETURNING id_channel
     """,
     "upsert_channels_tracking": """
         INSERT INTO Channels (rss_id, last_video_id, ts, ts_read, rank, counter, id_channel)
@@ -33,6 +41,9 @@ QUERIES = {
             counter = 0,
             id_channel = excluded.id_channel
     """,
+    "get_rank_ts": """
+        SELECT rank, ts FROM Channels WHERE rss_id = ?
+    """,
     "get_counter_rank": """
         SELECT counter, rank FROM Channels WHERE rss_id = ?
     """,
@@ -44,12 +55,24 @@ QUERIES = {
             ts_read = ?
         WHERE rss_id = ?
     """,
+    "update_tracking_backoff": """
+        UPDATE Channels SET
+            ts = ?,
+            ts_read = ?
+        WHERE rss_id = ?
+    """,
+    # executemany → rowcount = rows actually inserted, the rest were duplicates
     "insert_video": """
-        INSERT OR IGNORE INTO Result (title, video_url, thumbnail, channel_id)
+        INSERT OR IGNORE INTO Result (video_id, title, channel_id, published)
         VALUES (?, ?, ?, ?)
     """,
 }
 
+def insert_totals() -> dict:
+    """Cumulative insert outcomes across every DB writer thread (/status/ingest)."""
+    totals = VIDEOS_SAVED.values()
+    return {result: int(totals.get((result,), 0)) for result in ("inserted", "ignored")}
+
 def _get_next_rank(current: Optional[str]) -> str:
     order = ["day", "dual", "week", "month", "abandoned"]
     if current not in order:
@@ -57,7 +80,12 @@ def _get_next_rank(current: Optional[str]) -> str:
     idx = order.index(current)
     return order[min(idx + 1, len(order) - 1)]
 
-def _handle_no_new(conn: sqlite3.Connection, rss_id: str, is_error: bool = False) -> None:
+def _handle_no_new(
+    conn: sqlite3.Connection,
+    rss_id: str,
+    is_error: bool = False,
+    now: Optional[datetime] = None,
+) -> None:
     cur = conn.cursor()
     cur.execute(QUERIES["get_counter_rank"], (rss_id,))
     row = cur.fetchone()
@@ -83,10 +111,12 @@ def _handle_no_new(conn: sqlite3.Connection, rss_id: str, is_error: bool = False
         "abandoned": 365,
     }.get(new_rank, 7)
 
-    now = datetime.now()
+    now = now or datetime.now()
     next_dt = now + timedelta(days=delay_days)
-    next_ts = int(next_dt.timestamp())
-    next_ts_read = next_dt.strftime('%Y-%m-%d %H:%M')
+    # Spread the ladder's "now + N days" so a bulk import doesn't come due as one burst
+    target = budget.clamp(conn, rss_id, int(next_dt.timestamp()), now.timestamp())
+    next_ts = leveller.level(conn, target, new_rank, now=now.timestamp())
+    next_ts_read = ts_read_of(next_ts)
 
     cur.execute(
         QUERIES["update_tracking_no_new"],
@@ -94,8 +124,6 @@ def _handle_no_new(conn: sqlite3.Connection, rss_id: str, is_error: bool = False
     )
     if cur.rowcount == 0:
         log.warning("No tracking row to update for rss_id=%s during no-new handling", rss_id)
-    else:
-        conn.commit()
 
     reason = "error" if is_error else "no new videos"
     log.info(
@@ -103,6 +131,34 @@ def _handle_no_new(conn: sqlite3.Connection, rss_id: str, is_error: bool = False
         reason, rss_id, counter, new_rank, next_ts_read,
     )
 
+def _handle_failure(
+    conn: sqlite3.Connection,
+    rss_id: str,
+    error: Optional[FeedFetchError] = None,
+    now: Optional[datetime] = None,
+) -> None:
+    """
+    Transient failure (or unexpected exception): push ts back with jittered
+    exponential backoff. counter and rank stay exactly as they were.
+    """
+    now = now or datetime.now()
+    if error is not None and error.kind is FetchErrorKind.CIRCUIT_OPEN:
+        # Not the channel's fault and no request was sent → retry right after the probe
+        delay = breaker.seconds_until_probe() + random.uniform(30, 300)
+    else:
+        delay = next_backoff(rss_id, error.retry_after if error else None)
+
+    next_dt = now + timedelta(seconds=delay)
+    next_ts_read = next_dt.strftime('%Y-%m-%d %H:%M')
+    conn.execute(
+        QUERIES["update_tracking_backoff"],
+        (int(next_dt.timestamp()), next_ts_read, rss_id),
+    )
+    log.warning(
+        "Fetch failed (%s) → rss_id=%s | backoff %.0f min, rank untouched | next check: %s",
+        error.kind.value if error else "exception", rss_id, delay / 60, next_ts_read,
+    )
+
 def _save_data(
     conn: sqlite3.Connection,
     videos: List[Video],
@@ -113,96 +169,174 @@ def _save_data(
     next_ts_read: str,
     rank: str,
     rss_id: str,
-) -> None:
-    cur = conn.cursor()
-    # 1. Upsert channel by unique channel_url
-    cur.execute(QUERIES["upsert_channel"], (channel_name, channel_url))
-    cur.execute(QUERIES["get_channel_fk"], (channel_url,))
-    row = cur.fetchone()
-    if not row:
-        raise RuntimeError(f"Channel url '{channel_url}' not found after upsert")
-    channel_fk = row[0]
+) -> Tuple[int, int]:
+    """Returns (inserted, ignored) video counts."""
+    with SAVE_SECONDS.time():
+        cur = conn.cursor()
+        # 1. Upsert channel by unique channel_url, id straight from RETURNING
+        row = cur.execute(QUERIES["upsert_channel"], (channel_name, channel_url)).fetchone()
+        if not row:
+            raise RuntimeError(f"Channel url '{channel_url}' not found after upsert")
+        channel_fk = row[0]
 
-    # 2. Update tracking – reset counter, set predicted rank/ts
-    cur.execute(
-        QUERIES["upsert_channels_tracking"],
-        (rss_id, latest_video_id, next_ts, next_ts_read, rank, channel_fk),
-    )
-
-    # 3. Insert new videos
-    for video in videos:
+        # 2. Update tracking – reset counter, set predicted rank/ts
         cur.execute(
+            QUERIES["upsert_channels_tracking"],
+            (rss_id, latest_video_id, next_ts, next_ts_read, rank, channel_fk),
+        )
+
+        # 3. Insert new videos, one prepared statement for the whole list
+        cur.executemany(
             QUERIES["insert_video"],
-            (video.title, video.url, video.thumbnail, channel_fk),
+            [(video.id, video.title, channel_fk, published_epoch(video.published)) for video in videos],
         )
+        inserted = max(cur.rowcount, 0)
+        ignored = len(videos) - inserted
+        VIDEOS_SAVED.inc(inserted, result="inserted")
+        VIDEOS_SAVED.inc(ignored, result="ignored")
 
-    conn.commit()
-    log.info(
-        "SUCCESS → %s | +%d new videos | rank=%s | next check: %s",
-        channel_name,
-        len(videos),
-        rank,
-        next_ts_read,
-    )
+        log.info(
+            "SUCCESS → %s | +%d new videos (%d duplicate) | rank=%s | next check: %s",
+            channel_name,
+            inserted,
+            ignored,
+            rank,
+            next_ts_read,
+        )
+    return inserted, ignored
 
-def process_feed(db_path: str, rss_id: str, video_id: Optional[str] = None) -> None:
-    conn = sqlite3.connect(db_path, detect_types=sqlite3.PARSE_DECLTYPES)
-    conn.execute("PRAGMA foreign_keys = ON")
+def _apply_result(
+    conn: sqlite3.Connection,
+    rss_id: str,
+    result,
+    now: Optional[datetime] = None,
+) -> Tuple[str, int]:
+    """
+    Persist one feed_fetcher() result (FeedFetchError / None / "old" / success tuple).
+    `now` is injectable so the scheduler can be replayed on a virtual clock.
+    Does not commit: callers own the transaction.
+    Returns (outcome, inserted videos) for the PollLog row.
+    """
+    if isinstance(result, FeedFetchError):
+        if result.transient:
+            _handle_failure(conn, rss_id, result, now=now)
+        else:
+            # 404 / other 4xx: YouTube answered, the channel is gone → the ladder applies
+            reset_backoff(rss_id)
+            _handle_no_new(conn, rss_id, is_error=True, now=now)
+        return f"error:{result.kind.value}", 0
+
+    elif result is None:
+        reset_backoff(rss_id)
+        log.warning("Fetcher returned empty feed → treating as no-new for rss_id=%s", rss_id)
+        _handle_no_new(conn, rss_id, is_error=True, now=now)
+        return "empty", 0
+
+    elif result == "old":
+        reset_backoff(rss_id)
+        _handle_no_new(conn, rss_id, is_error=False, now=now)
+        return "old", 0
+
+    else:
+        reset_backoff(rss_id)
+        # Success with new videos: recent_timestamps, new_videos, latest_video_id, channel_name, channel_url
+        pre_ts, new_videos, latest_video_id, channel_name, channel_url = result
+        now = now or datetime.now()
+
+        # ──────────────────────────────
+        # Next check prediction (only on success with new videos)
+        # ──────────────────────────────
+        try:
+            if pre_ts:
+                ts_read, ts, rank = predict_ts(pre_ts[-20:], now=_to_utc_naive(now))
+            else:
+                # Brand new – no history
+                tomorrow = now + timedelta(days=1)
+                next_dt = tomorrow.replace(hour=23, minute=59, second=0, microsecond=0)
+                ts_read = next_dt.strftime('%Y-%m-%d %H:%M')
+                ts = int(next_dt.timestamp())
+                rank = "day"
+                log.info("No timestamp history → scheduling tomorrow 23:59, rank=day")
+        except Exception as exc:
+            log.warning("predict_ts failed → funcategorizedback +7 days | %s", exc)
+            funcategorizedback_dt = now + timedelta(days=7)
+            ts_read = funcategorizedback_dt.strftime('%Y-%m-%d %H:%M')
+            ts = int(funcategorizedback_dt.timestamp())
+            rank = "week"
+
+        # Global budget ceiling, then jitter + load-level the slot (predicted and default targets alike)
+        ts = budget.clamp(conn, rss_id, ts, now.timestamp())
+        ts = leveller.level(conn, ts, rank, now=now.timestamp())
+        ts_read = ts_read_of(ts)
+
+        # ──────────────────────────────
+        # Save everything
+        # ──────────────────────────────
+        inserted, _ = _save_data(
+            conn=conn,
+            videos=new_videos,
+            latest_video_id=latest_video_id,
+            channel_name=channel_name,
+            channel_url=channel_url,
+            next_ts=ts,
+            next_ts_read=ts_read,
+            rank=rank,
+            rss_id=rss_id,
+        )
+        return "new", inserted
+
+def _to_utc_naive(local_dt: datetime) -> datetime:
+    # predict_ts works on naive UTC, the ladder above on naive local time
+    return datetime.fromtimestamp(local_dt.timestamp(), tz=timezone.utc).replace(tzinfo=None)
+
+async def fetch_result(rss_id: str, video_id: Optional[str] = None) -> Tuple[object, PollTrace]:
+    """feed_fetcher() with failures returned as FeedFetchError instead of raised, plus its trace."""
+    trace = PollTrace()
     try:
-        result = asyncio.run(feed_fetcher(rss_id, video_id))
+        return await feed_fetcher(rss_id, video_id, trace), trace
+    except FeedFetchError as err:
+        return err, trace
 
-        if result is None:
-            log.warning("Fetcher returned None → treating as error for rss_id=%s", rss_id)
-            _handle_no_new(conn, rss_id, is_error=True)
+def fetch_result_sync(rss_id: str, video_id: Optional[str] = None) -> Tuple[object, PollTrace]:
+    """Thread entry point: each worker thread runs its own event loop."""
+    return asyncio.run(fetch_result(rss_id, video_id))
 
-        elif result == "old":
-            _handle_no_new(conn, rss_id, is_error=False)
+def _rank_ts(conn: sqlite3.Connection, rss_id: str) -> Tuple[Optional[str], Optional[int]]:
+    row = conn.execute(QUERIES["get_rank_ts"], (rss_id,)).fetchone()
+    return (row[0], row[1]) if row else (None, None)
 
-        else:
-            # Success with new videos: recent_timestamps, new_videos, latest_video_id, channel_name, channel_url
-            pre_ts, new_videos, latest_video_id, channel_name, channel_url = result
-
-            # ──────────────────────────────
-            # Next check prediction (only on success with new videos)
-            # ──────────────────────────────
-            try:
-                if pre_ts:
-                    ts_read, ts, rank = predict_ts(pre_ts[-20:])
-                else:
-                    # Brand new – no history
-                    tomorrow = datetime.now() + timedelta(days=1)
-                    next_dt = tomorrow.replace(hour=23, minute=59, second=0, microsecond=0)
-                    ts_read = next_dt.strftime('%Y-%m-%d %H:%M')
-                    ts = int(next_dt.timestamp())
-                    rank = "day"
-                    log.info("No timestamp history → scheduling tomorrow 23:59, rank=day")
-            except Exception as exc:
-                log.warning("predict_ts failed → funcategorizedback +7 days | %s", exc)
-                funcategorizedback_dt = datetime.now() + timedelta(days=7)
-                ts_read = funcategorizedback_dt.strftime('%Y-%m-%d %H:%M')
-                ts = int(funcategorizedback_dt.timestamp())
-                rank = "week"
-
-            # ──────────────────────────────
-            # Save everything
-            # ──────────────────────────────
-            _save_data(
-                conn=conn,
-                videos=new_videos,
-                latest_video_id=latest_video_id,
-                channel_name=channel_name,
-                channel_url=channel_url,
-                next_ts=ts,
-                next_ts_read=ts_read,
-                rank=rank,
-                rss_id=rss_id,
-            )
-    except Exception:
-        log.exception("CRITICAL failure processing rss_id=%s", rss_id)
+def apply_batch(conn: sqlite3.Connection, results: List[Tuple[str, object, PollTrace]]) -> int:
+    """
+    Writer op (sql_lite/service/writer.py): persist many (rss_id, result, trace)
+    triples inside the writer's transaction. A failing row is rolled back to its
+    savepoint and rescheduled with backoff, the rest of the batch still commits.
+    Every poll also lands in PollLog, one batched insert at the end.
+    """
+    history = []
+    for rss_id, result, trace in results:
+        rank_before, ts_before = _rank_ts(conn, rss_id)
+        started = time.perf_counter()
+        conn.execute("SAVEPOINT poll")
         try:
-            _handle_no_new(conn, rss_id, is_error=True)
+            outcome, new_videos = _apply_result(conn, rss_id, result)
         except Exception:
-            pass
-        raise
-    finally:
-        conn.close()
+            log.exception("CRITICAL failure processing rss_id=%s", rss_id)
+            conn.execute("ROLLBACK TO poll")
+            _handle_failure(conn, rss_id)
+            outcome, new_videos = "exception", 0
+        conn.execute("RELEASE poll")
+        # Counted once the savepoint settled: a rolled-back poll is an error, not "new" + error
+        POLLS.inc(outcome="error" if outcome == "exception" else outcome.split(":", 1)[0])
+        db_ms = int((time.perf_counter() - started) * 1000)
+        history.append((
+            rss_id, int(trace.started_at), trace.fetch_ms, trace.parse_ms, db_ms,
+            trace.bytes, trace.http_status, outcome, new_videos,
+            rank_before, ts_before, *_rank_ts(conn, rss_id),
+        ))
+    record_polls(conn, history)
+    return len(results)
+
+def process_feed(db_path: str, rss_id: str, video_id: Optional[str] = None) -> None:
+    """Fetch one channel, then hand the outcome to the DB's single writer."""
+    result, trace = fetch_result_sync(rss_id, video_id)
+    write(db_path, profiler.follow(apply_batch), [(rss_id, result, trace)])  # writer side of a sampled bulk poll
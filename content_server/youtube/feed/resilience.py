@@ -0,0 +1,202 @@
+# resilience.py
+"""
+Failure handling for feed fetching.
+
+- CircuitBreaker: process-wide. Opens after consecutive transport failures
+  (timeouts, network errors, 5xx, 429), pauses every scheduler, then lets exactly
+  one probe request through before resuming. A probe that ends without a verdict
+  (cancelled, non-HTTP error) is released by the fetcher; one that never comes back
+  fails after BREAKER_PROBE_TIMEOUT_SEC, so the schedulers can't park forever.
+- Per-channel exponential backoff with full jitter. Backoff only moves Channels.ts,
+  it never touches counter/rank, so an offline afternoon can't demote a library.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from enum import StrEnum
+from typing import Optional
+
+log = logging.getLogger(__name__)
+
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_COOLDOWN_SEC = 60.0
+BREAKER_MAX_COOLDOWN_SEC = 30 * 60.0
+BREAKER_PROBE_TIMEOUT_SEC = 120.0   # well past the 30 s HTTP timeout
+
+BACKOFF_BASE_SEC = 5 * 60.0
+BACKOFF_CAP_SEC = 12 * 3600.0
+
+
+class BreakerState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+def _caller() -> object:
+    """Who holds the probe: the asyncio task, or the thread outside a loop."""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return task if task is not None else threading.get_ident()
+
+
+class CircuitBreaker:
+    """
+    Thread-safe: fetches run in worker threads (asyncio.to_thread), the
+    schedulers on the main loop.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        cooldown_sec: float = BREAKER_COOLDOWN_SEC,
+        max_cooldown_sec: float = BREAKER_MAX_COOLDOWN_SEC,
+        probe_timeout_sec: float = BREAKER_PROBE_TIMEOUT_SEC,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown_sec
+        self.max_cooldown = max_cooldown_sec
+        self.probe_timeout = probe_timeout_sec
+        self._lock = threading.Lock()
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+        self._cooldown = cooldown_sec
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_owner: object = None
+        self._probe_started = 0.0
+
+    @property
+    def state(self) -> BreakerState:
+        with self._lock:
+            self._expire_probe()
+            return self._state
+
+    def seconds_until_probe(self) -> float:
+        with self._lock:
+            self._expire_probe()
+            if self._state is BreakerState.CLOSED:
+                return 0.0
+            return max(0.0, self._opened_at + self._cooldown - time.monotonic())
+
+    def allow_request(self) -> bool:
+        """Gate for a single HTTP request. In half-open only one probe passes."""
+        with self._lock:
+            self._expire_probe()
+            if self._state is BreakerState.CLOSED:
+                return True
+            if self._state is BreakerState.OPEN:
+                if time.monotonic() < self._opened_at + self._cooldown:
+                    return False
+                self._state = BreakerState.HALF_OPEN
+                self._probe_in_flight = False
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            self._probe_owner = _caller()
+            self._probe_started = time.monotonic()
+            log.info("Circuit half-open → sending one probe request")
+            return True
+
+    def release_probe(self) -> None:
+        """
+        Called in a `finally` after every request. If the caller's probe ended without
+        record_success/record_failure, it proved nothing → back to OPEN with the cooldown
+        already served, so the next dispatch probes again.
+        """
+        with self._lock:
+            if (self._state is BreakerState.HALF_OPEN and self._probe_in_flight
+                    and self._probe_owner == _caller()):
+                log.info("Probe ended without a response → circuit re-opened for the next probe")
+                self._state = BreakerState.OPEN
+                self._probe_in_flight = False
+                self._probe_owner = None
+
+    def _expire_probe(self) -> None:
+        # Lock held. A probe that never reports back counts as a failed one
+        if (self._state is BreakerState.HALF_OPEN and self._probe_in_flight
+                and time.monotonic() > self._probe_started + self.probe_timeout):
+            log.warning("Probe gave no answer in %.0fs → treating it as failed", self.probe_timeout)
+            self._cooldown = min(self._cooldown * 2, self.max_cooldown)
+            self._open(None)
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state is not BreakerState.CLOSED:
+                log.info("Probe succeeded → circuit closed, schedulers resume")
+            self._state = BreakerState.CLOSED
+            self._failures = 0
+            self._cooldown = self.base_cooldown
+            self._probe_in_flight = False
+            self._probe_owner = None
+
+    def record_failure(self, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state is BreakerState.HALF_OPEN:
+                # Probe failed → stay open, longer
+                self._cooldown = min(self._cooldown * 2, self.max_cooldown)
+                self._open(retry_after)
+            elif self._state is BreakerState.CLOSED and self._failures >= self.failure_threshold:
+                self._open(retry_after)
+
+    def _open(self, retry_after: Optional[float]) -> None:
+        if retry_after:
+            self._cooldown = min(max(self._cooldown, retry_after), self.max_cooldown)
+        self._state = BreakerState.OPEN
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+        self._probe_owner = None
+        log.warning(
+            "Circuit OPEN after %d consecutive failures → pausing schedulers for %.0fs",
+            self._failures, self._cooldown,
+        )
+
+    async def wait_until_ready(self) -> None:
+        """Schedulers await this before dispatching a poll."""
+        while True:
+            state = self.state
+            if state is BreakerState.CLOSED:
+                return
+            delay = self.seconds_until_probe()
+            if state is BreakerState.OPEN and delay <= 0:
+                return  # cooldown over → this dispatch may become the probe
+            await asyncio.sleep(max(1.0, min(delay, 30.0)))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "state": self._state.value,
+                "consecutive_failures": self._failures,
+                "cooldown_sec": self._cooldown,
+            }
+
+
+breaker = CircuitBreaker()
+
+# ===============================
+# Per-channel backoff
+# ===============================
+_failure_counts: dict[str, int] = {}
+_failure_lock = threading.Lock()
+
+
+def next_backoff(rss_id: str, retry_after: Optional[float] = None) -> float:
+    """Bump the channel's failure count and return a jittered delay in seconds."""
+    with _failure_lock:
+        failures = _failure_counts.get(rss_id, 0) + 1
+        _failure_counts[rss_id] = failures
+    ceiling = min(BACKOFF_CAP_SEC, BACKOFF_BASE_SEC * 2 ** (failures - 1))
+    delay = random.uniform(ceiling / 2, ceiling)
+    if retry_after:
+        delay = max(delay, retry_after)
+    return delay
+
+
+def reset_backoff(rss_id: str) -> None:
+    with _failure_lock:
+        _failure_counts.pop(rss_id, None)
@@ -0,0 +1,204 @@
+# throttle.py
+"""
+Adaptive (AIMD) request throttle shared by every feed fetch path.
+
+- Additive increase: each fast 2xx/304 response nudges the request rate up by
+  a fixed fraction of max_rate, and every INCREASE_CONCURRENCY_EVERY of them
+  allows one more request in flight.
+- Multiplicative decrease: 429, 5xx, transport errors or a latency spike halve
+  the rate and the concurrency limit — once per overload event: failures of
+  requests sent before the last decrease were already paid for.
+- Retry-After pauses every caller until the given instant.
+
+Thread-safe: fetches run in their own event loops inside worker threads.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+log = logging.getLogger(__name__)
+
+INITIAL_RATE_PER_SEC = float(os.environ.get("HYDRA_THROTTLE_RATE", 0.1))   # the old fixed 10 s gap
+MIN_RATE_PER_SEC = 1 / 60           # never slower than a request per minute
+MAX_RATE_PER_SEC = float(os.environ.get("HYDRA_THROTTLE_MAX_RATE", 2.0))
+# Per healthy response, as a fraction of max_rate (0.005 → +0.01 req/s at the default 2 req/s)
+ADDITIVE_STEP_FRACTION = float(os.environ.get("HYDRA_THROTTLE_STEP_FRACTION", 0.005))
+DECREASE_FACTOR = 0.5
+
+MAX_CONCURRENCY = int(os.environ.get("HYDRA_THROTTLE_MAX_CONCURRENCY", 8))
+INCREASE_CONCURRENCY_EVERY = 20     # consecutive healthy responses
+
+LATENCY_SPIKE_SEC = 3.0             # absolute floor for "slow"
+LATENCY_SPIKE_FACTOR = 3.0          # … or this many times the running average
+LATENCY_EWMA_ALPHA = 0.2
+
+
+class AdaptiveThrottle:
+    def __init__(
+        self,
+        rate: float = INITIAL_RATE_PER_SEC,
+        min_rate: float = MIN_RATE_PER_SEC,
+        max_rate: float = MAX_RATE_PER_SEC,
+        max_concurrency: int = MAX_CONCURRENCY,
+        step_fraction: float = ADDITIVE_STEP_FRACTION,
+    ) -> None:
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.max_concurrency = max_concurrency
+        self.step_fraction = step_fraction
+        self._lock = threading.Lock()
+        self._rate = rate
+        self._concurrency = 1
+        self._in_flight = 0
+        self._next_slot = 0.0
+        self._pause_until = 0.0
+        self._last_decrease = float("-inf")   # monotonic time of the last backoff
+        self._healthy_streak = 0
+        self._latency_ewma: Optional[float] = None
+        self._requests = 0
+        self._decreases = 0
+
+    def configure(
+        self,
+        rate: Optional[float] = None,
+        max_rate: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        step_fraction: Optional[float] = None,
+    ) -> None:
+        """Re-tune the live throttle (offline load tests point it at a local feed server)."""
+        with self._lock:
+            if step_fraction is not None:
+                self.step_fraction = step_fraction
+            if max_rate is not None:
+                self.max_rate = max_rate
+            if max_concurrency is not None:
+                self.max_concurrency = max_concurrency
+                self._concurrency = min(self._concurrency, max_concurrency)
+            if rate is not None:
+                self._rate = max(self.min_rate, min(self.max_rate, rate))
+
+    # ---------- pacing
+    def _try_acquire(self) -> float:
+        """0 → acquired, otherwise seconds to wait before trying again."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(self._next_slot, self._pause_until)
+            if now < start:
+                return start - now
+            if self._in_flight >= self._concurrency:
+                return 0.05
+            self._in_flight += 1
+            self._requests += 1
+            self._next_slot = now + 1.0 / self._rate
+            return 0.0
+
+    async def acquire(self) -> None:
+        while (wait := self._try_acquire()) > 0:
+            await asyncio.sleep(min(wait, 1.0))
+
+    def release(
+        self,
+        status: Optional[int],
+        latency: float,
+        retry_after: Optional[float] = None,
+        started: Optional[float] = None,
+    ) -> None:
+        """
+        status=None means the request never got a response (timeout / network).
+        started: monotonic send time; a failure of a request sent before the last
+        decrease belongs to the overload that decrease already answered.
+        """
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            ok = status is not None and (200 <= status < 300 or status == 304)
+            overloaded = status is None or status == 429 or status >= 500
+            spike = ok and self._is_spike(latency)
+
+            if overloaded or spike:
+                if started is None or started >= self._last_decrease:
+                    self._decrease(retry_after, status, latency)
+                elif retry_after:
+                    self._pause_until = max(self._pause_until, time.monotonic() + retry_after)
+            elif ok:
+                self._increase()
+            # Other 4xx: YouTube is fine, the channel isn't → no adjustment
+
+            if ok and not spike:
+                a = LATENCY_EWMA_ALPHA
+                self._latency_ewma = latency if self._latency_ewma is None else (
+                    a * latency + (1 - a) * self._latency_ewma
+                )
+
+    def _is_spike(self, latency: float) -> bool:
+        if self._latency_ewma is None:
+            return latency > LATENCY_SPIKE_SEC * LATENCY_SPIKE_FACTOR
+        return latency > max(LATENCY_SPIKE_SEC, LATENCY_SPIKE_FACTOR * self._latency_ewma)
+
+    def _increase(self) -> None:
+        self._rate = min(self.max_rate, self._rate + self.max_rate * self.step_fraction)
+        self._healthy_streak += 1
+        if self._healthy_streak >= INCREASE_CONCURRENCY_EVERY:
+            self._healthy_streak = 0
+            self._concurrency = min(self.max_concurrency, self._concurrency + 1)
+
+    def _decrease(self, retry_after: Optional[float], status: Optional[int], latency: float) -> None:
+        self._rate = max(self.min_rate, self._rate * DECREASE_FACTOR)
+        self._concurrency = max(1, int(self._concurrency * DECREASE_FACTOR))
+        self._healthy_streak = 0
+        self._decreases += 1
+        now = time.monotonic()
+        self._last_decrease = now
+        self._next_slot = max(self._next_slot, now + 1.0 / self._rate)
+        if retry_after:
+            self._pause_until = max(self._pause_until, now + retry_after)
+        log.warning(
+            "Throttle backing off (status=%s, latency=%.2fs) → %.3f req/s, concurrency=%d%s",
+            status, latency, self._rate, self._concurrency,
+            f", paused {retry_after:.0f}s" if retry_after else "",
+        )
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        async with throttle.slot() as done:
+            ...
+            done(status, retry_after)   # latency is measured here
+        Leaving without calling done() counts as a transport failure.
+        """
+        await self.acquire()
+        started = time.monotonic()
+        outcome: dict = {}
+
+        def done(status: Optional[int], retry_after: Optional[float] = None) -> None:
+            outcome["status"] = status
+            outcome["retry_after"] = retry_after
+
+        try:
+            yield done
+        finally:
+            self.release(
+                outcome.get("status"),
+                time.monotonic() - started,
+                outcome.get("retry_after"),
+                started,
+            )
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "rate_per_sec": round(self._rate, 4),
+                "interval_sec": round(1.0 / self._rate, 2),
+                "concurrency_limit": self._concurrency,
+                "in_flight": self._in_flight,
+                "paused_for_sec": round(max(0.0, self._pause_until - time.monotonic()), 1),
+                "latency_ewma_sec": round(self._latency_ewma, 3) if self._latency_ewma is not None else None,
+                "requests": self._requests,
+                "decreases": self._decreases,
+            }
+
+
+throttle = AdaptiveThrottle()
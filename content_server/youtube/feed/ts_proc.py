@@ -1,6 +1,6 @@
 import math
 from datetime import datetime, timedelta, timezone
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 import dateutil.parser  # pip install python-dateutil
 
 
@@ -15,7 +15,7 @@ def _parse_ts(ts: str) -> datetime:
         raise ValueError(f"Unable to parse timestamp: {ts!r} – {e}")
 
 
-def predict_ts(timestamps: List[str]) -> Tuple[str, int, str]:
+def predict_ts(timestamps: List[str], now: Optional[datetime] = None) -> Tuple[str, int, str]:
     """
     Predict next likely upload time based on historical timestamps.
 
@@ -23,6 +23,8 @@ def predict_ts(timestamps: List[str]) -> Tuple[str, int, str]:
     - Uses **last upload's time-of-day + 2 hours** (your requested rule)
     - This acts as a buffer / assumes slightly later uploads over time
 
+    `now` (naive UTC) defaults to the wall clock; the simulator passes a virtual one.
+
     Returns:
         Tuple[str, int, str]:
             - "YYYY-MM-DD HH:MM"
@@ -36,7 +38,8 @@ def predict_ts(timestamps: List[str]) -> Tuple[str, int, str]:
     n = len(dts)
     last_dt = dts[-1]
 
-    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if now is None:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
     days_since_last = (now - last_dt).total_seconds() / 86400.0
 
     # 1. Abandoned check (overrides everything)
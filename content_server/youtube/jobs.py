@@ -0,0 +1,426 @@
+# youtube/jobs.py
+from __future__ import annotations
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+from .feed.fetcher import FeedFetchError, FetchErrorKind, PollTrace, Video
+from ..saved import path as content_dir
+
+log = logging.getLogger(__name__)
+
+# ===============================
+# Settings
+# ===============================
+# off → fetch + parse in threads of the scheduler process (default)
+# auto → Redis when the client is installed and the server answers, else the SQLite queue
+FETCH_QUEUE = os.environ.get("HYDRA_FETCH_QUEUE", "off").lower()   # off | auto | sqlite | redis
+QUEUE_DB_FILE = Path(os.environ.get("HYDRA_FETCH_QUEUE_DB", content_dir / ".fetch_jobs.sqlite"))
+REDIS_URL = os.environ.get("HYDRA_REDIS_URL", "redis://localhost:6379/2")   # 0 and 1 belong to user_server
+
+JOB_LEASE_SEC = float(os.environ.get("HYDRA_FETCH_LEASE_SEC", 600))   # claimed but unanswered → claimable again
+JOB_TTL_SEC = float(os.environ.get("HYDRA_FETCH_JOB_TTL", 3600))      # producer gives up, fetches the rest itself
+HEARTBEAT_SEC = 5.0
+WORKER_STALE_SEC = 3 * HEARTBEAT_SEC
+RESULT_POLL_SEC = 0.2
+CLAIM_WAIT_SEC = 1.0                # an idle worker lane re-checks this often
+JOB_CHUNK = 50                      # rows per submitted batch = rows per writer op
+
+Row = Tuple[str, Optional[str]]     # (rss_id, last_video_id)
+Outcome = Tuple[object, PollTrace]  # what fetch_result() returns
+
+# ===============================
+# Outcome codec (crosses a process boundary as JSON)
+# ===============================
+def encode_outcome(result: object, trace: PollTrace) -> dict:
+    """fetch_result() outcome → JSON-safe dict."""
+    if isinstance(result, FeedFetchError):
+        encoded = {"kind": "error", "error": result.kind.value,
+                   "status": result.status, "retry_after": result.retry_after}
+    elif result is None:
+        encoded = {"kind": "empty"}
+    elif result == "old":
+        encoded = {"kind": "old"}
+    else:
+        recent_ts, videos, latest_video_id, channel_name, channel_url = result
+        encoded = {"kind": "new", "recent_ts": list(recent_ts),
+                   "videos": [video.model_dump() for video in videos],
+                   "latest": latest_video_id, "name": channel_name, "url": channel_url}
+    return {"result": encoded, "trace": asdict(trace)}
+
+
+def decode_outcome(payload: dict, rss_id: str) -> Outcome:
+    """Inverse of encode_outcome(): the exact shapes apply_batch() expects."""
+    encoded, trace = payload["result"], PollTrace(**payload["trace"])
+    kind = encoded["kind"]
+    if kind == "error":
+        return FeedFetchError(FetchErrorKind(encoded["error"]), rss_id,
+                              status=encoded["status"], retry_after=encoded["retry_after"]), trace
+    if kind == "empty":
+        return None, trace
+    if kind == "old":
+        return "old", trace
+    videos = [Video(**video) for video in encoded["videos"]]
+    return (encoded["recent_ts"], videos, encoded["latest"], encoded["name"], encoded["url"]), trace
+
+# ===============================
+# SQLite backend
+# ===============================
+QUERIES = {
+    "create_jobs": """
+        CREATE TABLE IF NOT EXISTS Jobs (
+            id INTEGER PRIMARY KEY,
+            batch TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            rss_id TEXT NOT NULL,
+            last_video_id TEXT,
+            deadline REAL NOT NULL,
+            state TEXT NOT NULL DEFAULT 'queued',   -- queued | running | done
+            worker TEXT,
+            lease_until REAL NOT NULL DEFAULT 0,
+            result TEXT
+        )
+    """,
+    "create_claim_index": """
+        CREATE INDEX IF NOT EXISTS idx_jobs_claim ON Jobs(lease_until) WHERE state != 'done'
+    """,
+    "create_batch_index": """
+        CREATE INDEX IF NOT EXISTS idx_jobs_batch ON Jobs(batch, state)
+    """,
+    "create_workers": """
+        CREATE TABLE IF NOT EXISTS Workers (
+            name TEXT PRIMARY KEY,
+            pid INTEGER,
+            seen_at REAL NOT NULL
+        )
+    """,
+    "enqueue": """
+        INSERT INTO Jobs (batch, seq, rss_id, last_video_id, deadline)
+        VALUES (?, ?, ?, ?, ?)
+    """,
+    # Queued rows have lease_until = 0 → they come before expired leases
+    "claim": """
+        UPDATE Jobs SET state = 'running', worker = ?, lease_until = ?
+        WHERE id = (
+            SELECT id FROM Jobs
+            WHERE state != 'done' AND lease_until < ?
+            ORDER BY lease_until
+            LIMIT 1
+        )
+        RETURNING id, batch, seq, rss_id, last_video_id, deadline
+    """,
+    "complete": """
+        UPDATE Jobs SET state = 'done', result = ? WHERE id = ?
+    """,
+    "drop_job": """
+        DELETE FROM Jobs WHERE id = ?
+    """,
+    "collect": """
+        DELETE FROM Jobs WHERE batch = ? AND state = 'done'
+        RETURNING seq, result
+    """,
+    "cancel": """
+        DELETE FROM Jobs WHERE batch = ?
+    """,
+    "heartbeat": """
+        INSERT INTO Workers (name, pid, seen_at) VALUES (?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET pid = excluded.pid, seen_at = excluded.seen_at
+    """,
+    "leave": """
+        DELETE FROM Workers WHERE name = ?
+    """,
+    "live_workers": """
+        SELECT COUNT(*) FROM Workers WHERE seen_at >= ?
+    """,
+    "depth": """
+        SELECT state, COUNT(*) FROM Jobs GROUP BY state
+    """,
+}
+
+
+class SqliteJobQueue:
+    """
+    Jobs table in content/.fetch_jobs.sqlite (outside the *.db glob of user DBs).
+    claim() leases a row; a worker that dies mid-job loses the lease after
+    JOB_LEASE_SEC and the row goes to the next worker.
+    """
+    name = "sqlite"
+
+    def __init__(self, path: Path | str = QUEUE_DB_FILE) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for key in ("create_jobs", "create_claim_index", "create_batch_index", "create_workers"):
+                conn.execute(QUERIES[key])
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    # ---------- producer side
+    def submit(self, batch: str, rows: Sequence[Row], deadline: float) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(QUERIES["enqueue"], [
+                (batch, seq, rss_id, last_video_id, deadline)
+                for seq, (rss_id, last_video_id) in enumerate(rows)
+            ])
+            conn.execute("COMMIT")
+
+    def collect(self, batch: str) -> List[Tuple[int, dict]]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(QUERIES["collect"], (batch,)).fetchall()
+        return [(seq, json.loads(result)) for seq, result in rows]
+
+    def cancel(self, batch: str) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(QUERIES["cancel"], (batch,))
+
+    # ---------- worker side
+    def claim(self, worker: str, wait: float = CLAIM_WAIT_SEC) -> Optional[dict]:
+        give_up = time.monotonic() + wait
+        with closing(self._connect()) as conn:
+            while True:
+                now = time.time()
+                row = conn.execute(QUERIES["claim"], (worker, now + JOB_LEASE_SEC, now)).fetchone()
+                if row is not None:
+                    job_id, batch, seq, rss_id, last_video_id, deadline = row
+                    if deadline < now:   # producer already gave up on it
+                        conn.execute(QUERIES["drop_job"], (job_id,))
+                        continue
+                    return {"id": job_id, "batch": batch, "seq": seq,
+                            "rss_id": rss_id, "last_video_id": last_video_id}
+                if time.monotonic() >= give_up:
+                    return None
+                time.sleep(min(RESULT_POLL_SEC, wait))
+
+    def complete(self, job: dict, payload: dict) -> None:
+        # A cancelled batch has no rows left → no-op
+        with closing(self._connect()) as conn:
+            conn.execute(QUERIES["complete"], (json.dumps(payload), job["id"]))
+
+    def heartbeat(self, worker: str) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(QUERIES["heartbeat"], (worker, os.getpid(), time.time()))
+
+    def leave(self, worker: str) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(QUERIES["leave"], (worker,))
+
+    # ---------- both
+    def live_workers(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute(QUERIES["live_workers"], (time.time() - WORKER_STALE_SEC,)).fetchone()[0]
+
+    def depth(self) -> Dict[str, int]:
+        with closing(self._connect()) as conn:
+            return dict(conn.execute(QUERIES["depth"]).fetchall())
+
+# ===============================
+# Redis backend
+# ===============================
+class RedisJobQueue:
+    """
+    One list of jobs (BLPOP by the workers), one result list per batch.
+    No leases: jobs a worker took down with it are recovered by the
+    producer's JOB_TTL_SEC fallback.
+    """
+    name = "redis"
+    JOBS_KEY = "hydra:fetch:jobs"
+
+    def __init__(self, url: str = REDIS_URL) -> None:
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.client.ping()
+
+    @staticmethod
+    def _results_key(batch: str) -> str:
+        return f"hydra:fetch:results:{batch}"
+
+    @staticmethod
+    def _cancelled_key(batch: str) -> str:
+        return f"hydra:fetch:cancelled:{batch}"
+
+    @staticmethod
+    def _worker_key(worker: str) -> str:
+        return f"hydra:fetch:workers:{worker}"
+
+    # ---------- producer side
+    def submit(self, batch: str, rows: Sequence[Row], deadline: float) -> None:
+        self.client.rpush(self.JOBS_KEY, *(
+            json.dumps({"batch": batch, "seq": seq, "rss_id": rss_id,
+                        "last_video_id": last_video_id, "deadline": deadline})
+            for seq, (rss_id, last_video_id) in enumerate(rows)
+        ))
+
+    def collect(self, batch: str) -> List[Tuple[int, dict]]:
+        items = self.client.lpop(self._results_key(batch), JOB_CHUNK) or []
+        return [(item["seq"], item["outcome"]) for item in map(json.loads, items)]
+
+    def cancel(self, batch: str) -> None:
+        pipe = self.client.pipeline()
+        pipe.setex(self._cancelled_key(batch), int(JOB_TTL_SEC), 1)
+        pipe.delete(self._results_key(batch))
+        pipe.execute()
+
+    # ---------- worker side
+    def claim(self, worker: str, wait: float = CLAIM_WAIT_SEC) -> Optional[dict]:
+        give_up = time.monotonic() + wait
+        while True:
+            popped = self.client.blpop([self.JOBS_KEY], timeout=max(1, int(wait)))
+            if popped is None:
+                return None
+            job = json.loads(popped[1])
+            if job["deadline"] >= time.time() and not self.client.exists(self._cancelled_key(job["batch"])):
+                return job
+            if time.monotonic() >= give_up:
+                return None
+
+    def complete(self, job: dict, payload: dict) -> None:
+        key = self._results_key(job["batch"])
+        pipe = self.client.pipeline()
+        pipe.rpush(key, json.dumps({"seq": job["seq"], "outcome": payload}))
+        pipe.expire(key, int(JOB_TTL_SEC))
+        pipe.execute()
+
+    def heartbeat(self, worker: str) -> None:
+        self.client.setex(self._worker_key(worker), int(WORKER_STALE_SEC), os.getpid())
+
+    def leave(self, worker: str) -> None:
+        self.client.delete(self._worker_key(worker))
+
+    # ---------- both
+    def live_workers(self) -> int:
+        return sum(1 for _ in self.client.scan_iter(match=self._worker_key("*")))
+
+    def depth(self) -> Dict[str, int]:
+        return {"queued": self.client.llen(self.JOBS_KEY)}
+
+
+def open_backend(mode: str = FETCH_QUEUE):
+    """sqlite | redis | auto (Redis when reachable, else SQLite)."""
+    if mode in ("redis", "auto"):
+        if redis is None:
+            if mode == "redis":
+                raise RuntimeError("HYDRA_FETCH_QUEUE=redis needs the redis package (pip install redis)")
+        else:
+            try:
+                return RedisJobQueue()
+            except redis.RedisError as err:
+                if mode == "redis":
+                    raise
+                log.warning("Redis at %s unreachable (%s) → SQLite fetch queue", REDIS_URL, err)
+    return SqliteJobQueue()
+
+
+def worker_name(index: int) -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+# ===============================
+# Producer facade
+# ===============================
+LocalFetch = Callable[[str, Optional[str]], Awaitable[Outcome]]
+
+
+class FetchQueue:
+    """
+    What the schedulers call instead of fetching in their own threads.
+    fetch_many() keeps the row order of its input, like asyncio.gather did.
+    Anything the worker pool cannot answer (no live worker, TTL reached)
+    is fetched by `local`, so a stopped pool degrades to the in-process path.
+    """
+
+    def __init__(self, mode: str = FETCH_QUEUE) -> None:
+        self.mode = mode
+        self._backend = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def backend(self):
+        if self._backend is None:
+            self._backend = open_backend(self.mode)
+            log.info("Fetch queue backend: %s", self._backend.name)
+        return self._backend
+
+    async def fetch_many(self, rows: Sequence[Row], local: LocalFetch) -> List[Outcome]:
+        backend = await asyncio.to_thread(self.backend)
+        outcomes: Dict[int, Outcome] = {}
+        if await asyncio.to_thread(backend.live_workers):
+            batch = uuid.uuid4().hex
+            deadline = time.time() + JOB_TTL_SEC
+            await asyncio.to_thread(backend.submit, batch, rows, deadline)
+            next_check = time.monotonic() + HEARTBEAT_SEC
+            try:
+                while len(outcomes) < len(rows):
+                    for seq, payload in await asyncio.to_thread(backend.collect, batch):
+                        outcomes[seq] = decode_outcome(payload, rows[seq][0])
+                    if len(outcomes) == len(rows) or time.time() >= deadline:
+                        break
+                    if time.monotonic() >= next_check:
+                        if not await asyncio.to_thread(backend.live_workers):
+                            log.warning("Fetch workers gone mid-batch → fetching the rest in-process")
+                            break
+                        next_check = time.monotonic() + HEARTBEAT_SEC
+                    await asyncio.sleep(RESULT_POLL_SEC)
+            finally:
+                await asyncio.to_thread(backend.cancel, batch)
+        else:
+            log.warning("No live fetch worker → fetching %d channel(s) in-process", len(rows))
+
+        missing = [seq for seq in range(len(rows)) if seq not in outcomes]
+        if missing:
+            fetched = await asyncio.gather(*(local(*rows[seq]) for seq in missing))
+            outcomes.update(zip(missing, fetched))
+        return [outcomes[seq] for seq in range(len(rows))]
+
+    def status(self) -> dict:
+        if not self.enabled:
+            return {"mode": self.mode}
+        backend = self.backend()
+        return {
+            "mode": self.mode,
+            "backend": backend.name,
+            "live_workers": backend.live_workers(),
+            "jobs": backend.depth(),
+        }
+
+
+fetch_queue = FetchQueue()
+
+# ===============================
+# Module Summary
+# ===============================
+"""
+Poll jobs from the schedulers (timmer.dispatch_batch, bulk.run_batch) to the
+fetch worker pool (youtube/worker.py), results back to the producer, which
+hands them to the per-DB writer exactly as before.
+
+  producer:  submit(batch, rows) → collect(batch) until every seq answered → cancel(batch)
+  worker:    claim() → fetch_result() (HTTP + feedparser) → complete(job, encode_outcome())
+
+Backends (HYDRA_FETCH_QUEUE):
+  - sqlite → content/.fetch_jobs.sqlite, leased rows, Workers heartbeat table
+  - redis  → HYDRA_REDIS_URL (db 2); compose runs it in the "workers" profile
+  - auto   → redis if reachable, else sqlite
+  - off    → no queue, fetches stay in the scheduler process (default)
+
+Fallbacks keep polling alive: no live worker, or a batch past HYDRA_FETCH_JOB_TTL,
+→ the producer fetches the unanswered rows itself.
+"""
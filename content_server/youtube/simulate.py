@@ -0,0 +1,316 @@
+# youtube/simulate.py
+"""
+Offline scheduler simulator / backtesting harness.
+
+Drives the real scheduling code (predict_ts, the _handle_no_new counter/rank
+ladder and the timmer earliest-due loop) on a virtual clock against recorded or
+synthetic upload histories. Nothing touches the network.
+
+Usage:
+    python -m content_server.youtube.simulate --channels 2000 --days 90
+    python -m content_server.youtube.simulate --history uploads.json --days 60 --json
+
+History file format (JSON): {"UC...": ["2025-01-01T17:00:00+00:00", ...], ...}
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import math
+import random
+import sqlite3
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..sql_lite.operation.create import sql_creation
+from .feed.fetcher import Video, _pick_new_videos
+from .feed.leveller import leveller
+from .feed.processor import _apply_result
+from .feed.throttle import INITIAL_RATE_PER_SEC
+from .timmer import get_earliest_due, get_due_batch, DUE_WINDOW_SEC, SAFETY_MARGIN_SEC
+
+log = logging.getLogger(__name__)
+
+DAY = 86400.0
+FEED_SIZE = 15          # YouTube RSS only exposes the latest 15 uploads
+ABANDONED_AFTER_DAYS = 365
+POLL_GAP_SEC = 1 / INITIAL_RATE_PER_SEC   # throttle pacing at its starting rate
+
+# name → (weight, mean gap in days); "dead" channels stopped uploading long ago
+SYNTHETIC_PROFILES: Dict[str, tuple[float, Optional[float]]] = {
+    "daily": (0.20, 1.0),
+    "dual": (0.15, 2.0),
+    "weekly": (0.30, 7.0),
+    "monthly": (0.15, 30.0),
+    "sporadic": (0.10, 20.0),
+    "dead": (0.10, None),
+}
+
+# ===============================
+# Channel histories
+# ===============================
+@dataclass
+class SimChannel:
+    rss_id: str
+    uploads: List[float]                      # epoch seconds, ascending
+    profile: str = "recorded"
+    detected: int = 0                         # uploads[:detected] already picked up
+
+    def feed(self, now: float) -> List[Video]:
+        """What the RSS feed would return at `now` (newest first)."""
+        visible = [u for u in self.uploads if u <= now][-FEED_SIZE:]
+        return [
+            Video(
+                id=_video_id(self.rss_id, u),
+                title=f"{self.rss_id} @ {int(u)}",
+                url=f"https://www.youtube.com/watch?v={_video_id(self.rss_id, u)}",
+                published=_iso(u),
+            )
+            for u in reversed(visible)
+        ]
+
+
+def _video_id(rss_id: str, upload: float) -> str:
+    return f"{rss_id[-6:]}{int(upload):x}"
+
+
+def _iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).isoformat()
+
+
+def synthetic_channels(count: int, start: float, end: float, seed: int = 1) -> List[SimChannel]:
+    """Upload histories from the profile mix above, starting a year before `start`."""
+    rng = random.Random(seed)
+    names = list(SYNTHETIC_PROFILES)
+    weights = [SYNTHETIC_PROFILES[n][0] for n in names]
+    history_start = start - (ABANDONED_AFTER_DAYS + 35) * DAY
+    channels: List[SimChannel] = []
+
+    for i in range(count):
+        profile = rng.choices(names, weights)[0]
+        mean_gap = SYNTHETIC_PROFILES[profile][1]
+        rss_id = f"UCsim{i:019d}"
+        hour = rng.uniform(0, 24)             # preferred upload time of day
+        uploads: List[float] = []
+
+        if mean_gap is None:
+            # Last upload well over a year ago
+            t = history_start - rng.uniform(30, 400) * DAY
+            for _ in range(rng.randint(1, FEED_SIZE)):
+                uploads.append(t)
+                t -= rng.uniform(3, 30) * DAY
+            uploads.reverse()
+        else:
+            day = history_start
+            while day < end:
+                if profile == "sporadic":
+                    gap = rng.expovariate(1 / mean_gap)
+                else:
+                    gap = max(0.5, rng.gauss(mean_gap, mean_gap * 0.15))
+                day += gap * DAY
+                midnight = day - (day % DAY)
+                t = midnight + (hour + rng.gauss(0, 1.5)) * 3600
+                if t < end and (not uploads or t > uploads[-1]):
+                    uploads.append(t)
+
+        channels.append(SimChannel(rss_id=rss_id, uploads=uploads, profile=profile))
+    return channels
+
+
+def recorded_channels(path: Path) -> List[SimChannel]:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    channels = []
+    for rss_id, stamps in data.items():
+        uploads = sorted(datetime.fromisoformat(s).timestamp() for s in stamps)
+        channels.append(SimChannel(rss_id=rss_id, uploads=uploads))
+    return channels
+
+# ===============================
+# Simulation
+# ===============================
+@dataclass
+class SimReport:
+    channels: int
+    days: float
+    requests: int = 0
+    outcomes: Dict[str, int] = field(default_factory=lambda: {"new": 0, "old": 0, "empty": 0})
+    latencies: List[float] = field(default_factory=list)   # seconds
+    missed_uploads: int = 0                                 # fell out of the 15-item feed
+    undetected_uploads: int = 0                             # still pending at the end
+    wrongly_abandoned: List[str] = field(default_factory=list)
+    ranks: Dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> dict:
+        lat_h = sorted(x / 3600 for x in self.latencies)
+        return {
+            "channels": self.channels,
+            "days": self.days,
+            "requests": self.requests,
+            "requests_per_channel_per_day": round(self.requests / max(1, self.channels) / max(self.days, 1e-9), 3),
+            "outcomes": self.outcomes,
+            "detected_uploads": len(lat_h),
+            "mean_latency_h": round(sum(lat_h) / len(lat_h), 2) if lat_h else None,
+            "p50_latency_h": round(_percentile(lat_h, 50), 2) if lat_h else None,
+            "p95_latency_h": round(_percentile(lat_h, 95), 2) if lat_h else None,
+            "missed_uploads": self.missed_uploads,
+            "undetected_uploads": self.undetected_uploads,
+            "wrongly_abandoned": len(self.wrongly_abandoned),
+            "ranks": self.ranks,
+        }
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return math.nan
+    k = (len(sorted_values) - 1) * pct / 100
+    lo, hi = math.floor(k), math.ceil(k)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def _seed_db(conn: sqlite3.Connection, channels: List[SimChannel]) -> None:
+    """Same rows csv_import leaves behind: Channel + Channels with ts NULL."""
+    for ch in channels:
+        cur = conn.execute(
+            "INSERT INTO Channel (channel_name, channel_url) VALUES (?, ?)",
+            (ch.rss_id, f"https://www.youtube.com/channel/{ch.rss_id}"),
+        )
+        conn.execute("INSERT INTO Channels (rss_id, id_channel) VALUES (?, ?)", (ch.rss_id, cur.lastrowid))
+    conn.commit()
+
+
+def _poll(
+    conn: sqlite3.Connection,
+    ch: SimChannel,
+    last_video_id: Optional[str],
+    now: float,
+    start: float,
+    report: SimReport,
+) -> None:
+    report.requests += 1
+    videos = ch.feed(now)
+
+    if not videos:
+        result = None
+        report.outcomes["empty"] += 1
+    else:
+        new = _pick_new_videos(videos, last_video_id, ch.rss_id)
+        if new is None:
+            result = "old"
+            report.outcomes["old"] += 1
+        else:
+            channel_url = f"https://www.youtube.com/channel/{ch.rss_id}"
+            result = ([v.published for v in videos], new, videos[0].id, ch.rss_id, channel_url)
+            report.outcomes["new"] += 1
+
+    # Detection bookkeeping: everything uploaded since the previous poll is now known,
+    # unless it already scrolled out of the feed window.
+    pending = [u for u in ch.uploads[ch.detected:] if u <= now]
+    if pending and last_video_id is not None:
+        visible = pending[-FEED_SIZE:]
+        report.missed_uploads += len(pending) - len(visible)
+        report.latencies.extend(now - u for u in visible if u >= start)
+    ch.detected += len(pending)
+
+    _apply_result(conn, ch.rss_id, result, now=datetime.fromtimestamp(now))
+    conn.commit()
+
+
+def simulate(
+    channels: List[SimChannel],
+    start: float,
+    days: float,
+    bulk_gap_sec: float = POLL_GAP_SEC,
+    seed: int = 1,
+) -> SimReport:
+    """
+    Replay `days` of operation starting at `start`:
+      1. bulk import pass (run_batch) over every channel,
+      2. the timmer due-window batch loop until the clock runs out.
+    `seed` drives the leveller's slot jitter: same inputs + seed → same report.
+    """
+    end = start + days * DAY
+    leveller.reset(random.Random(seed))
+    report = SimReport(channels=len(channels), days=days)
+    by_id = {ch.rss_id: ch for ch in channels}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "sim.db"
+        sql_creation(db_path)
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA journal_mode = MEMORY")
+        try:
+            _seed_db(conn, channels)
+
+            # 1. Bulk pass (same order as run_batch, all ts are NULL here)
+            now = start
+            for ch in channels:
+                _poll(conn, ch, None, now, start, report)
+                now += bulk_gap_sec
+
+            # 2. Timmer loop: sleep until the earliest row, then poll the due window as one batch
+            while now < end:
+                row = get_earliest_due(conn)
+                if row is None:
+                    break
+                ts_unix = row[2]
+                if now < ts_unix:
+                    now = ts_unix + SAFETY_MARGIN_SEC
+                    continue
+                for rss_id, last_video_id in get_due_batch(conn, now + DUE_WINDOW_SEC):
+                    _poll(conn, by_id[rss_id], last_video_id, now, start, report)
+                    now += POLL_GAP_SEC
+
+            # Final tallies
+            for rss_id, rank in conn.execute("SELECT rss_id, rank FROM Channels"):
+                report.ranks[rank or "unset"] = report.ranks.get(rank or "unset", 0) + 1
+                ch = by_id[rss_id]
+                active = any(end - ABANDONED_AFTER_DAYS * DAY <= u <= end for u in ch.uploads)
+                if rank == "abandoned" and active:
+                    report.wrongly_abandoned.append(rss_id)
+            for ch in channels:
+                report.undetected_uploads += sum(1 for u in ch.uploads[ch.detected:] if start <= u <= end)
+        finally:
+            conn.close()
+
+    return report
+
+# ===============================
+# CLI
+# ===============================
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Backtest the feed scheduler on a virtual clock")
+    parser.add_argument("--channels", type=int, default=1000, help="synthetic channel count")
+    parser.add_argument("--history", type=Path, help="recorded upload history JSON (overrides --channels)")
+    parser.add_argument("--days", type=float, default=60.0)
+    parser.add_argument("--start", help="ISO start time (default: now)")
+    parser.add_argument("--seed", type=int, default=1,
+                        help="synthetic channels and schedule jitter; pass --start too for a repeatable run")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    # The scheduling code logs every poll; keep the console readable
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger((__package__ or __name__).split(".")[0]).setLevel(logging.ERROR)
+
+    start = datetime.fromisoformat(args.start).timestamp() if args.start else datetime.now().timestamp()
+    if args.history:
+        channels = recorded_channels(args.history)
+    else:
+        channels = synthetic_channels(args.channels, start, start + args.days * DAY, seed=args.seed)
+
+    summary = simulate(channels, start, args.days, seed=args.seed).summary()
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    for key, value in summary.items():
+        print(f"{key:>30}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,26 @@
-# (db_path: str, rss_id: str, last_video_id: Optional[str]) -> None
-from .feed.processor import process_feed
+from .feed.processor import fetch_result_sync, apply_batch
+from .feed.resilience import breaker
+from .feed.leveller import leveller
+from .catchup import drain_backlog
+from .jobs import fetch_queue
+from ..sql_lite.service.writer import write_async
+from ..profiler import profiler
 import sqlite3
 import asyncio
+import functools
 import logging
+import os
 import time
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
 log = logging.getLogger(__name__)
 
-# 5 minutes after successful processing
-SLEEP_AFTER_PROCESS_SEC = 10
 SLEEP_WHEN_NOTHING_SCHEDULED = 12 * 3600  # 12 hours
 SAFETY_MARGIN_SEC = 5.0
+# Everything due within this window of the earliest row is polled in the same batch
+DUE_WINDOW_SEC = int(os.environ.get("HYDRA_DUE_WINDOW_SEC", 300))
+DUE_BATCH_LIMIT = int(os.environ.get("HYDRA_DUE_BATCH_LIMIT", 50))
 
 QUERY_EARLIEST_DUE = """
     SELECT rss_id, last_video_id, ts, ts_read
@@ -22,10 +30,22 @@ QUERY_EARLIEST_DUE = """
     LIMIT 1
 """
 
+QUERY_DUE_WINDOW = """
+    SELECT rss_id, last_video_id
+    FROM Channels
+    WHERE ts IS NOT NULL AND ts <= ?
+    ORDER BY ts ASC
+    LIMIT ?
+"""
+
 QUERY_HAS_ANY_SCHEDULED = """
     SELECT 1 FROM Channels WHERE ts IS NOT NULL LIMIT 1
 """
 
+QUERY_MIN_TS = """
+    SELECT MIN(ts) FROM Channels WHERE ts IS NOT NULL
+"""
+
 # Assume this exists and is synchronous
 
 
@@ -39,26 +59,84 @@ def get_earliest_due(conn: sqlite3.Connection) -> Optional[Tuple[str, Optional[s
     return None
 
 
+def get_due_batch(
+    conn: sqlite3.Connection,
+    until_ts: float,
+    limit: int = DUE_BATCH_LIMIT,
+) -> List[Tuple[str, Optional[str]]]:
+    cur = conn.cursor()
+    cur.execute(QUERY_DUE_WINDOW, (until_ts, limit))
+    return cur.fetchall()
+
+
+async def dispatch_batch(db_path: str, rows: List[Tuple[str, Optional[str]]]) -> None:
+    """
+    Fetch every row concurrently (the shared throttle paces the requests),
+    then hand all outcomes to the DB's writer as one operation.
+    """
+    sampled = profiler.should_sample()  # whole batch profiled or not: fetch threads + writer op
+    fetch = profiler.bind("timmer", fetch_result_sync, sampled)
+    if fetch_queue.enabled:
+        # Fetch worker pool (youtube/worker.py); in-process threads for whatever it can't answer
+        results = await fetch_queue.fetch_many(rows, functools.partial(asyncio.to_thread, fetch))
+    else:
+        results = await asyncio.gather(*(
+            asyncio.to_thread(fetch, rss_id, last_video_id)
+            for rss_id, last_video_id in rows
+        ))
+    count = await write_async(db_path, profiler.bind("timmer", apply_batch, sampled), [
+        (rss_id, result, trace) for (rss_id, _), (result, trace) in zip(rows, results)
+    ])
+    log.info("Batch committed → %d channel(s)", count)
+
+
 def has_any_scheduled(conn: sqlite3.Connection) -> bool:
     cur = conn.cursor()
     cur.execute(QUERY_HAS_ANY_SCHEDULED)
     return cur.fetchone() is not None
 
 
+def scheduler_lag(db_dir: Path) -> dict:
+    """
+    /metrics collector: seconds the earliest due channel of each DB is overdue.
+    Read at scrape time, so a loop stuck behind a slow batch still shows up.
+    """
+    now = time.time()
+    lag = {}
+    for db_file in sorted(db_dir.glob("*.db")):
+        try:
+            conn = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True, timeout=1)
+            try:
+                row = conn.execute(QUERY_MIN_TS).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            continue
+        if row and row[0] is not None:
+            lag[(db_file.stem,)] = max(0.0, now - float(row[0]))
+    return lag
+
+
 async def run_loop(db_path: str):
     log.info("Persistent feed processor started: %s", db_path)
     conn: Optional[sqlite3.Connection] = None
+    dispatch = functools.partial(dispatch_batch, db_path)
 
     try:
+        # Reads only: every write goes through the DB's single writer
         conn = sqlite3.connect(
             db_path,
             timeout=15,
             isolation_level=None,  # autocommit
         )
-        conn.execute("PRAGMA journal_mode=WAL")
-        conn.execute("PRAGMA synchronous=NORMAL")
         conn.execute("PRAGMA busy_timeout=5000")
 
+        # After downtime: freshest-first backlog drain, then steady state below
+        try:
+            await drain_backlog(conn, db_path, dispatch)
+        except Exception:
+            log.exception("Catch-up failed for %s → continuing in steady-state mode", db_path)
+
         while True:
             now = time.time()   # ← fixed: wall-clock time
 
@@ -68,18 +146,14 @@ async def run_loop(db_path: str):
                     rss_id, last_video_id, ts_unix, ts_read = row
 
                     if now >= ts_unix:
-                        # Already due
-                        log.info("Due (past ts) → processing %s (ts=%s)",
-                                 rss_id, ts_read or ts_unix)
-                        await asyncio.to_thread(
-                            process_feed,
-                            db_path,
-                            rss_id,
-                            last_video_id
-                        )
-                        log.debug("process_feed done → sleeping %d min",
-                                  SLEEP_AFTER_PROCESS_SEC // 60)
-                        await asyncio.sleep(SLEEP_AFTER_PROCESS_SEC)
+                        # YouTube unreachable → every scheduler parks here until the probe
+                        await breaker.wait_until_ready()
+                        # Already due → take everything due within the window in one query
+                        batch = get_due_batch(conn, time.time() + DUE_WINDOW_SEC)
+                        log.info("Due (past ts) → processing %d channel(s), first %s (ts=%s)",
+                                 len(batch), rss_id, ts_read or ts_unix)
+                        # Request pacing happens inside feed_fetcher (shared AIMD throttle)
+                        await dispatch(batch)
                         # continue → check again immediately (good for burst of due items)
                     else:
                         # Sleep until due
@@ -146,6 +220,9 @@ async def start_feed_processors(db_directory: str | Path):
         log.warning("No .db files found in %s", db_dir)
         return
 
+    # Global timeline histogram for the schedule leveller
+    await asyncio.to_thread(leveller.seed, db_files)
+
     log.info("Launching %d independent feed processor tasks", len(db_files))
 
     tasks = []
@@ -0,0 +1,145 @@
+# youtube/worker.py
+"""
+Fetch worker pool: HTTP + feedparser off the API / scheduler process.
+
+    python -m content_server.youtube.worker --procs 4 --concurrency 4
+
+Every process claims poll jobs from the fetch queue (youtube/jobs.py) and
+answers them with fetch_result(); the scheduler that submitted them writes
+the outcomes through the per-DB writer. Scale by adding processes here or
+more worker containers on the same queue.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import signal
+from typing import List
+
+from .feed.processor import fetch_result
+from .feed.throttle import INITIAL_RATE_PER_SEC, MAX_CONCURRENCY, MAX_RATE_PER_SEC, throttle
+from .jobs import CLAIM_WAIT_SEC, FETCH_QUEUE, HEARTBEAT_SEC, encode_outcome, open_backend, worker_name
+
+log = logging.getLogger(__name__)
+
+# ===============================
+# Settings
+# ===============================
+FETCH_WORKER_PROCS = int(os.environ.get("HYDRA_FETCH_WORKERS", os.cpu_count() or 1))
+FETCH_WORKER_CONCURRENCY = int(os.environ.get("HYDRA_FETCH_WORKER_CONCURRENCY", 4))   # jobs in flight per process
+
+# ===============================
+# One worker process
+# ===============================
+def share_throttle(procs: int) -> None:
+    """Each process paces 1/procs of the single-process budget → the pool as a whole stays within it."""
+    throttle.configure(
+        rate=INITIAL_RATE_PER_SEC / procs,
+        max_rate=MAX_RATE_PER_SEC / procs,
+        max_concurrency=max(1, math.ceil(MAX_CONCURRENCY / procs)),
+    )
+
+
+async def serve(index: int, concurrency: int, mode: str = FETCH_QUEUE) -> int:
+    """Claim → fetch → complete on `concurrency` lanes until SIGTERM / SIGINT. Returns jobs answered."""
+    backend = await asyncio.to_thread(open_backend, mode)
+    name = worker_name(index)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    answered = 0
+
+    async def heartbeat() -> None:
+        while not stop.is_set():
+            await asyncio.to_thread(backend.heartbeat, name)
+            try:
+                await asyncio.wait_for(stop.wait(), HEARTBEAT_SEC)
+            except asyncio.TimeoutError:
+                pass
+
+    async def lane() -> None:
+        nonlocal answered
+        # Stops claiming on shutdown, the job in hand is still answered
+        while not stop.is_set():
+            job = await asyncio.to_thread(backend.claim, name, CLAIM_WAIT_SEC)
+            if job is None:
+                continue
+            try:
+                result, trace = await fetch_result(job["rss_id"], job["last_video_id"])
+                await asyncio.to_thread(backend.complete, job, encode_outcome(result, trace))
+                answered += 1
+            except Exception:
+                # Unanswered → lease expiry / producer TTL picks it up again
+                log.exception("Fetch job failed for rss_id=%s", job["rss_id"])
+
+    log.info("Fetch worker %s up (%s queue, %d lane(s))", name, backend.name, concurrency)
+    try:
+        await asyncio.gather(heartbeat(), *(lane() for _ in range(concurrency)))
+    finally:
+        await asyncio.to_thread(backend.leave, name)
+        log.info("Fetch worker %s stopped after %d job(s)", name, answered)
+    return answered
+
+
+def _process_main(index: int, procs: int, concurrency: int, mode: str) -> None:
+    share_throttle(procs)
+    asyncio.run(serve(index, concurrency, mode))
+
+# ===============================
+# Pool
+# ===============================
+def run_pool(procs: int, concurrency: int, mode: str) -> None:
+    """Start `procs` worker processes and forward SIGTERM / SIGINT to them."""
+    ctx = multiprocessing.get_context("spawn")
+    children: List[multiprocessing.Process] = [
+        ctx.Process(target=_process_main, args=(index, procs, concurrency, mode),
+                    name=f"fetch-worker-{index}", daemon=False)
+        for index in range(procs)
+    ]
+    for child in children:
+        child.start()
+
+    def _forward(signum, _frame) -> None:
+        for child in children:
+            if child.is_alive() and child.pid:
+                os.kill(child.pid, signum)
+
+    signal.signal(signal.SIGTERM, _forward)
+    signal.signal(signal.SIGINT, _forward)
+    for child in children:
+        child.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fetch worker pool for the feed schedulers' poll jobs")
+    parser.add_argument("--procs", type=int, default=FETCH_WORKER_PROCS,
+                        help="worker processes (default: HYDRA_FETCH_WORKERS or CPU count)")
+    parser.add_argument("--concurrency", type=int, default=FETCH_WORKER_CONCURRENCY,
+                        help="jobs in flight per process")
+    parser.add_argument("--queue", default=FETCH_QUEUE if FETCH_QUEUE != "off" else "auto",
+                        choices=["auto", "sqlite", "redis"], help="queue backend")
+    args = parser.parse_args()
+    log.info("Starting %d fetch worker process(es) × %d lane(s)", args.procs, args.concurrency)
+    run_pool(max(1, args.procs), max(1, args.concurrency), args.queue)
+
+
+if __name__ == "__main__":
+    main()
+
+# ===============================
+# Module Summary
+# ===============================
+"""
+Worker side of the fetch queue.
+
+  - N processes (spawn), each an event loop with C lanes: claim → fetch_result → complete
+  - heartbeat every HEARTBEAT_SEC → producers fall back to in-process fetching when none is live
+  - throttle shared out: every process gets 1/N of HYDRA_THROTTLE_RATE / _MAX_RATE / _MAX_CONCURRENCY;
+    with several worker containers set those per container
+  - circuit breaker and conditional-GET validators are per process
+  - SIGTERM / SIGINT: stop claiming, answer what is in flight, leave
+"""
@@ -1,5 +1,6 @@
 export type Video = {
-  id: string;
+  id: string; // YouTube video id (was the Result rowid before the compact schema)
+  video_id?: string;
   title: string;
   creator: string;
   thumbnail?: string;